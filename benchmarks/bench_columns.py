@@ -0,0 +1,32 @@
+"""
+Compares `Model.compute_many` on records with `Model.compute_columns` on NumPy columns, on 10^5 and 10^6 rows.
+
+Run from the repository root: python -m benchmarks.bench_columns [n_rows ...]
+"""
+import sys
+import time
+import numpy as np
+from nodemodel import Model
+from benchmarks.graphs import layered_forced,inputs
+
+def bench(m,record,n_rows):
+    records = [dict(record) for _ in range(n_rows)]
+    start = time.perf_counter()
+    m.compute_many(records)
+    rows = time.perf_counter() - start
+
+    columns = {k:np.full(n_rows,v,dtype=np.float64) for k,v in record.items()}
+    start = time.perf_counter()
+    result = m.compute_columns(columns)
+    vectorized = time.perf_counter() - start
+    assert all(result[k][-1] == v for k,v in records[-1].items())
+    print(f"{n_rows:>9} rows: compute_many {n_rows/rows:>12,.0f} rows/s   "
+          f"compute_columns {n_rows/vectorized:>14,.0f} rows/s   speedup: {rows/vectorized:6.1f}x")
+
+if __name__ == "__main__":
+    sizes = [int(k) for k in sys.argv[1:]] or [10**5,10**6]
+    nodes = layered_forced(5,4,forced_every=2)
+    m = Model(nodes)
+    record = inputs(nodes)
+    for n_rows in sizes:
+        bench(m,record,n_rows)
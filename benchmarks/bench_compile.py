@@ -0,0 +1,23 @@
+"""
+Compares `Model.compute` with the function generated by `Model.compile` on graphs of cheap scalar nodes.
+
+Run from the repository root: python -m benchmarks.bench_compile
+"""
+import timeit
+from nodemodel import Model
+from benchmarks.graphs import chain,layered,inputs
+
+def bench(title,nodes,number=2000):
+    m = Model(nodes)
+    record = inputs(nodes)
+    compiled = m.compile()
+    assert compiled(dict(record)) == m.compute(dict(record))
+    loop = min(timeit.repeat(lambda: m.compute(dict(record)),number=number,repeat=5)) / number
+    straight = min(timeit.repeat(lambda: compiled(dict(record)),number=number,repeat=5)) / number
+    print(f"{title:<40} compute: {loop*1e6:8.1f} us   compiled: {straight*1e6:8.1f} us   speedup: {loop/straight:4.1f}x")
+
+if __name__ == "__main__":
+    bench("chain(100)",chain(100))
+    bench("chain(1000)",chain(1000),number=200)
+    bench("layered(20x20)",layered(20,20))
+    bench("layered(20x20) with forced nodes",layered(20,20,forced_every=2))
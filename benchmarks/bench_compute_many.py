@@ -0,0 +1,38 @@
+"""
+Compares a Python loop over `Model.compute` with `Model.compute_many` on 10^5 and 10^6 records.
+
+Run from the repository root: python -m benchmarks.bench_compute_many [n_records ...]
+"""
+import sys
+import time
+from nodemodel import Model
+from benchmarks.graphs import layered,inputs
+
+def bench(m,record,n_records,outputs=None):
+    records = [dict(record) for _ in range(n_records)]
+    start = time.perf_counter()
+    if outputs is None:
+        naive = [m.compute(r) for r in records]
+    else:
+        naive = []
+        for r in records:
+            result = m.compute(r)
+            naive.append({k:result[k] for k in outputs})
+    loop = time.perf_counter() - start
+
+    records = [dict(record) for _ in range(n_records)]
+    start = time.perf_counter()
+    batch = m.compute_many(records,outputs=outputs)
+    prepared = time.perf_counter() - start
+    assert batch == naive
+    print(f"{n_records:>9} records, outputs={outputs}: loop {n_records/loop:>10,.0f} rec/s   "
+          f"compute_many {n_records/prepared:>10,.0f} rec/s   speedup: {loop/prepared:4.1f}x")
+
+if __name__ == "__main__":
+    sizes = [int(k) for k in sys.argv[1:]] or [10**5,10**6]
+    nodes = layered(5,4,forced_every=2)
+    m = Model(nodes)
+    record = inputs(nodes)
+    for n_records in sizes:
+        bench(m,record,n_records)
+        bench(m,record,n_records,outputs=["n3_0","n3_1"])
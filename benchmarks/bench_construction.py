@@ -0,0 +1,22 @@
+"""
+Measures the construction time of `Model` on layered graphs of increasing size and density of conditional functions.
+
+Run from the repository root: python -m benchmarks.bench_construction
+"""
+import time
+from nodemodel import Model
+from benchmarks.graphs import layered_forced
+
+def bench(width,depth,forced_every):
+    nodes = layered_forced(width,depth,forced_every)
+    start = time.perf_counter()
+    m = Model(nodes)
+    elapsed = time.perf_counter() - start
+    print(f"{len(nodes):>6} nodes, forced every {forced_every or '-':>3}: {len(m.graph):>7} graph nodes, "
+          f"{m.graph.number_of_edges():>7} edges   {elapsed:8.3f} s   {elapsed / len(nodes) * 1e6:7.1f} us/node")
+    return elapsed
+
+if __name__ == "__main__":
+    for forced_every in (0,50,10):
+        for depth in (10,20,40,80,160):
+            bench(50,depth,forced_every)
@@ -0,0 +1,42 @@
+"""
+Compares the latency of `Model.compute` and the throughput of `Model.compute_many` with and without `assume_pure`, 
+on layered models where many nodes force an input to a value, so that their auxiliary nodes depending only on the 
+forced values are folded to constants.
+
+Run from the repository root: python -m benchmarks.bench_fold
+"""
+import time
+from nodemodel import Model
+from nodemodel.plan import VALUE
+from benchmarks.graphs import layered,forced_heavy,inputs
+
+def bench(name,nodes,n_records=10000):
+    record = inputs(nodes)
+    timings = {}
+    Model(nodes) #Imports networkx before the timings
+    for assume_pure in (False,True):
+        start = time.perf_counter()
+        m = Model(nodes,assume_pure=assume_pure)
+        init = time.perf_counter() - start
+        folded = sum(1 for node in m.plan.nodes if node.kind == VALUE)
+        start = time.perf_counter()
+        for _ in range(1000):
+            m.compute(dict(record))
+        latency = (time.perf_counter() - start) / 1000
+        records = [dict(record) for _ in range(n_records)]
+        m.compute_many(records[:1])
+        start = time.perf_counter()
+        m.compute_many(records)
+        timings[assume_pure] = (init,folded,latency,n_records / (time.perf_counter() - start))
+    for assume_pure,(init,folded,latency,throughput) in timings.items():
+        print(f"{name:<20} assume_pure={assume_pure!s:<5} constants {folded:>5} of {len(m.plan.nodes):>5}   "
+              f"init {init * 1000:7.1f} ms   compute {latency * 1e6:8.1f} us   compute_many {throughput:>9,.0f} rec/s")
+
+if __name__ == "__main__":
+    #Every input of the first layer is forced, so that whole subgraphs depend only on forced values
+    nodes = layered(10,10)
+    for i,f in enumerate(nodes.values()):
+        if i >= 90:
+            f.forced_nodes = {f"x{k}":k for k in range(10)}
+    bench("layered_10x10",nodes)
+    bench("forced_heavy_20x20",forced_heavy(20,20))
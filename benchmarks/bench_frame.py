@@ -0,0 +1,40 @@
+"""
+Compares ways of adding the nodes of a model as columns of a pandas DataFrame: assigning the result of every node 
+as a new column of the frame, and `Model.compute_frame`, with and without chunks.
+
+Run from the repository root: python -m benchmarks.bench_frame [n_rows ...]
+"""
+import sys
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from nodemodel import Model
+from benchmarks.graphs import layered_forced,inputs
+
+def assign_columns(m,df):
+    df = df.copy()
+    for node_name,function,args in m.plan.steps:
+        df[node_name] = function(*[df[k] for k in args])
+    return df.drop(columns=m.auxiliary_nodes)
+
+def bench(m,df):
+    timings = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore",pd.errors.PerformanceWarning)
+        for name,f in [("assign columns",lambda: assign_columns(m,df)),
+                       ("compute_frame",lambda: m.compute_frame(df)),
+                       ("compute_frame chunked",lambda: m.compute_frame(df,chunk_size=len(df) // 10))]:
+            start = time.perf_counter()
+            result = f()
+            timings[name] = time.perf_counter() - start
+    print(f"{len(df):>9} rows, {result.shape[1]} columns: " 
+          + "   ".join(f"{name} {elapsed * 1000:8.1f} ms" for name,elapsed in timings.items()))
+
+if __name__ == "__main__":
+    sizes = [int(k) for k in sys.argv[1:]] or [10**4,10**5,10**6]
+    nodes = layered_forced(50,4,forced_every=7)
+    m = Model(nodes)
+    for n_rows in sizes:
+        df = pd.DataFrame({k:np.full(n_rows,v,dtype=np.float64) for k,v in inputs(nodes).items()})
+        bench(m,df)
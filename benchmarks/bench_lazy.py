@@ -0,0 +1,51 @@
+"""
+Compares the latency of `Model.compute` and the throughput of `Model.compute_many` of a selector choosing between two
+chains of nodes, with and without lazy arguments: with them, only the chain of the taken branch is computed.
+
+Run from the repository root: python -m benchmarks.bench_lazy
+"""
+import time
+from nodemodel import Model,node
+from benchmarks.graphs import make_node
+
+def branch(prefix,length):
+    """A chain x -> {prefix}0 -> ... -> {prefix}last of `length` cheap scalar nodes."""
+    nodes = {}
+    previous = "x"
+    for i in range(length):
+        name = f"{prefix}{i}" if i < length - 1 else f"{prefix}last"
+        nodes[name] = make_node(name,[previous],f"{previous} + 1")
+        previous = name
+    return nodes
+
+def model(length,lazy):
+    if lazy:
+        @node(lazy=["premium_last","basic_last"])
+        def price(is_premium,premium_last,basic_last):
+            return premium_last() if is_premium else basic_last()
+    else:
+        def price(is_premium,premium_last,basic_last):
+            return premium_last if is_premium else basic_last
+    return Model({**branch("premium_",length),**branch("basic_",length),"price":price})
+
+def bench(length,n_records=2000):
+    Model({"a":lambda x: x}) #Imports networkx before the timings
+    for lazy in (False,True):
+        m = model(length,lazy)
+        record = {"x":1,"is_premium":True}
+        m.compute(dict(record),outputs="price")
+        start = time.perf_counter()
+        for _ in range(1000):
+            m.compute(dict(record),outputs="price")
+        latency = (time.perf_counter() - start) / 1000
+        records = [dict(record) for _ in range(n_records)]
+        m.compute_many(records[:1],outputs=["price"])
+        start = time.perf_counter()
+        m.compute_many(records,outputs=["price"])
+        throughput = n_records / (time.perf_counter() - start)
+        print(f"two branches of {length:>4} nodes  lazy={lazy!s:<5}   compute {latency * 1e6:8.1f} us   "
+              f"compute_many {throughput:>9,.0f} rec/s")
+
+if __name__ == "__main__":
+    for length in (10,100,500):
+        bench(length)
@@ -0,0 +1,32 @@
+"""
+Measures `load_nodes` on a directory of node modules with slow imports, loading all nodes or only the nodes needed by 
+one output.
+
+Run from the repository root: python -m benchmarks.bench_load_nodes
+"""
+import os
+import tempfile
+import time
+from nodemodel import load_nodes
+
+def write_modules(directory,n_modules,nodes_per_module,import_seconds):
+    """Writes modules of chained nodes, each module sleeping `import_seconds` when imported, like a heavy import."""
+    for m in range(n_modules):
+        lines = ["import time","from nodemodel import node",f"time.sleep({import_seconds})",""]
+        for k in range(nodes_per_module):
+            i = m * nodes_per_module + k
+            lines += ["@node",f"def n{i}({f'n{i-1}' if i else 'x'}):",f"    return {f'n{i-1}' if i else 'x'} + 1",""]
+        with open(os.path.join(directory,f"module_{m}.py"),"w") as f:
+            f.write("\n".join(lines))
+
+def bench(directory,outputs):
+    start = time.perf_counter()
+    nodes = load_nodes(directory,outputs=outputs)
+    return len(nodes),time.perf_counter() - start
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        write_modules(directory,200,10,0.01)
+        for label,outputs in (("all nodes",None),("output n25 (cold index)",["n25"]),("output n25 (warm index)",["n25"])):
+            count,elapsed = bench(directory,outputs)
+            print(f"{label:<25}: {count:>5} nodes loaded in {elapsed:7.3f} s")
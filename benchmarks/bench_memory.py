@@ -0,0 +1,28 @@
+"""
+Compares the peak memory of `Model.compute` with `compute(outputs=[...], free_intermediates=True)` on a chain of nodes 
+returning large NumPy arrays.
+
+Run from the repository root: python -m benchmarks.bench_memory
+"""
+import tracemalloc
+import numpy as np
+from nodemodel import Model
+from benchmarks.graphs import chain
+
+def peak_memory(f):
+    tracemalloc.start()
+    f()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+if __name__ == "__main__":
+    n_nodes = 20
+    nodes = chain(n_nodes)
+    m = Model(nodes)
+    x = np.ones(1_000_000)
+    full = peak_memory(lambda: m.compute({"x":x}))
+    lean = peak_memory(lambda: m.compute({"x":x},outputs=[f"n{n_nodes-1}"],free_intermediates=True))
+    print(f"chain of {n_nodes} arrays of {x.nbytes/2**20:.1f} MiB")
+    print(f"compute:                                 peak {full/2**20:8.1f} MiB")
+    print(f"compute(outputs,free_intermediates=True): peak {lean/2**20:8.1f} MiB   reduction: {full/lean:4.1f}x")
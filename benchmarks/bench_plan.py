@@ -0,0 +1,65 @@
+"""
+Measures the import time of `nodemodel`, whether importing it imports networkx, the memory held by a `Model` and the 
+time of a warm start from a saved plan (`Model.load_plan`) compared with the construction of the model.
+
+Run from the repository root: python -m benchmarks.bench_plan
+"""
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from nodemodel import Model
+from benchmarks.graphs import layered,layered_forced
+
+def import_time(statement,repeat=5):
+    """Best wall time of a fresh interpreter running `statement`, minus the time of an empty interpreter."""
+    def run(code):
+        best = float("inf")
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable,"-c",f"import time;t=time.perf_counter();{code};print(time.perf_counter()-t)"],
+                                    capture_output=True,text=True,check=True).stdout
+            best = min(best,float(output))
+        return best
+    return run(statement)
+
+def model_memory(nodes):
+    """Memory allocated by the construction and a first computation of a model and still held by it."""
+    Model(layered(2,2)).compute({"x0":1,"x1":1})
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    m = Model(nodes)
+    m.compute({f"x{i}":1 for i in range(50)})
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held
+
+def warm_start(nodes):
+    """Times of the construction of a model and of its creation from a saved plan."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory,"model.plan")
+        start = time.perf_counter()
+        Model(nodes).save_plan(path)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        Model.load_plan(path,nodes)
+        loaded = time.perf_counter() - start
+    return built,loaded
+
+if __name__ == "__main__":
+    print(f"import nodemodel: {import_time('import nodemodel')*1000:7.1f} ms")
+    networkx_imported = subprocess.run([sys.executable,"-c","import nodemodel,sys;print('networkx' in sys.modules)"],
+                                       capture_output=True,text=True,check=True).stdout.strip()
+    print(f"networkx imported by 'import nodemodel': {networkx_imported}")
+    for depth,forced_every in ((20,0),(20,10),(80,10)):
+        nodes = layered_forced(50,depth,forced_every)
+        print(f"Model of {len(nodes):>5} nodes (forced every {forced_every or '-':>2}): {model_memory(nodes)/2**20:7.2f} MiB")
+    for depth,forced_every in ((20,0),(80,10)):
+        nodes = layered_forced(50,depth,forced_every)
+        built,loaded = warm_start(nodes)
+        print(f"Model of {len(nodes):>5} nodes (forced every {forced_every or '-':>2}): built in {built*1000:7.1f} ms, "
+              f"loaded from a saved plan in {loaded*1000:7.1f} ms")
@@ -0,0 +1,37 @@
+"""
+Measures the throughput of `Model.compute_many(..., executor="processes")` over 1..N worker processes on CPU-bound 
+pure-Python nodes.
+
+Run from the repository root: python -m benchmarks.bench_processes [n_records]
+"""
+import os
+import sys
+import time
+from nodemodel import Model
+
+def a(x):
+    return sum(i * i for i in range(x))
+
+def b(x):
+    return sum(i % 7 for i in range(x))
+
+def c(a,b):
+    return a - b
+
+def d(c):
+    return c % 1000
+
+if __name__ == "__main__":
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    m = Model({"a":a,"b":b,"c":c,"d":d})
+    records = [{"x":500 + i % 100} for i in range(n_records)]
+    start = time.perf_counter()
+    expected = m.compute_many([dict(r) for r in records],outputs=["d"])
+    single = time.perf_counter() - start
+    print(f"in-process:  {n_records/single:>10,.0f} rec/s")
+    for max_workers in range(1,(os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        results = m.compute_many(records,outputs=["d"],executor="processes",max_workers=max_workers,chunksize=500)
+        elapsed = time.perf_counter() - start
+        assert results == expected
+        print(f"{max_workers:>2} workers:  {n_records/elapsed:>10,.0f} rec/s   speedup: {single/elapsed:4.1f}x")
@@ -0,0 +1,46 @@
+"""
+Compares `Model.compute_many` on a list collected from a generator of records with `Model.compute_stream` on the 
+generator itself: throughput and peak memory (with `tracemalloc`), for 10^5 and 10^6 records.
+
+Run from the repository root: python -m benchmarks.bench_stream [n_records ...]
+"""
+import sys
+import time
+import tracemalloc
+from nodemodel import Model
+from benchmarks.graphs import layered_forced,inputs
+
+def generate(record,n_records):
+    for i in range(n_records):
+        yield dict(record,x0=i)
+
+def consume(results)->int:
+    total = 0
+    for result in results:
+        total += result["n3_0"]
+    return total
+
+def measure(f):
+    tracemalloc.start()
+    start = time.perf_counter()
+    total = f()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return total,elapsed,peak
+
+def bench(m,record,n_records):
+    outputs = ["n3_0","n3_1"]
+    batch = measure(lambda: consume(m.compute_many(list(generate(record,n_records)),outputs=outputs)))
+    stream = measure(lambda: consume(m.compute_stream(generate(record,n_records),chunk_size=1000,outputs=outputs)))
+    assert batch[0] == stream[0]
+    print(f"{n_records:>9} records: compute_many {n_records/batch[1]:>10,.0f} rec/s {batch[2] / 2**20:8.1f} MiB   "
+          f"compute_stream {n_records/stream[1]:>10,.0f} rec/s {stream[2] / 2**20:8.1f} MiB")
+
+if __name__ == "__main__":
+    sizes = [int(k) for k in sys.argv[1:]] or [10**5,10**6]
+    nodes = layered_forced(5,4,forced_every=2)
+    m = Model(nodes)
+    record = inputs(nodes)
+    for n_records in sizes:
+        bench(m,record,n_records)
@@ -0,0 +1,52 @@
+"""
+Compares ways of computing the last layer of a layered model under many values of a node of its last layers: 
+one model per value with the node forced by `forced_nodes`, one `recompute` of a copy of a full result per value, 
+and `Model.sweep`, with and without `vectorize`.
+
+Run from the repository root: python -m benchmarks.bench_sweep [n_scenarios ...]
+"""
+import sys
+import time
+from nodemodel import Model
+from benchmarks.graphs import layered,inputs,make_node
+
+def timed(f):
+    start = time.perf_counter()
+    result = f()
+    return result,time.perf_counter() - start
+
+def bench(nodes,record,n_scenarios,width,depth):
+    forced = f"n{depth - 3}_0"
+    outputs = [f"n{depth - 1}_{i}" for i in range(width)]
+    values = [float(k) for k in range(n_scenarios)]
+    m = Model(nodes)
+    timings = {}
+    if n_scenarios <= 100:
+        def models():
+            results = []
+            for v in values:
+                sink = make_node("sink",outputs," + ".join(outputs))
+                sink.forced_nodes = {forced:v}
+                results.append(Model(dict(nodes,sink=sink)).compute(dict(record),outputs=["sink"])["sink"])
+            return results
+        _,timings["one model per value"] = timed(models)
+    def recompute():
+        base = m.compute(dict(record))
+        return [{k:result[k] for k in outputs} for result in (m.recompute(dict(base),**{forced:v}) for v in values)]
+    expected,timings["compute + recompute per value"] = timed(recompute)
+    #Sweeps are computed once beforehand, so that the timings include neither their plans nor the import of NumPy
+    for vectorize in (False,True):
+        m.sweep(record,outputs,{forced:values[:1]},vectorize=vectorize)
+    swept,timings["sweep"] = timed(lambda: m.sweep(record,outputs,{forced:values}))
+    vectorized,timings["sweep vectorized"] = timed(lambda: m.sweep(record,outputs,{forced:values},vectorize=True))
+    assert swept == expected and vectorized == expected
+    print(f"{n_scenarios:>7} scenarios: " + "   ".join(f"{name} {elapsed * 1000:9.1f} ms" 
+                                                     for name,elapsed in timings.items()))
+
+if __name__ == "__main__":
+    sizes = [int(k) for k in sys.argv[1:]] or [100,10000]
+    width,depth = 50,20
+    nodes = layered(width,depth)
+    record = {k:1.0 for k in inputs(nodes)}
+    for n_scenarios in sizes:
+        bench(nodes,record,n_scenarios,width,depth)
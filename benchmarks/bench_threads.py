@@ -0,0 +1,40 @@
+"""
+Compares sequential `Model.compute` with `executor="threads"` on a wide graph of nodes releasing the GIL 
+(`time.sleep` and NumPy matrix products). NumPy products may already use several BLAS threads.
+
+Run from the repository root: python -m benchmarks.bench_threads
+"""
+import time
+import numpy as np
+from nodemodel import Model
+from benchmarks.graphs import make_node
+
+def wide(width,kind):
+    """`width` independent branches of two nodes each, combined by a final node."""
+    work = "time.sleep(0.01)" if kind == "sleep" else "np.linalg.norm(m @ m)"
+    nodes = {}
+    for i in range(width):
+        nodes[f"a{i}"] = make_node(f"a{i}",["m","x"],f"({work},x)[1]")
+        nodes[f"b{i}"] = make_node(f"b{i}",["m",f"a{i}"],f"({work},a{i})[1]")
+    nodes["total"] = make_node("total",[f"b{i}" for i in range(width)]," + ".join(f"b{i}" for i in range(width)))
+    for f in nodes.values():
+        f.__globals__.update({"time":time,"np":np})
+    return nodes
+
+def bench(title,nodes,record,max_workers):
+    m = Model(nodes)
+    start = time.perf_counter()
+    sequential = m.compute(dict(record))
+    sequential_time = time.perf_counter() - start
+    start = time.perf_counter()
+    threaded = m.compute(dict(record),executor="threads",max_workers=max_workers)
+    threaded_time = time.perf_counter() - start
+    assert threaded.keys() == sequential.keys()
+    print(f"{title:<32} sequential: {sequential_time:7.3f} s   threads({max_workers}): {threaded_time:7.3f} s   "
+          f"speedup: {sequential_time/threaded_time:4.1f}x")
+
+if __name__ == "__main__":
+    matrix = np.random.default_rng(0).random((400,400))
+    for max_workers in (4,16):
+        bench("32 branches of time.sleep",wide(32,"sleep"),{"x":1.0,"m":matrix},max_workers)
+        bench("32 branches of NumPy products",wide(32,"numpy"),{"x":1.0,"m":matrix},max_workers)
@@ -0,0 +1,56 @@
+"""
+Compares the JSON results of `benchmarks.suite` with a baseline and flags regressions.
+
+A metric regresses when it is worse than the baseline by more than the threshold (10% by default): times and memory
+must not increase, throughputs must not decrease. The exit code is 1 if any metric regresses.
+
+Run from the repository root:
+    python -m benchmarks.compare benchmarks/baseline.json results.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+
+#Metrics where a higher value is better; all other metrics are better when lower
+HIGHER_IS_BETTER = {"compute_many_records_per_s"}
+
+def compare(baseline:dict,current:dict,threshold:float=0.10)->list:
+    """
+    Returns the comparison of every metric of the cases found in both results, as tuples
+    (case, metric, baseline value, current value, relative change, is a regression).
+    The relative change is positive when the metric improves.
+    """
+    rows = []
+    for case,baseline_metrics in baseline["results"].items():
+        if case not in current["results"]:
+            continue
+        for metric,baseline_value in baseline_metrics.items():
+            current_value = current["results"][case].get(metric)
+            if metric == "nodes" or current_value is None or not baseline_value:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                change = (current_value - baseline_value) / baseline_value
+            else:
+                change = (baseline_value - current_value) / baseline_value
+            rows.append((case,metric,baseline_value,current_value,change,change < -threshold))
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline",help="the JSON results used as a reference")
+    parser.add_argument("current",help="the JSON results to check")
+    parser.add_argument("--threshold",type=float,default=0.10,help="the tolerated relative degradation")
+    args = parser.parse_args()
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline.get("quick") != current.get("quick"):
+        print("warning: comparing a quick run with a full run",file=sys.stderr)
+    rows = compare(baseline,current,args.threshold)
+    for case,metric,baseline_value,current_value,change,regression in rows:
+        flag = "REGRESSION" if regression else ""
+        print(f"{case:<24} {metric:<28} {baseline_value:>14.6g} {current_value:>14.6g} {change:>+8.1%}  {flag}")
+    regressions = sum(row[-1] for row in rows)
+    print(f"{regressions} regression(s) out of {len(rows)} metrics (threshold {args.threshold:.0%})")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,100 @@
+"""Generators of synthetic node dictionaries used by the benchmarks."""
+from typing import Dict,Callable
+
+def make_node(name:str,args:list,body:str)->Callable:
+    """Creates a function called `name` with the given argument names and return expression."""
+    namespace = {}
+    exec(f"def {name}({','.join(args)}):\n    return {body}\n",namespace)
+    return namespace[name]
+
+def chain(n:int)->Dict[str,Callable]:
+    """A chain x -> n0 -> n1 -> ... of cheap scalar nodes."""
+    nodes = {}
+    previous = "x"
+    for i in range(n):
+        name = f"n{i}"
+        nodes[name] = make_node(name,[previous],f"{previous} + 1")
+        previous = name
+    return nodes
+
+def layered(width:int,depth:int,forced_every:int=0)->Dict[str,Callable]:
+    """
+    `depth` layers of `width` cheap scalar nodes, each node depending on two nodes of the previous layer.
+    If `forced_every` > 0, every `forced_every`-th node of the last layer is a conditional function with the input `x` 
+    forced to a value.
+    """
+    nodes = {}
+    previous = [f"x{i}" for i in range(width)]
+    for d in range(depth):
+        layer = []
+        for i in range(width):
+            name = f"n{d}_{i}"
+            args = [previous[i],previous[(i + 1) % width]]
+            nodes[name] = make_node(name,args," + ".join(args))
+            layer.append(name)
+        previous = layer
+    if forced_every > 0:
+        for i,name in enumerate(previous):
+            if i % forced_every == 0:
+                nodes[name].forced_nodes = {"x0":i}
+    return nodes
+
+def layered_forced(width:int,depth:int,forced_every:int=0)->Dict[str,Callable]:
+    """
+    The layers of `layered(width, depth)` where, if `forced_every` > 0, every `forced_every`-th node of all layers is 
+    a conditional function with the input `x0` forced to a value, so that conditional functions have ancestors of 
+    every size.
+    """
+    nodes = layered(width,depth)
+    if forced_every > 0:
+        for i,f in enumerate(nodes.values()):
+            if i % forced_every == forced_every - 1:
+                f.forced_nodes = {"x0":i % 3}
+    return nodes
+
+def inputs(nodes:Dict[str,Callable],value:int=1)->Dict[str,int]:
+    """Returns a record with every input of the nodes set to `value`."""
+    names = set()
+    for f in nodes.values():
+        names.update(f.__code__.co_varnames[:f.__code__.co_argcount])
+    return {k:value for k in names if k not in nodes}
+
+def fanout(width:int)->Dict[str,Callable]:
+    """A root node x -> root and `width` nodes depending on it, then a sink node for every 100 of them."""
+    nodes = {"root":make_node("root",["x"],"x + 1")}
+    leaves = []
+    for i in range(width):
+        name = f"leaf{i}"
+        nodes[name] = make_node(name,["root"],f"root + {i}")
+        leaves.append(name)
+    for k in range(0,width,100):
+        name = f"sink{k // 100}"
+        args = leaves[k:k + 100]
+        nodes[name] = make_node(name,args," + ".join(args))
+    return nodes
+
+def diamond(n:int)->Dict[str,Callable]:
+    """An n x n lattice of diamonds: the node d{i}_{j} depends on d{i-1}_{j} and d{i}_{j-1}, the first ones on x."""
+    nodes = {}
+    for i in range(n):
+        for j in range(n):
+            name = f"d{i}_{j}"
+            args = [f"d{i-1}_{j}" if i else "x"] + ([f"d{i}_{j-1}"] if j else [])
+            nodes[name] = make_node(name,args," + ".join(args))
+    return nodes
+
+def forced_heavy(width:int,depth:int)->Dict[str,Callable]:
+    """
+    Layered nodes (see `layered`) where every third node forces `x0` to a value and every seventh node forces `x1` 
+    to a value.
+    """
+    nodes = layered(width,depth)
+    for i,(name,f) in enumerate(nodes.items()):
+        forced_nodes = {}
+        if i % 3 == 2:
+            forced_nodes["x0"] = i % 5
+        if i % 7 == 6:
+            forced_nodes["x1"] = i % 2
+        if forced_nodes:
+            f.forced_nodes = forced_nodes
+    return nodes
@@ -0,0 +1,95 @@
+"""
+Runs the benchmark suite of nodemodel on synthetic graphs and prints the results as JSON.
+
+For every case it measures:
+    init_s: the construction time of `Model` (best of `repeat`),
+    submodel_s: the time of a first call of `Model.submodel` for the last node of the graph (best of `repeat`),
+    compute_latency_us: the median latency of `Model.compute` on a single record,
+    compute_many_records_per_s: the throughput of `Model.compute_many`,
+    peak_memory_mib: the peak memory of the construction of the model and one computation (with `tracemalloc`).
+
+Run from the repository root:
+    python -m benchmarks.suite [--quick] [--output results.json]
+    python -m benchmarks.compare benchmarks/baseline.json results.json
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from nodemodel import Model
+from benchmarks.graphs import chain,fanout,diamond,layered,forced_heavy,inputs
+
+def cases(quick:bool=False):
+    """Returns the generators of the graphs of the suite, by case name."""
+    scale = 1 if quick else 4
+    return {f"chain_{250 * scale}":lambda: chain(250 * scale),
+            f"fanout_{500 * scale}":lambda: fanout(500 * scale),
+            f"diamond_{10 * scale}":lambda: diamond(10 * scale),
+            f"layered_50x{5 * scale}":lambda: layered(50,5 * scale),
+            f"forced_heavy_20x{5 * scale}":lambda: forced_heavy(20,5 * scale)}
+
+def best_time(f,repeat:int,setup=None)->float:
+    """Best time of `f(setup())` where `setup` is not timed."""
+    best = float("inf")
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        f(argument) if setup is not None else f()
+        best = min(best,time.perf_counter() - start)
+    return best
+
+def peak_memory(f)->int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        f()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_case(make_nodes,repeat:int,n_latency:int,n_records:int)->dict:
+    nodes = make_nodes()
+    record = inputs(nodes)
+    m = Model(nodes)
+    last_node = m.call_order[-1]
+    latencies = []
+    for _ in range(n_latency):
+        input = dict(record)
+        start = time.perf_counter()
+        m.compute(input)
+        latencies.append(time.perf_counter() - start)
+    records = [dict(record) for _ in range(n_records)]
+    m.compute_many(records[:1])
+    start = time.perf_counter()
+    m.compute_many(records)
+    throughput = n_records / (time.perf_counter() - start)
+    return {"nodes":len(nodes),
+            "init_s":best_time(lambda: Model(nodes),repeat),
+            "submodel_s":best_time(lambda parent: parent.submodel(last_node),repeat,setup=lambda: Model(nodes)),
+            "compute_latency_us":statistics.median(latencies) * 1e6,
+            "compute_many_records_per_s":throughput,
+            "peak_memory_mib":peak_memory(lambda: Model(nodes).compute(dict(record))) / 2**20}
+
+def run_suite(quick:bool=False)->dict:
+    repeat,n_latency,n_records = (2,20,200) if quick else (3,100,2000)
+    results = {}
+    for name,make_nodes in cases(quick).items():
+        results[name] = run_case(make_nodes,repeat,n_latency,n_records)
+        print(f"{name}: {results[name]}",file=sys.stderr)
+    return {"python":platform.python_version(),"machine":platform.machine(),"quick":quick,"results":results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick",action="store_true",help="run smaller graphs with fewer repetitions")
+    parser.add_argument("--output",help="write the JSON results to this file instead of the standard output")
+    args = parser.parse_args()
+    report = json.dumps(run_suite(args.quick),indent=2)
+    if args.output:
+        with open(args.output,"w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
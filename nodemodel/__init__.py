@@ -1,2 +1,3 @@
 from .model import Model
-from .utils import node,load_nodes
\ No newline at end of file
+from .utils import node,load_nodes,model_spec,nodes_from_spec
+from .cache import LRU,DiskCache
@@ -0,0 +1,381 @@
+from typing import Dict,Callable,Union,List,Tuple
+from collections.abc import Hashable
+from collections import OrderedDict
+from abc import ABC,abstractmethod
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from .helpers import code_hash
+
+def is_hashable(value)->bool:
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
+
+class NodeCache(ABC):
+    """
+    Base class of the caches of node results. A cache is attached to a function with the `@node(cache=...)` decorator
+    and `Model` calls the function through `wrap`, so that every computation of the model honors it.
+
+    Subclasses implement `key`, `lookup`, `store`, `stats` and `clear`, and update the `hits` and `misses` counters 
+    under `_lock`. `wrap` counts the calls which are not cached in `skipped`.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def key(self,f:Callable,args:tuple)->Hashable:
+        """Returns the key of a call of `f`, or None if its result must not be cached."""
+
+    @abstractmethod
+    def lookup(self,key:Hashable)->tuple:
+        """Returns (True, value) if the key is cached, (False, None) otherwise."""
+
+    @abstractmethod
+    def store(self,key:Hashable,value,elapsed:float)->None:
+        """Stores the value of a key, computed in `elapsed` seconds."""
+
+    @abstractmethod
+    def stats(self)->Dict:
+        """Returns the counters of the cache."""
+
+    @abstractmethod
+    def clear(self)->None:
+        """Removes all entries of the cache."""
+
+    def _skip(self)->None:
+        with self._lock:
+            self.skipped += 1
+
+    def wrap(self,f:Callable)->Callable:
+        """Returns a function with the same arguments as `f` whose results are cached."""
+        if inspect.iscoroutinefunction(f):
+            @functools.wraps(f)
+            async def cached(*args):
+                key = self.key(f,args)
+                if key is None:
+                    self._skip()
+                    return await f(*args)
+                found,value = self.lookup(key)
+                if not found:
+                    start = time.perf_counter()
+                    value = await f(*args)
+                    self.store(key,value,time.perf_counter() - start)
+                return value
+        else:
+            @functools.wraps(f)
+            def cached(*args):
+                key = self.key(f,args)
+                if key is None:
+                    self._skip()
+                    return f(*args)
+                found,value = self.lookup(key)
+                if not found:
+                    start = time.perf_counter()
+                    value = f(*args)
+                    self.store(key,value,time.perf_counter() - start)
+                return value
+        return cached
+
+class LRU(NodeCache):
+    """
+    A bounded in-memory cache of node results, keyed by the tuple of argument values and evicting the least recently
+    used entries.
+
+    Args:
+        maxsize (int, optional): The maximum number of entries. Defaults to 128.
+        unhashable (Union[str, Callable], optional): What to do when the arguments are not hashable:
+            - "skip": call the function without caching its result,
+            - "id": use the identity (`id`) of unhashable arguments in the key. The caller must make sure that such
+              arguments are not mutated or garbage collected while their results are cached,
+            - a function returning a hashable key from the arguments.
+            Defaults to "skip".
+
+    Example:
+        @node(cache=LRU(maxsize=10_000))
+        def country_rate(country):
+            ...
+    """
+    def __init__(self,maxsize:int=128,unhashable:Union[str,Callable]="skip"):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be a positive integer, got {maxsize}")
+        if unhashable not in ("skip","id") and not callable(unhashable):
+            raise ValueError(f"unhashable must be 'skip', 'id' or a function, got {unhashable}")
+        super().__init__()
+        self.maxsize = maxsize
+        self.unhashable = unhashable
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._function = None
+        self._wrapper = None
+
+    def key(self,f:Callable,args:tuple)->Hashable:
+        try:
+            hash(args)
+            return args
+        except TypeError:
+            if self.unhashable == "skip":
+                return None
+            elif self.unhashable == "id":
+                return tuple(arg if is_hashable(arg) else ("id",id(arg)) for arg in args)
+            return self.unhashable(*args)
+
+    def lookup(self,key:Hashable)->tuple:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True,self._data[key]
+            self.misses += 1
+            return False,None
+
+    def store(self,key:Hashable,value,elapsed:float)->None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def wrap(self,f:Callable)->Callable:
+        if self._function is not None:
+            if self._function is not f:
+                raise ValueError(f"The cache is already used by the function {self._function.__name__}")
+            return self._wrapper
+
+        self._wrapper = super().wrap(f)
+        self._function = f
+        return self._wrapper
+
+    def stats(self)->Dict:
+        return {"hits":self.hits,"misses":self.misses,"evictions":self.evictions,"skipped":self.skipped,
+                "size":len(self._data),"maxsize":self.maxsize}
+
+    def clear(self)->None:
+        with self._lock:
+            self._data.clear()
+
+
+class DiskCache(NodeCache):
+    """
+    A persistent cache of node results stored in a local directory, which survives restarts of the process and can be 
+    shared by several processes on the same machine.
+
+    Keys are content hashes combining the code of the function (see `code_hash`) with the values of its arguments. 
+    Containers are hashed canonically, so that equal sets or dictionaries give the same key whatever the order of 
+    their elements, NumPy arrays and pandas objects are hashed from their data buffers, other values from their pickled 
+    bytes (see `update_value_hash`). 
+    NumPy arrays are stored as `.npy` files and loaded memory-mapped (read-only), other results are pickled. 
+    When the total size of the stored results exceeds `max_bytes`, the least recently used results are removed.
+
+    The key does not depend on global variables or closures used by the function: the cache must be cleared when 
+    they change.
+
+    Args:
+        directory (str): The directory of the cache. It is created if it does not exist.
+        max_bytes (int, optional): The maximum total size of the stored results in bytes. Defaults to 1 GiB.
+
+    Example:
+        @node(cache=DiskCache("/tmp/nodemodel_cache", max_bytes=10 * 2**30))
+        def fitted_model(training_data):
+            ...
+    """
+    def __init__(self,directory:str,max_bytes:int=2**30):
+        if max_bytes < 1:
+            raise ValueError(f"max_bytes must be a positive integer, got {max_bytes}")
+        super().__init__()
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self.bytes_saved = 0
+        self.time_saved = 0.0
+        self._code_hashes = {}
+        os.makedirs(self.directory,exist_ok=True)
+        self._size = sum(size for _,_,size in self._entries())
+
+    def key(self,f:Callable,args:tuple)->Hashable:
+        if f not in self._code_hashes:
+            self._code_hashes[f] = code_hash(f)
+        h = hashlib.blake2b(self._code_hashes[f].encode(),digest_size=20)
+        try:
+            for arg in args:
+                update_value_hash(h,arg)
+        except (pickle.PicklingError,TypeError,AttributeError,RecursionError):
+            return None
+        return h.hexdigest()
+
+    def lookup(self,key:Hashable)->tuple:
+        path = self._path(key)
+        for extension in (".npy",".pkl"):
+            try:
+                if extension == ".npy":
+                    import numpy as np
+                    value = np.load(path + extension,mmap_mode="r",allow_pickle=False)
+                else:
+                    with open(path + extension,"rb") as f:
+                        value = pickle.load(f)
+            except (FileNotFoundError,ImportError):
+                continue
+            try:
+                with open(path + ".json") as f:
+                    meta = json.load(f)
+                os.utime(path + extension)
+            except (FileNotFoundError,ValueError):
+                meta = {"bytes":0,"elapsed":0.0}
+            with self._lock:
+                self.hits += 1
+                self.bytes_saved += meta["bytes"]
+                self.time_saved += meta["elapsed"]
+            return True,value
+        with self._lock:
+            self.misses += 1
+        return False,None
+
+    def store(self,key:Hashable,value,elapsed:float)->None:
+        path = self._path(key)
+        numpy = sys.modules.get("numpy")
+        if numpy is not None and isinstance(value,numpy.ndarray) and not value.dtype.hasobject:
+            extension = ".npy"
+            write = lambda f: numpy.save(f,value,allow_pickle=False)
+        else:
+            extension = ".pkl"
+            try:
+                data = pickle.dumps(value,protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError,TypeError,AttributeError):
+                return
+            write = lambda f: f.write(data)
+        #A result already stored under the key, by another thread or process, is replaced and no longer counted
+        replaced_size = 0
+        for stored_extension in (".npy",".pkl"):
+            try:
+                stored_size = os.path.getsize(path + stored_extension)
+                if stored_extension != extension:
+                    os.remove(path + stored_extension)
+            except OSError:
+                continue
+            replaced_size += stored_size
+        size = atomic_write(path + extension,write)
+        atomic_write(path + ".json",lambda f: f.write(json.dumps({"bytes":size,"elapsed":elapsed}).encode()))
+        with self._lock:
+            self._size += size - replaced_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def stats(self)->Dict:
+        return {"hits":self.hits,"misses":self.misses,"evictions":self.evictions,"skipped":self.skipped,
+                "bytes_saved":self.bytes_saved,"time_saved":self.time_saved,"size_bytes":self._size,
+                "max_bytes":self.max_bytes}
+
+    def clear(self)->None:
+        with self._lock:
+            for path,_,_ in self._entries():
+                remove_entry(path)
+            self._size = 0
+
+    def _path(self,key:str)->str:
+        return os.path.join(self.directory,key)
+
+    def _entries(self)->List[Tuple[str,float,int]]:
+        """Returns the stored results as tuples (path without extension, last access time, size in bytes)."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            name,extension = os.path.splitext(entry.name)
+            if extension in (".npy",".pkl"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((os.path.join(self.directory,name),stat.st_mtime,stat.st_size))
+        return entries
+
+    def _evict(self)->None:
+        """Removes the least recently used results until the total size is below `max_bytes`."""
+        entries = sorted(self._entries(),key=lambda entry: entry[1])
+        self._size = sum(size for _,_,size in entries)
+        for path,_,size in entries:
+            if self._size <= self.max_bytes:
+                break
+            remove_entry(path)
+            self._size -= size
+            self.evictions += 1
+
+def update_value_hash(h,value)->None:
+    """
+    Updates a hash with a canonical representation of a value, which does not depend on the process or on the Python 
+    version. Scalars, strings and bytes are hashed from their type and their data, tuples and lists element by element, 
+    and sets, frozensets and dictionaries from the sorted hashes of their elements, so that equal containers have the 
+    same hash whatever the order of their elements. NumPy arrays and pandas objects are hashed from their data, 
+    without pickling them. Other values are hashed from their pickled bytes.
+    """
+    numpy = sys.modules.get("numpy")
+    pandas = sys.modules.get("pandas")
+    value_type = type(value)
+    if value is None or value_type in (bool,int,float,complex):
+        h.update(repr((value_type.__name__,value)).encode())
+    elif value_type is str:
+        data = value.encode("utf-8","surrogatepass")
+        h.update(repr(("str",len(data))).encode())
+        h.update(data)
+    elif value_type in (bytes,bytearray):
+        h.update(repr((value_type.__name__,len(value))).encode())
+        h.update(value)
+    elif value_type in (tuple,list):
+        h.update(repr((value_type.__name__,len(value))).encode())
+        for element in value:
+            update_value_hash(h,element)
+    elif value_type in (set,frozenset,dict):
+        elements = value.items() if value_type is dict else value
+        h.update(repr((value_type.__name__,len(value))).encode())
+        for digest in sorted(value_digest(element) for element in elements):
+            h.update(digest)
+    elif numpy is not None and isinstance(value,numpy.ndarray) and not value.dtype.hasobject:
+        h.update(repr(("ndarray",value.dtype.str,value.shape)).encode())
+        h.update(numpy.ascontiguousarray(value).data)
+    elif pandas is not None and isinstance(value,(pandas.Series,pandas.DataFrame,pandas.Index)):
+        if isinstance(value,pandas.DataFrame):
+            h.update(repr(("DataFrame",list(value.columns),[str(k) for k in value.dtypes])).encode())
+        else:
+            h.update(repr((type(value).__name__,value.name,str(value.dtype))).encode())
+        h.update(pandas.util.hash_pandas_object(value,index=not isinstance(value,pandas.Index)).values.data)
+    else:
+        h.update(repr(("pickle",value_type.__module__,value_type.__qualname__)).encode())
+        h.update(pickle.dumps(value,protocol=4))
+
+def value_digest(value)->bytes:
+    """Returns the digest of `update_value_hash` for a single value."""
+    h = hashlib.blake2b(digest_size=20)
+    update_value_hash(h,value)
+    return h.digest()
+
+def atomic_write(path:str,write:Callable)->int:
+    """Writes a file through a temporary file, so that other processes never read a partially written file. 
+    Returns the size of the file."""
+    import tempfile
+    fd,tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),suffix=".tmp")
+    try:
+        with os.fdopen(fd,"wb") as f:
+            write(f)
+        os.replace(tmp_path,path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return os.path.getsize(path)
+
+def remove_entry(path:str)->None:
+    for extension in (".npy",".pkl",".json"):
+        try:
+            os.remove(path + extension)
+        except FileNotFoundError:
+            pass
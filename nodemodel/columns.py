@@ -0,0 +1,156 @@
+from typing import Dict,List,Callable,Tuple
+from collections.abc import Hashable
+from .plan import Plan,PlanNode,FUNCTION,VALUE,origin_name
+
+def column_steps(plan:Plan,nodes:Dict[str,Callable])->List[Tuple]:
+    """
+    Returns the steps of a computation of a plan on columns, as tuples (name, kind, function, names of the arguments,
+    value).
+
+    Functions are called once on whole columns, except the functions of nodes decorated with `@node(vectorize=False)`,
+    which are applied to every row with `np.frompyfunc` (see `row_function`). Nodes forced to values keep their value,
+    which is broadcast to the shape of the columns by `compute_columns`.
+
+    Args:
+        plan (Plan): The execution plan of the model.
+        nodes (Dict[str, Callable]): The functions of the model, whose `node_vectorize` attributes are read.
+
+    Returns:
+        List[Tuple]: One step per computed node of the plan, in order of execution.
+    """
+    return [(node_name,node.kind,column_function(node,function,nodes),args,node.value) 
+            for node,(node_name,function,args) in zip(plan.nodes,plan.steps)]
+
+def frame_steps(plan:Plan,steps:List[Tuple],nodes:Dict[str,Callable])->List[Tuple]:
+    """
+    Returns the steps of a computation of a plan on the columns of a DataFrame: the steps created by 
+    `Model._output_plan` (name, function, names of the arguments, nodes to remove after the step), where the functions
+    of nodes decorated with `@node(vectorize=False)` are applied to every row (see `row_function`).
+    """
+    return [(node_name,column_function(node,function,nodes),args,released_nodes)
+            for node,(node_name,function,args,released_nodes) in zip(plan.nodes,steps)]
+
+def column_function(node:PlanNode,function:Callable,nodes:Dict[str,Callable])->Callable:
+    """
+    Returns the function computing a node on columns: `function` itself, or `function` applied to every row (see 
+    `row_function`) if the node has arguments and its function has a `node_vectorize` attribute set to False.
+    """
+    if node.kind != FUNCTION or not node.args:
+        return function
+    f = nodes[origin_name(node.name)]
+    if getattr(f,"node_vectorize",True) is not False:
+        return function
+    return row_function(function,len(node.args),len(getattr(f,"node_outputs",())) or 1)
+
+def row_function(f:Callable,n_args:int,n_outputs:int=1)->Callable:
+    """
+    Returns a function applying `f` to every row of its argument columns, with `np.frompyfunc`. If `n_outputs` is 
+    greater than 1, `f` returns a tuple for every row and the function returns a tuple of columns.
+    """
+    import numpy as np
+    ufunc = np.frompyfunc(f,n_args,n_outputs)
+    def rows(*columns):
+        if n_outputs == 1:
+            return typed_column(ufunc(*columns))
+        return tuple(typed_column(values) for values in ufunc(*columns))
+    return rows
+
+def typed_column(values):
+    """
+    Converts the object array returned by `np.frompyfunc` to the array NumPy infers from its elements (for example
+    an array of float64), unless the elements are not scalars. Object Series are converted with `infer_objects`.
+    """
+    import numpy as np
+    if hasattr(values,"infer_objects"):
+        return values.infer_objects()
+    if not isinstance(values,np.ndarray) or values.size == 0:
+        return values
+    try:
+        typed = np.array(values.tolist())
+    except (ValueError,TypeError):
+        return values
+    return typed if typed.shape == values.shape else values
+
+def compute_columns(columns:Dict,plan:Plan,steps:List[Tuple],removed_nodes:List[Hashable])->Dict:
+    """
+    Computes a plan once on columns: every input is a NumPy array (or a scalar) holding one value per row.
+
+    The shape of the rows is the broadcast shape of the inputs. Nodes forced to values and computed nodes returning
+    scalars are broadcast to it with `np.broadcast_to`, without copying their value.
+
+    Args:
+        columns (Dict): The input columns. They are left untouched.
+        plan (Plan): The execution plan of the model.
+        steps (List[Tuple]): The steps of the plan, created by `column_steps`.
+        removed_nodes (List[Hashable]): The nodes to remove from the result.
+
+    Returns:
+        Dict: A new dictionary with the input columns and the computed columns.
+    """
+    import numpy as np
+    result = dict(columns)
+    shape = np.broadcast_shapes(*[np.shape(result[plan.names[k]]) for k in plan.inputs])
+    for node_name,kind,function,args,value in steps:
+        if kind == VALUE:
+            result[node_name] = constant_column(value,shape)
+        else:
+            result[node_name] = function(*[result[k] for k in args])
+    for removed_node in removed_nodes:
+        del result[removed_node]
+    for node in plan.nodes:
+        if node.kind == FUNCTION and node.name in result and np.ndim(result[node.name]) == 0:
+            result[node.name] = constant_column(result[node.name],shape)
+    return result
+
+def constant_column(value,shape:Tuple[int,...]):
+    """Returns a read-only array of the given shape whose every element is `value`."""
+    import numpy as np
+    array = np.asarray(value)
+    if array.ndim > 0 or array.dtype.hasobject:
+        array = np.empty((),dtype=object)
+        array[()] = value
+    return np.broadcast_to(array,shape)
+
+def compute_frame(frame,input_names:List[Hashable],steps:List[Tuple],chunk_size:int=None):
+    """
+    Computes a plan on the columns of a DataFrame and returns the frame with the computed columns attached.
+
+    Node functions are called with Series. Intermediate nodes are released after their last consumer, so auxiliary
+    nodes and other nodes which are not retained never become columns. The retained columns are collected in a
+    dictionary, wrapped in a DataFrame without consolidating (copying) them into a single block, and attached to 
+    `frame` with a single `pd.concat`, which does not copy the columns of `frame`. Unlike successive column 
+    assignments, this does not insert the columns one by one into the frame.
+
+    Args:
+        frame (pd.DataFrame): The input frame. It is left untouched.
+        input_names (List[Hashable]): The names of the inputs of the plan, read from the columns of `frame`.
+        steps (List[Tuple]): The steps of the plan, created by `frame_steps`.
+        chunk_size (int, optional): If given, the plan is computed on slices of at most `chunk_size` rows, so that the 
+            memory of intermediate nodes is bounded by the size of a slice. Defaults to None.
+
+    Returns:
+        pd.DataFrame: The columns of `frame` followed by the computed columns. Columns of `frame` with the name of a 
+        computed node are replaced.
+    """
+    import pandas as pd
+    if chunk_size is None or len(frame) <= chunk_size:
+        chunks = [frame]
+    else:
+        chunks = [frame.iloc[k:k + chunk_size] for k in range(0,len(frame),chunk_size)]
+    computed = []
+    for chunk in chunks:
+        values = {k:chunk[k] for k in input_names}
+        for node_name,function,args,released_nodes in steps:
+            values[node_name] = function(*[values[k] for k in args])
+            for k in released_nodes:
+                del values[k]
+        for k in input_names:
+            del values[k]
+        computed.append(pd.DataFrame(values,index=chunk.index,copy=False))
+    computed = computed[0] if len(computed) == 1 else pd.concat(computed)
+    replaced_columns = [k for k in computed.columns if k in frame.columns]
+    if replaced_columns:
+        frame = frame.drop(columns=replaced_columns)
+    #Copy-on-write (the default from pandas 3) never copies the inputs of concat:
+    copy = {} if int(pd.__version__.split(".")[0]) >= 3 else {"copy":False}
+    return pd.concat([frame,computed],axis=1,**copy)
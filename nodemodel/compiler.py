@@ -0,0 +1,225 @@
+from typing import Dict,List,Callable,Tuple
+from collections.abc import Hashable
+import ast
+import itertools
+import linecache
+from .plan import Plan,VALUE,ALIAS,ITEM,identity
+from .lazy import Thunk
+
+_compiled_counter = itertools.count()
+#Value of the variables of deferred nodes which are not computed yet
+MISSING = object()
+
+def compile_model(plan:Plan)->Callable:
+    """
+    Generates and compiles a straight-line Python function that computes the model.
+
+    The generated code keeps every node value in a local variable instead of reading it back from the input dictionary,
+    calls the node functions directly, inlines nodes forced to values as constants, replaces nodes forced to other
+    nodes with plain aliases and unpacks the outputs of multi-output functions by indexing. Auxiliary nodes are only written to the dictionary when they are requested.
+
+    Args:
+        plan (Plan): The execution plan of the model.
+
+    Returns:
+        Callable: The compiled function, with the same signature and result as `Model.compute`:
+        `compute(input, keep_auxiliary_nodes=False, **kwargs)`.
+    """
+    namespace = {}
+    variables,lines,aux_lines = generate_body(plan,namespace)
+    source = ["def compute(input,keep_auxiliary_nodes=False,**kwargs):",
+              "    if kwargs:",
+              "        input.update(kwargs)"]
+    source += [f"    {line}" for line in lines]
+    if aux_lines:
+        source.append("    if keep_auxiliary_nodes:")
+        source += [f"        {line}" for line in aux_lines]
+    source += ["    for k in kwargs:",
+               "        del input[k]",
+               "    return input"]
+    return exec_source("\n".join(source) + "\n",namespace)
+
+def compile_batch(plan:Plan,outputs:List[Hashable]=None,keep_auxiliary_nodes:bool=False,lazy:Tuple=None)->Callable:
+    """
+    Generates and compiles a function computing the model on every record of an iterable.
+
+    The loop over the records is part of the generated code, so that everything which does not depend on a record 
+    (node lookups, handling of auxiliary nodes, selection of outputs) is resolved once at compilation time.
+
+    Args:
+        plan (Plan): The execution plan of the model.
+        outputs (List[Hashable], optional): If given, a new dictionary with only these keys is built for every record 
+            and the records are left untouched. Defaults to None.
+        keep_auxiliary_nodes (bool, optional): Whether to write auxiliary nodes into the records. Ignored when `outputs` 
+            is given. Defaults to False.
+        lazy (Tuple, optional): The eager and deferred steps of the plan created by `lazy_steps`, if some functions 
+            have lazy arguments. See `generate_lazy_body`. Defaults to None.
+
+    Returns:
+        Callable: A function `compute_many(records)` returning the list of results.
+    """
+    namespace = {}
+    if lazy is not None:
+        variables,lines = generate_lazy_body(plan,namespace,*lazy,write=outputs is None,
+                                             keep_auxiliary_nodes=keep_auxiliary_nodes and outputs is None)
+        aux_lines = []
+    else:
+        variables,lines,aux_lines = generate_body(plan,namespace,write=outputs is None)
+    source = ["def compute_many(records):",
+              "    results = []",
+              "    append = results.append",
+              "    for input in records:"]
+    source += [f"        {line}" for line in lines]
+    if outputs is not None:
+        items = []
+        for k in outputs:
+            if k in variables:
+                items.append(f"{constant(namespace,k)}:{variables[k]}")
+            else:
+                items.append(f"{constant(namespace,k)}:input[{constant(namespace,k)}]")
+        source.append(f"        append({{{','.join(items)}}})")
+    else:
+        if keep_auxiliary_nodes:
+            source += [f"        {line}" for line in aux_lines]
+        source.append("        append(input)")
+    source.append("    return results")
+    return exec_source("\n".join(source) + "\n",namespace)
+
+def generate_body(plan:Plan,namespace:Dict,write:bool=True)->Tuple[Dict[Hashable,str],List[str],List[str]]:
+    """
+    Generates the lines computing the nodes of a plan on a dictionary called `input`.
+
+    Returns the local variable (or constant) holding each node value, the computation lines, which also write 
+    non-auxiliary nodes into `input` if `write` is True, and the lines writing auxiliary nodes into `input`.
+    """
+    auxiliary_nodes = set(plan.auxiliary_nodes)
+    variables = {}
+    lines = []
+    aux_lines = []
+
+    def reference(name:Hashable)->str:
+        #Variable holding the value of a node, read from the input dictionary the first time it is needed
+        if name not in variables:
+            variables[name] = f"v{len(variables)}"
+            lines.append(f"{variables[name]} = input[{constant(namespace,name)}]")
+        return variables[name]
+
+    for node in plan.nodes:
+        if node.kind == VALUE:
+            variables[node.name] = constant(namespace,node.value)
+        elif node.kind == ALIAS:
+            variables[node.name] = reference(plan.names[node.args[0]])
+        elif node.kind == ITEM:
+            value = f"v{len(variables)}"
+            lines.append(f"{value} = {reference(plan.names[node.args[0]])}[{node.value}]")
+            variables[node.name] = value
+        else:
+            call_input = ",".join(reference(plan.names[k]) for k in node.args)
+            function_name = f"f{len(namespace)}"
+            namespace[function_name] = node.function
+            value = f"v{len(variables)}"
+            lines.append(f"{value} = {function_name}({call_input})")
+            variables[node.name] = value
+        assignment = f"input[{constant(namespace,node.name)}] = {variables[node.name]}"
+        if node.id in auxiliary_nodes:
+            aux_lines.append(assignment)
+        elif write:
+            lines.append(assignment)
+    return variables,lines,aux_lines
+
+def generate_lazy_body(plan:Plan,namespace:Dict,eager_steps:List[Tuple],deferred_steps:Dict[Hashable,List[Tuple]],
+                       write:bool=True,keep_auxiliary_nodes:bool=False)->Tuple[Dict[Hashable,str],List[str]]:
+    """
+    Generates the lines computing the steps created by `lazy_steps` on a dictionary called `input`, inside a function.
+
+    Every deferred node has a local variable set to a sentinel. Every deferred lazy argument has a nested function 
+    computing its deferred steps whose variables still hold the sentinel, and is passed to functions as a `Thunk` of 
+    this nested function, so that its steps are only executed when the thunk is called. Other lazy arguments are 
+    passed as thunks of their values. Inputs are read from `input` when they are used. Deferred nodes which are not 
+    computed are removed from `input` if they would have been written into it.
+
+    Returns the local variable holding each computed node and the lines. Computed nodes are written into `input` if 
+    `write` is True, except auxiliary nodes which are written if `keep_auxiliary_nodes` is True.
+    """
+    offset = len(plan.inputs)
+    auxiliary_nodes = {plan.names[k] for k in plan.auxiliary_nodes}
+    steps = eager_steps + [step for target_steps in deferred_steps.values() for step in target_steps]
+    variables = {step[0]:f"v{plan.ids[step[0]]}" for step in steps}
+    thunks = {target:f"t{plan.ids[target]}" for target in deferred_steps}
+    namespace.update(Thunk=Thunk,identity=identity,MISSING=MISSING)
+
+    def argument(name:Hashable,lazy:bool)->str:
+        if name in thunks and lazy:
+            return f"Thunk({thunks[name]},None)"
+        elif name in variables:
+            return f"Thunk(identity,{variables[name]})" if lazy else variables[name]
+        elif lazy:
+            return f"Thunk(input.__getitem__,{constant(namespace,name)})"
+        return f"input[{constant(namespace,name)}]"
+
+    def step_lines(step:Tuple)->List[str]:
+        node_name,function,args,positions = step
+        node = plan.nodes[plan.ids[node_name] - offset]
+        if node.kind == VALUE:
+            value = constant(namespace,node.value)
+        elif node.kind == ALIAS:
+            value = argument(args[0],False)
+        elif node.kind == ITEM:
+            value = f"{argument(args[0],False)}[{node.value}]"
+        else:
+            function_name = f"f{len(namespace)}"
+            namespace[function_name] = function
+            value = f"{function_name}({','.join(argument(k,position in positions) for position,k in enumerate(args))})"
+        lines = [f"{variables[node_name]} = {value}"]
+        if keep_auxiliary_nodes if node_name in auxiliary_nodes else write:
+            lines.append(f"input[{constant(namespace,node_name)}] = {variables[node_name]}")
+        return lines
+
+    lines = []
+    deferred_variables = sorted({variables[step[0]] for target_steps in deferred_steps.values() for step in target_steps})
+    if deferred_variables:
+        lines.append(f"{' = '.join(deferred_variables)} = MISSING")
+    for target,target_steps in deferred_steps.items():
+        lines.append(f"def {thunks[target]}(_):")
+        lines.append(f"    nonlocal {','.join(variables[step[0]] for step in target_steps)}")
+        for step in target_steps:
+            lines.append(f"    if {variables[step[0]]} is MISSING:")
+            lines += [f"        {line}" for line in step_lines(step)]
+        lines.append(f"    return {variables[target]}")
+    for step in eager_steps:
+        lines += step_lines(step)
+    #Deferred nodes which were not computed for this record are removed, like in `compute_lazy`
+    for node_name in sorted({step[0] for target_steps in deferred_steps.values() for step in target_steps},key=plan.ids.get):
+        if keep_auxiliary_nodes if node_name in auxiliary_nodes else write:
+            lines.append(f"if {variables[node_name]} is MISSING:")
+            lines.append(f"    input.pop({constant(namespace,node_name)},None)")
+    return variables,lines
+
+def constant(namespace:Dict,value:Hashable)->str:
+    """Returns a literal for simple values, otherwise stores the value in the namespace and returns its name."""
+    if is_literal(value):
+        return repr(value)
+    name = f"c{len(namespace)}"
+    namespace[name] = value
+    return name
+
+def is_literal(value:Hashable)->bool:
+    """Checks whether `repr(value)` evaluates back to an equal value of the same type."""
+    if isinstance(value,tuple):
+        return type(value) is tuple and all(is_literal(k) for k in value)
+    if type(value) not in (str,int,float,bool,type(None)):
+        return False
+    try:
+        return ast.literal_eval(repr(value)) == value
+    except (ValueError,SyntaxError):
+        return False
+
+def exec_source(source:str,namespace:Dict)->Callable:
+    """Compiles the generated source, registers it in `linecache` for readable tracebacks and returns the function."""
+    filename = f"<nodemodel-compiled-{next(_compiled_counter)}>"
+    linecache.cache[filename] = (len(source),None,source.splitlines(True),filename)
+    local_namespace = {}
+    exec(compile(source,filename,"exec"),namespace,local_namespace)
+    function = next(iter(local_namespace.values()))
+    function.__source__ = source
+    return function
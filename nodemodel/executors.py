@@ -0,0 +1,250 @@
+from typing import Dict,List,Tuple,Union,Iterable,Iterator,Callable
+from collections.abc import Hashable
+from collections import deque
+from concurrent.futures import Executor,ThreadPoolExecutor,ProcessPoolExecutor,wait,FIRST_COMPLETED
+import asyncio
+import functools
+import inspect
+import itertools
+import os
+from .plan import Plan,FUNCTION
+
+def dependencies(plan:Plan)->Tuple[List[int],List[List[int]]]:
+    """
+    Returns, for every computed node of a plan (indexed by its position in `plan.nodes`), the number of distinct nodes 
+    it waits for and the positions of the nodes waiting for it. Inputs of the model are not counted as they are available 
+    before the computation starts.
+    """
+    offset = len(plan.inputs)
+    counts = []
+    dependents = [[] for _ in plan.nodes]
+    for position,node in enumerate(plan.nodes):
+        node_dependencies = {k - offset for k in node.args if k >= offset}
+        counts.append(len(node_dependencies))
+        for k in node_dependencies:
+            dependents[k].append(position)
+    return counts,dependents
+
+def compute_with_executor(input:Dict,plan:Plan,dependencies:Tuple[List[int],List[List[int]]],
+                          executor:Union[str,Executor]="threads",max_workers:int=None)->Dict:
+    """
+    Computes the nodes of a plan on the input dictionary, submitting every node to an executor as soon as all
+    its predecessors are computed. Nodes forced to values or to other nodes are computed directly in the calling thread.
+
+    The computed values are written into `input` in the order of the plan once all the nodes are computed, so that
+    the result is identical to a sequential computation.
+
+    Args:
+        input (Dict): The input dictionary.
+        plan (Plan): The execution plan of the model.
+        dependencies (Tuple[List[int], List[List[int]]]): The result of the `dependencies` function.
+        executor (Union[str, Executor], optional): "threads" to run the nodes in a new `ThreadPoolExecutor`, or an
+            existing `concurrent.futures.Executor`. Defaults to "threads".
+        max_workers (int, optional): The maximum number of threads of a new `ThreadPoolExecutor`. Defaults to None.
+
+    Returns:
+        Dict: The input dictionary with the computed nodes.
+    """
+    if isinstance(executor,Executor):
+        _run(input,plan,dependencies,executor)
+    elif executor == "threads":
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            _run(input,plan,dependencies,pool)
+    else:
+        raise ValueError(f"Unknown executor: {executor}")
+    return input
+
+def _run(input:Dict,plan:Plan,dependencies:Tuple[List[int],List[List[int]]],pool:Executor)->None:
+    counts,dependents = dependencies
+    counts = list(counts)
+    offset = len(plan.inputs)
+    values = [None] * len(plan.nodes)
+    ready = deque(position for position,count in enumerate(counts) if count == 0)
+    pending = {}
+
+    def release(position:int):
+        for dependent in dependents[position]:
+            counts[dependent] -= 1
+            if counts[dependent] == 0:
+                ready.append(dependent)
+
+    try:
+        while ready or pending:
+            while ready:
+                position = ready.popleft()
+                node = plan.nodes[position]
+                call_input = [values[k - offset] if k >= offset else input[plan.names[k]] for k in node.args]
+                if node.kind != FUNCTION:
+                    values[position] = node.function(*call_input)
+                    release(position)
+                else:
+                    pending[pool.submit(node.function,*call_input)] = position
+            if pending:
+                done,_ = wait(pending,return_when=FIRST_COMPLETED)
+                for future in done:
+                    position = pending.pop(future)
+                    values[position] = future.result()
+                    release(position)
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        raise
+    for node,value in zip(plan.nodes,values):
+        input[node.name] = value
+
+
+async def compute_async(input:Dict,plan:Plan,offload_sync:bool=False)->Dict:
+    """
+    Computes the nodes of a plan on the input dictionary with `asyncio`. Every node is an `asyncio` task awaiting 
+    the tasks of its predecessors, so that each node starts as soon as its inputs are ready. Coroutine functions 
+    (`async def`) are awaited and regular functions are called in the event loop, or in the default executor of the 
+    loop if `offload_sync` is True.
+
+    The computed values are written into `input` in the order of the plan once all the nodes are computed, so that
+    the result is identical to a sequential computation.
+
+    Args:
+        input (Dict): The input dictionary.
+        plan (Plan): The execution plan of the model.
+        offload_sync (bool, optional): Whether to run regular functions in a thread. Defaults to False.
+
+    Returns:
+        Dict: The input dictionary with the computed nodes.
+    """
+    loop = asyncio.get_running_loop()
+    offset = len(plan.inputs)
+    tasks = []
+
+    async def run(node):
+        call_input = [(await tasks[k - offset]) if k >= offset else input[plan.names[k]] for k in node.args]
+        if offload_sync and node.kind == FUNCTION and not inspect.iscoroutinefunction(node.function):
+            value = await loop.run_in_executor(None,functools.partial(node.function,*call_input))
+        else:
+            value = node.function(*call_input)
+        if inspect.isawaitable(value):
+            value = await value
+        return value
+
+    for node in plan.nodes:
+        tasks.append(loop.create_task(run(node)))
+    try:
+        values = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks,return_exceptions=True)
+        raise
+    for node,value in zip(plan.nodes,values):
+        input[node.name] = value
+    return input
+
+
+_worker_model = None
+
+def _init_worker(spec:Dict[str,Dict],model_options:Dict)->None:
+    """Builds the model of a worker process once, from the specification of its nodes and the options of the model."""
+    global _worker_model
+    from .model import Model
+    from .utils import nodes_from_spec
+    _worker_model = Model(nodes_from_spec(spec),**model_options)
+
+def _compute_chunk(records:List[Dict],outputs:List[Hashable],keep_auxiliary_nodes:bool)->List[Dict]:
+    return _worker_model.compute_many(records,outputs=outputs,keep_auxiliary_nodes=keep_auxiliary_nodes)
+
+def chunks(records:Iterable,chunksize:int)->Iterator[List]:
+    """Lazily splits an iterable into lists of at most `chunksize` elements."""
+    iterator = iter(records)
+    while True:
+        chunk = list(itertools.islice(iterator,chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_compute_with_processes(spec:Dict[str,Dict],records:Iterable[Dict],outputs:List[Hashable]=None,
+                                keep_auxiliary_nodes:bool=False,max_workers:int=None,
+                                chunksize:int=1000,ordered:bool=True,
+                                model_options:Dict=None)->Iterator[List[Dict]]:
+    """
+    Computes a model on records in a pool of processes and yields the results chunk by chunk.
+
+    Every worker process builds the model once from `spec` and `model_options` when it starts. Records are read lazily and sent to the 
+    workers in chunks of `chunksize` records, with at most two chunks in flight per worker, so that memory stays bounded 
+    for long iterables (see `iter_compute_in_pool`).
+
+    Args:
+        spec (Dict[str, Dict]): The specification of the nodes of the model, created by `model_spec`.
+        records (Iterable[Dict]): The input dictionaries.
+        outputs (List[Hashable], optional): See `Model.compute_many`. Defaults to None.
+        keep_auxiliary_nodes (bool, optional): See `Model.compute_many`. Defaults to False.
+        max_workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        chunksize (int, optional): The number of records sent to a worker at once. Defaults to 1000.
+        ordered (bool, optional): Whether chunks are yielded in the order of the records, or as soon as they are 
+            computed. Defaults to True.
+        model_options (Dict, optional): The keyword arguments of `Model` used to build the model, like 
+            `assume_pure`. Defaults to None.
+
+    Yields:
+        List[Dict]: The results of a chunk of records.
+    """
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be a positive integer, got {chunksize}")
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers,initializer=_init_worker,initargs=(spec,model_options or {})) as pool:
+        yield from iter_compute_in_pool(pool,_compute_chunk,(outputs,keep_auxiliary_nodes),records,chunksize,
+                                        2 * max_workers,ordered)
+
+def iter_compute_with_threads(compute_batch:Callable,records:Iterable[Dict],executor:Union[str,Executor]="threads",
+                              max_workers:int=None,chunksize:int=1000,ordered:bool=True)->Iterator[List[Dict]]:
+    """
+    Computes chunks of records with a compiled batch function (see `compile_batch`) in a pool of threads and yields 
+    the results chunk by chunk, with at most two chunks in flight per worker.
+
+    Args:
+        compute_batch (Callable): The function computing a list of records.
+        records (Iterable[Dict]): The input dictionaries.
+        executor (Union[str, Executor], optional): "threads" to use a new `ThreadPoolExecutor`, or an existing 
+            `concurrent.futures.Executor`, which is not shut down. Defaults to "threads".
+        max_workers (int, optional): The number of threads of a new pool. It also bounds the number of chunks in flight. 
+            Defaults to the number of CPUs.
+        chunksize (int, optional): The number of records computed by a task. Defaults to 1000.
+        ordered (bool, optional): Whether chunks are yielded in the order of the records. Defaults to True.
+
+    Yields:
+        List[Dict]: The results of a chunk of records.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if isinstance(executor,Executor):
+        yield from iter_compute_in_pool(executor,compute_batch,(),records,chunksize,2 * max_workers,ordered)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            yield from iter_compute_in_pool(pool,compute_batch,(),records,chunksize,2 * max_workers,ordered)
+
+def iter_compute_in_pool(pool:Executor,compute_chunk:Callable,args:tuple,records:Iterable[Dict],chunksize:int,
+                         max_in_flight:int,ordered:bool=True)->Iterator[List[Dict]]:
+    """
+    Submits `compute_chunk(chunk, *args)` to a pool for every chunk of `chunksize` records and yields the results.
+
+    Records are read lazily: a new chunk is only read when less than `max_in_flight` chunks are submitted and not 
+    yet yielded, so that memory stays bounded whatever the length of `records`. If `ordered` is False, a chunk is 
+    yielded as soon as it is computed, even if previous chunks are not. Chunks still in flight are cancelled when 
+    the generator is closed.
+    """
+    in_flight = deque() if ordered else set()
+    submit = in_flight.append if ordered else in_flight.add
+    def next_result()->List[Dict]:
+        if ordered:
+            return in_flight.popleft().result()
+        done,_ = wait(in_flight,return_when=FIRST_COMPLETED)
+        future = done.pop()
+        in_flight.remove(future)
+        return future.result()
+    try:
+        for chunk in chunks(records,chunksize):
+            submit(pool.submit(compute_chunk,chunk,*args))
+            if len(in_flight) >= max_in_flight:
+                yield next_result()
+        while in_flight:
+            yield next_result()
+    finally:
+        for future in in_flight:
+            future.cancel()
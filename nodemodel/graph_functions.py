@@ -1,7 +1,7 @@
 import networkx as nx
-from typing import List,Dict,Callable,Union
+from typing import List,Dict,Callable,Union,Tuple,FrozenSet
 from collections.abc import Hashable
-from .helpers import func_args,custom_tuple_concat
+from .helpers import func_args,custom_tuple_concat,output_sources
 
 def nodes_graph(nodes:Dict[str,Callable])->nx.DiGraph:
     """
@@ -13,7 +13,8 @@ def nodes_graph(nodes:Dict[str,Callable])->nx.DiGraph:
 
     Additionally, if a function has the `forced_nodes` attribute, extra edges are added based on the values in 
     `forced_nodes`. Specifically, if an entry in `forced_nodes` is a tuple of the form ("node", "another_node"), 
-    an edge is added from `another_node` to the function's node.
+    an edge is added from `another_node` to the function's node. If a function has the `node_outputs` attribute, 
+    an edge is added from the function's node to every node unpacked from its result.
 
     Args:
         nodes (Dict[str, Callable]): 
@@ -27,14 +28,19 @@ def nodes_graph(nodes:Dict[str,Callable])->nx.DiGraph:
     
     Raises:
         ValueError: 
-            If the graph is found to have cycles (i.e., if the dependencies between nodes create a cycle).
+            If the graph is found to have cycles (i.e., if the dependencies between nodes create a cycle), or if an 
+            output of a multi-output function is also the name of another node.
     """
 
+    #Checks that the outputs of multi-output functions are not other nodes:
+    output_sources(nodes)
     edges = []
     for node_name,node in nodes.items():
         deps = func_args(node)
         for dep in deps:
             edges.append((dep,node_name))
+        for output in getattr(node,"node_outputs",()):
+            edges.append((node_name,output))
         if hasattr(node,"forced_nodes"):
             for forced_node,forced_node_value in node.forced_nodes.items():
                 #Add an edge ("another_node",node_name) if forced_node_value = ("node","another_node"):
@@ -73,27 +79,63 @@ def model_graph(nodes_graph:nx.DiGraph,nodes:Dict[str,Callable])->nx.DiGraph:
     graph = nodes_graph.copy()
     ordered_nodes_names = list(nx.topological_sort(nodes_graph))
     cond_nodes = [k for k in ordered_nodes_names if k in nodes.keys() and hasattr(nodes[k],"forced_nodes")]
+    #Position of every node in graph, to extract subgraphs with nodes in the order of graph
+    positions = {node:position for position,node in enumerate(graph)}
+    #Names of the forced nodes among the ancestors of every node and copies made for previous conditional 
+    #functions, see `renamed_ancestors_graph`. copies is None once a renamed node takes the name of another node 
+    #or a node is forced to another node: the renamed ancestors graph is then extracted and renamed as a whole.
+    forced_names = {forced_node for cond_node in cond_nodes for forced_node in nodes[cond_node].forced_nodes}
+    ancestors_forced_names = {}
+    copies = {}
     #Modify the main graph:
     for cond_node in cond_nodes:
-        #Get graph of all ancestors of cond_node in graph + cond_node
-        cond_node_ancestors_graph = node_ancestors_graph(graph,cond_node)
         #Sort to mutualize forced values like {"a":1,"b":2} and {"b":2,"a":1}
         forced_nodes = nodes[cond_node].forced_nodes
         forced_nodes = dict(sorted(forced_nodes.items()))
-        #Modify cond_node_ancestors_graph:
-        for forced_node,forced_node_value in forced_nodes.items():
-            if forced_node in cond_node_ancestors_graph and forced_node != cond_node:
-                #Remove predecessors edges of forced_node
-                cond_node_ancestors_graph = remove_predecessors_edges(cond_node_ancestors_graph,forced_node)
-                #Rename nodes using forced_nodes info of cond_node
-                cond_node_ancestors_graph = rename_forced_node_descendants(cond_node_ancestors_graph,forced_node,forced_node_value,cond_node)
-                #If forced_node_value is another node, add an edge between this node and forced_node
-                if isinstance(forced_node_value,tuple) and len(forced_node_value) == 2 and forced_node_value[0] == "node":
-                    graph.add_edge(forced_node_value[1],(forced_node,forced_node_value))
+        renamed = None
+        if any(is_node_value(forced_node_value) for forced_node_value in forced_nodes.values()):
+            #A node forced to another node gets the other node as predecessor in graph, but not in the renamed 
+            #ancestors graph: nx.relabel_nodes merges it with the copies having the same name, which 
+            #`renamed_ancestors_graph` does not reproduce.
+            copies = None
+        if copies is not None:
+            renamed = renamed_ancestors_graph(graph,cond_node,list(forced_nodes.items()),positions,forced_names,
+                                              ancestors_forced_names,copies)
+            if renamed is None:
+                copies = None
+        if renamed is not None:
+            cond_node_ancestors_graph,forced_edges = renamed
+            for forced_node_value,forced_node in forced_edges:
+                add_edge(graph,forced_node_value,forced_node,positions)
+        else:
+            #Get graph of the ancestors of cond_node in graph which can be renamed, with their predecessors
+            cond_node_ancestors_graph = node_forced_ancestors_graph(graph,cond_node,forced_nodes.keys(),positions)
+            #Modify cond_node_ancestors_graph:
+            for forced_node,forced_node_value in forced_nodes.items():
+                if forced_node in cond_node_ancestors_graph and forced_node != cond_node:
+                    #Remove predecessors edges of forced_node
+                    cond_node_ancestors_graph = remove_predecessors_edges(cond_node_ancestors_graph,forced_node)
+                    #Rename nodes using forced_nodes info of cond_node
+                    cond_node_ancestors_graph = rename_forced_node_descendants(cond_node_ancestors_graph,forced_node,forced_node_value,cond_node)
+                    #If forced_node_value is another node, add an edge between this node and forced_node
+                    if is_node_value(forced_node_value):
+                        add_edge(graph,forced_node_value[1],(forced_node,forced_node_value),positions)
         #Remove predecessors edges of cond_node
         graph = remove_predecessors_edges(graph,cond_node)
-        #Combine cond_node_ancestors_graph with the main graph
-        graph = nx.compose(graph,cond_node_ancestors_graph)
+        #Combine cond_node_ancestors_graph with the main graph in-place.
+        #Nodes and edges of graph are kept in their order, new ones are appended like in nx.compose.
+        for node in cond_node_ancestors_graph.nodes():
+            positions.setdefault(node,len(positions))
+        graph.add_nodes_from(cond_node_ancestors_graph.nodes())
+        graph.add_edges_from(cond_node_ancestors_graph.edges())
+    return graph
+
+def plan_graph(plan)->nx.DiGraph:
+    """Rebuilds the model graph from a `Plan`: its nodes in the order of their ids and the edges from their predecessors."""
+    graph = nx.DiGraph()
+    graph.add_nodes_from(plan.names)
+    graph.add_edges_from((plan.names[k],node_name) for node_name,predecessors in zip(plan.names,plan.predecessors) 
+                         for k in predecessors)
     return graph
 
 def remove_predecessors_edges(graph:nx.DiGraph,node:str)->nx.DiGraph:
@@ -109,6 +151,206 @@ def node_ancestors_graph(graph:nx.DiGraph,node:str)->nx.DiGraph:
     node_ancestors.add(node)
     return graph.subgraph(node_ancestors).copy()
 
+def add_edge(graph:nx.DiGraph,u:Hashable,v:Hashable,positions:Dict[Hashable,int])->None:
+    """Adds an edge to the graph and records the positions of new nodes."""
+    for node in (u,v):
+        positions.setdefault(node,len(positions))
+    graph.add_edge(u,v)
+
+def forced_ancestors(graph:nx.DiGraph,node:Hashable,forced_names:set,
+                     ancestors_forced_names:Dict[Hashable,FrozenSet])->FrozenSet:
+    """
+    Returns the names of `forced_names` among the ancestors of a node, memoized in `ancestors_forced_names` for the 
+    node and its ancestors. The memoized ancestors of a node must not change afterwards: `model_graph` only queries 
+    the ancestors of the conditional function it modifies, which are final as conditional functions are modified in 
+    topological order.
+    """
+    stack = [node]
+    while stack:
+        k = stack[-1]
+        if k in ancestors_forced_names:
+            stack.pop()
+            continue
+        missing = [predecessor for predecessor in graph.pred[k] if predecessor not in ancestors_forced_names]
+        if missing:
+            stack.extend(missing)
+            continue
+        names = set()
+        for predecessor in graph.pred[k]:
+            names.update(ancestors_forced_names[predecessor])
+            if predecessor in forced_names:
+                names.add(predecessor)
+        ancestors_forced_names[k] = frozenset(names)
+        stack.pop()
+    return ancestors_forced_names[node]
+
+def is_node_value(forced_node_value)->bool:
+    """Whether a forced value is another node, written ("node", node_name)."""
+    return isinstance(forced_node_value,tuple) and len(forced_node_value) == 2 and forced_node_value[0] == "node"
+
+def copied_node_key(node:Hashable,forced_items:List[Tuple],ancestors_forced_names:Dict[Hashable,FrozenSet])->Tuple:
+    """
+    Returns the key of the copy of a node renamed by forced nodes: the node and the forced values of the node and 
+    its ancestors, which are the only ones renaming the node and its ancestors.
+    """
+    names = ancestors_forced_names[node]
+    return (node,tuple(item for item in forced_items if item[0] == node or item[0] in names))
+
+def renamable_ancestors(graph:nx.DiGraph,node:Hashable,forced_items:List[Tuple],forced_names:set,
+                        ancestors_forced_names:Dict[Hashable,FrozenSet],
+                        copies:Dict[Tuple,Tuple])->Tuple[List[Hashable],Dict[Hashable,Tuple]]:
+    """
+    Finds the ancestors of a conditional function which are renamed by its forced nodes: the forced nodes and their 
+    descendants among the ancestors of the function. Other ancestors are neither renamed nor modified by 
+    `model_graph`. 
+
+    The search walks backward from the function through the ancestors which depend on a forced node, and stops at 
+    the nodes whose copy with the same forced values was already made for another conditional function: the copy 
+    and all its ancestors are already in the graph.
+
+    Returns:
+        Tuple[List[Hashable], Dict[Hashable, Tuple]]: The renamable ancestors and the function, in topological order, 
+        and the (name, renamings) of the copies already made, by node.
+    """
+    forced_nodes = {forced_node for forced_node,_ in forced_items}
+    renamable_nodes = {node}
+    copied_nodes = {}
+    stack = [node]
+    while stack:
+        for predecessor in graph.pred[stack.pop()]:
+            if predecessor in renamable_nodes:
+                continue
+            names = forced_ancestors(graph,predecessor,forced_names,ancestors_forced_names)
+            if predecessor in forced_nodes or not forced_nodes.isdisjoint(names):
+                renamable_nodes.add(predecessor)
+                key = copied_node_key(predecessor,forced_items,ancestors_forced_names)
+                if key in copies:
+                    copied_nodes[predecessor] = copies[key]
+                else:
+                    stack.append(predecessor)
+    #Topological order of the renamable nodes, copied nodes first
+    ordered_nodes = [k for k in renamable_nodes if k in copied_nodes]
+    visited = set(ordered_nodes)
+    for start in renamable_nodes:
+        stack = [(start,False)]
+        while stack:
+            k,expanded = stack.pop()
+            if expanded:
+                ordered_nodes.append(k)
+            elif k not in visited:
+                visited.add(k)
+                stack.append((k,True))
+                stack.extend((predecessor,False) for predecessor in graph.pred[k] 
+                             if predecessor in renamable_nodes and predecessor not in visited)
+    return ordered_nodes,copied_nodes
+
+def renamed_ancestors_graph(graph:nx.DiGraph,node:Hashable,forced_items:List[Tuple],positions:Dict[Hashable,int],
+                            forced_names:set,ancestors_forced_names:Dict[Hashable,FrozenSet],
+                            copies:Dict[Tuple,Tuple])->Tuple[nx.DiGraph,List[Tuple]]:
+    """
+    Returns the graph of the renamed ancestors of a conditional function built by `model_graph` (see 
+    `node_forced_ancestors_graph` and `rename_forced_node_descendants`), without visiting the copies made before 
+    for other conditional functions with the same forced values: the cost only depends on the number of new copies.
+
+    Forced nodes rename their descendants in the order of `forced_items`, as in `model_graph`. A copy is identified 
+    by the node and the forced values of the node and its ancestors (see `copied_node_key`), which are the only ones 
+    renaming the node and its ancestors, and is recorded in `copies` with its name and renamings. The names of the 
+    forced nodes among the ancestors of every node are memoized in `ancestors_forced_names`.
+
+    Returns:
+        Tuple[nx.DiGraph, List[Tuple]]: The graph of the renamed ancestors with their predecessors, in the order of 
+        `graph`, and the edges to add from nodes to the forced nodes forced to them. None if a renamed node takes 
+        the name of another node: nx.relabel_nodes merges such nodes, which is left to `model_graph`.
+    """
+    ordered_nodes,copied_nodes = renamable_ancestors(graph,node,forced_items,forced_names,ancestors_forced_names,
+                                                     copies)
+    renamings = {k:[] if k not in copied_nodes else list(copied_nodes[k][1]) for k in ordered_nodes}
+    cut_nodes = set()
+    forced_edges = []
+    for forced_node,forced_node_value in forced_items:
+        forced_item = (forced_node,forced_node_value)
+        #forced_node renames its descendants unless it was renamed by a previous forced node. If it is behind 
+        #copies made before, the renamings of the copies tell which ones are its descendants.
+        renamed = forced_node in renamings and forced_node != node and \
+                  not any(item[0] < forced_node for item in renamings[forced_node])
+        reached_nodes = {forced_node} if renamed else set()
+        if renamed:
+            cut_nodes.add(forced_node)
+            if is_node_value(forced_node_value):
+                forced_edges.append((forced_node_value[1],forced_item))
+        for k in ordered_nodes:
+            if k in copied_nodes:
+                if forced_item in copied_nodes[k][1]:
+                    reached_nodes.add(k)
+            elif k not in cut_nodes and not reached_nodes.isdisjoint(graph.pred[k]):
+                reached_nodes.add(k)
+        for k in reached_nodes:
+            if k != node and k not in copied_nodes:
+                renamings[k].append(forced_item)
+    names = {}
+    taken_names = set()
+    for k in ordered_nodes:
+        name = k
+        if k in copied_nodes:
+            name = copied_nodes[k][0]
+        else:
+            for forced_item in renamings[k]:
+                name = forced_item if forced_item[0] == k else custom_tuple_concat(name,forced_item)
+                if name in graph or name in taken_names:
+                    return None
+                taken_names.add(name)
+        names[k] = name
+    for k in ordered_nodes:
+        if k != node and k not in copied_nodes:
+            copies[copied_node_key(k,forced_items,ancestors_forced_names)] = (names[k],tuple(renamings[k]))
+    #Renamed nodes with their predecessors and edges, in the order of graph. Copies already have their edges.
+    subgraph_nodes = set(names).union(*(graph.pred[k] for k in names if k not in copied_nodes))
+    subgraph_nodes = sorted(subgraph_nodes,key=positions.__getitem__)
+    subgraph = nx.DiGraph()
+    subgraph.add_nodes_from(names.get(k,k) for k in subgraph_nodes)
+    subgraph.add_edges_from((names.get(u,u),names[v]) for u in subgraph_nodes for v in graph.succ[u] 
+                            if v in names and v not in copied_nodes and v not in cut_nodes)
+    return subgraph,forced_edges
+
+def node_forced_ancestors_graph(graph:nx.DiGraph,node:str,forced_nodes:List[str],
+                                positions:Dict[Hashable,int]=None)->nx.DiGraph:
+    """
+    Extracts a subgraph containing a node and those of its ancestors which can be renamed by its forced nodes: 
+    the forced nodes and their descendants among the ancestors of the node. The predecessors of these nodes are 
+    included as well, so that the subgraph contains all the edges that have to be redirected to renamed nodes.
+
+    Other ancestors are neither renamed nor modified by `model_graph`, so the result of `model_graph` is the same as 
+    with the whole `node_ancestors_graph`. All the ancestors of the node are still visited: `model_graph` only uses 
+    this function when `renamed_ancestors_graph` cannot be used. If `positions` of the nodes in `graph` are given, nodes and edges of the subgraph follow the order of `graph`.
+    """
+    node_ancestors = {node}
+    stack = [node]
+    predecessors = graph.pred
+    while stack:
+        for predecessor in predecessors[stack.pop()]:
+            if predecessor not in node_ancestors:
+                node_ancestors.add(predecessor)
+                stack.append(predecessor)
+    renamable_nodes = {forced_node for forced_node in forced_nodes if forced_node in node_ancestors}
+    stack = list(renamable_nodes)
+    successors = graph.succ
+    while stack:
+        for successor in successors[stack.pop()]:
+            if successor in node_ancestors and successor not in renamable_nodes:
+                renamable_nodes.add(successor)
+                stack.append(successor)
+    renamable_nodes.add(node)
+    subgraph_nodes = set(renamable_nodes)
+    for renamable_node in renamable_nodes:
+        subgraph_nodes.update(graph.predecessors(renamable_node))
+    if positions is None:
+        return graph.subgraph(subgraph_nodes).copy()
+    subgraph = nx.DiGraph()
+    ordered_nodes = sorted(subgraph_nodes,key=positions.__getitem__)
+    subgraph.add_nodes_from(ordered_nodes)
+    subgraph.add_edges_from((u,v) for u in ordered_nodes for v in graph.successors(u) if v in subgraph_nodes)
+    return subgraph
+
 def rename_forced_node_descendants(graph:nx.DiGraph,forced_node:str,forced_node_value:Hashable,
                                    skip_nodes:Union[str,List[str]])->nx.DiGraph:
     """
@@ -1,13 +1,39 @@
 from typing import List,Callable,Union,Dict
 from collections.abc import Hashable
 import os
+import hashlib
 import importlib
-from types import ModuleType
+from types import ModuleType,CodeType
 
 def func_args(f:Callable)->List[str]:
     """Returns a list of the function's argument names."""
     return list(f.__code__.co_varnames[:f.__code__.co_argcount])
 
+def node_dependencies(f:Callable)->List[str]:
+    """Returns the names of the nodes a function depends on: its arguments and the nodes its forced nodes are forced to."""
+    dependencies = func_args(f)
+    for forced_node_value in getattr(f,"forced_nodes",{}).values():
+        if isinstance(forced_node_value,tuple) and len(forced_node_value) == 2 and forced_node_value[0] == "node":
+            dependencies.append(forced_node_value[1])
+    return dependencies
+
+def output_sources(nodes:Dict[str,Callable])->Dict[str,str]:
+    """
+    Returns the nodes unpacked from the results of multi-output functions, i.e. functions with a `node_outputs` 
+    attribute, mapped to the names of these functions: {"mean": "stats", "std": "stats"} for 
+    `stats.node_outputs = ("mean", "std")`.
+
+    Raises:
+        ValueError: If an output is also the name of a function or an output of another function.
+    """
+    sources = {}
+    for node_name,f in nodes.items():
+        for output in getattr(f,"node_outputs",()):
+            if output in nodes or output in sources:
+                raise ValueError(f"The output {output} of {node_name} is already a node of the model")
+            sources[output] = node_name
+    return sources
+
 def custom_tuple_concat(a:Union[Hashable,tuple], b:Union[Hashable,tuple])->tuple:
     """Concatenation that ensures both values are converted to tuples."""
     if not isinstance(a, tuple):
@@ -16,6 +42,21 @@ def custom_tuple_concat(a:Union[Hashable,tuple], b:Union[Hashable,tuple])->tuple
         b = (b,)
     return a + b
 
+def code_hash(f:Callable)->str:
+    """Returns a hash of the code of a function: its bytecode, constants and names, including nested functions."""
+    h = hashlib.blake2b(digest_size=16)
+    update_code_hash(h,f.__code__)
+    return h.hexdigest()
+
+def update_code_hash(h,code:CodeType)->None:
+    h.update(code.co_code)
+    h.update(repr((code.co_names,code.co_varnames,code.co_argcount)).encode())
+    for const in code.co_consts:
+        if isinstance(const,CodeType):
+            update_code_hash(h,const)
+        else:
+            h.update(repr(const).encode())
+
 def import_modules_from_dir(module_dir:str)-> Dict:
     """Imports all modules and submodules from a directory and stores them in a dictionary."""
     imported_dict = {}
@@ -33,4 +74,67 @@ def import_module(module_name:str, module_path:str)-> ModuleType:
     module_spec = importlib.util.spec_from_file_location(module_name, module_path)
     module = importlib.util.module_from_spec(module_spec)
     module_spec.loader.exec_module(module)
-    return module
\ No newline at end of file
+    return module
+
+#Attributes set by the `node` decorator which are sent to worker processes with the references of the functions
+NODE_ATTRIBUTES = ("forced_nodes","node_outputs","node_lazy","node_pure","node_vectorize")
+
+def node_reference(node_name:str,f:Callable)->Dict:
+    """
+    Returns a picklable reference to a node function: the module and qualified name of the function, the file where it 
+    is defined (for functions imported from a directory by `load_nodes`), its attributes listed in `NODE_ATTRIBUTES`
+    and the class of its `node_cache` attribute.
+    """
+    qualname = getattr(f,"__qualname__",None)
+    code = getattr(f,"__code__",None)
+    if qualname is None or code is None or "<locals>" in qualname or "<lambda>" in qualname:
+        raise ValueError(f"The function of node '{node_name}' cannot be referenced by its module: {f}")
+    reference = {"module":f.__module__,"qualname":qualname,"filename":code.co_filename,
+                 "node_cache":cache_class(getattr(f,"node_cache",None))}
+    reference.update((attribute,getattr(f,attribute,None)) for attribute in NODE_ATTRIBUTES)
+    return reference
+
+def cache_class(cache)->str:
+    """Returns the qualified name of the class of a cache, or None."""
+    return None if cache is None else f"{type(cache).__module__}.{type(cache).__qualname__}"
+
+def resolve_node_reference(reference:Dict,imported_files:Dict[str,ModuleType]=None)->Callable:
+    """
+    Returns the function of a reference created by `node_reference`. The function is imported from its module if this 
+    module is importable and defines it in the same file, otherwise it is imported from its file. 
+    Modules imported from files are stored in `imported_files` so that each file is executed once.
+
+    The attributes of `NODE_ATTRIBUTES` are set (or removed) as in the referenced function. Caches are not sent: the
+    imported function must have a `node_cache` of the same class, for instance set by the `node` decorator.
+
+    Raises:
+        ValueError: If the `node_cache` attribute of the imported function differs from the referenced one.
+    """
+    imported_files = {} if imported_files is None else imported_files
+    filename = reference["filename"]
+    f = None
+    try:
+        f = get_qualname(importlib.import_module(reference["module"]),reference["qualname"])
+    except (ImportError,AttributeError):
+        pass
+    if f is None or getattr(getattr(f,"__code__",None),"co_filename",None) != filename:
+        if filename not in imported_files:
+            module_name = os.path.basename(filename).split(".")[0]
+            imported_files[filename] = import_module(module_name,filename)
+        f = get_qualname(imported_files[filename],reference["qualname"])
+    for attribute in NODE_ATTRIBUTES:
+        if reference[attribute] is not None:
+            setattr(f,attribute,reference[attribute])
+        elif hasattr(f,attribute):
+            delattr(f,attribute)
+    if cache_class(getattr(f,"node_cache",None)) != reference["node_cache"]:
+        raise ValueError(f"The node_cache attribute of {reference['qualname']} was changed after its module was "
+                         "imported: caches cannot be sent to worker processes")
+    return f
+
+def get_qualname(module:ModuleType,qualname:str)->Callable:
+    """Returns the object of a module designated by a qualified name like 'A.f'."""
+    obj = module
+    for name in qualname.split("."):
+        obj = getattr(obj,name)
+    return obj
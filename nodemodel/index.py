@@ -0,0 +1,162 @@
+from typing import Dict,List,Tuple,NamedTuple,Set
+import ast
+import hashlib
+import os
+import pickle
+from .cache import atomic_write
+
+class IndexedNode(NamedTuple):
+    """
+    A node function found in a source file without importing it.
+
+    Attributes:
+        name (str): The name of the function.
+        filename (str): The path of the file defining the function.
+        lineno (int): The line of the definition of the function.
+        args (Tuple[str, ...]): The names of the positional arguments of the function.
+        outputs (Tuple[str, ...]): The nodes unpacked from the result of the function, given by the `outputs` argument 
+            of the `node` decorator.
+    """
+    name: str
+    filename: str
+    lineno: int
+    args: Tuple[str,...]
+    outputs: Tuple[str,...] = ()
+
+#Indexes of the files already parsed: {path: (modification time, size, indexed nodes)}
+_file_indexes = {}
+#Version of the format of the index files stored in a cache directory
+INDEX_FORMAT = 1
+
+def index_directory(module_dir:str,cache_dir:str=None)->Dict[str,IndexedNode]:
+    """
+    Returns the node functions defined in the `.py` files of a directory and its subdirectories, found by parsing the
+    files with `ast`. Files are visited in the same order as `load_nodes` imports them and a function defined in several
+    files is taken from the last one. The index of every file is cached in memory and reused until the modification
+    time or the size of the file changes.
+
+    If `cache_dir` is given, the indexes of the files of the directory are also stored in a file of `cache_dir`, keyed 
+    by path, modification time and size, so that new processes reuse them without parsing the files again. If this 
+    file cannot be read or written, only the in-memory cache is used.
+
+    Args:
+        module_dir (str): The directory path of the root module.
+        cache_dir (str, optional): A directory storing the indexes between processes. It is created if it does not 
+            exist. Defaults to None.
+
+    Returns:
+        Dict[str, IndexedNode]: A dictionary of function names and their `IndexedNode`.
+    """
+    paths = [os.path.join(root,f) for root,dirs,files in os.walk(module_dir) for f in files if f.endswith(".py")]
+    index_path = None if cache_dir is None else index_cache_path(cache_dir,module_dir)
+    if index_path is not None:
+        for path,cached in read_index_cache(index_path).items():
+            _file_indexes.setdefault(path,cached)
+    index = {}
+    parsed = False
+    for path in paths:
+        cached = _file_indexes.get(path)
+        for indexed_node in index_file(path):
+            index[indexed_node.name] = indexed_node
+        parsed = parsed or _file_indexes[path] is not cached
+    if index_path is not None and parsed:
+        write_index_cache(index_path,{path:_file_indexes[path] for path in paths})
+    return index
+
+def index_cache_path(cache_dir:str,module_dir:str)->str:
+    """Returns the path of the file of `cache_dir` storing the indexes of the files of `module_dir`."""
+    digest = hashlib.blake2b(os.path.abspath(str(module_dir)).encode(),digest_size=16).hexdigest()
+    return os.path.join(str(cache_dir),f"index-{digest}.pkl")
+
+def read_index_cache(index_path:str)->Dict[str,Tuple]:
+    """Returns the indexes stored by `write_index_cache`, or an empty dictionary if they cannot be read."""
+    try:
+        with open(index_path,"rb") as f:
+            stored = pickle.load(f)
+    except (OSError,EOFError,pickle.UnpicklingError,AttributeError,ImportError):
+        return {}
+    if not isinstance(stored,dict) or stored.get("format") != INDEX_FORMAT:
+        return {}
+    return stored["files"]
+
+def write_index_cache(index_path:str,file_indexes:Dict[str,Tuple])->None:
+    """Stores the indexes of files in `index_path`. Errors are ignored: the indexes then stay in memory only."""
+    data = pickle.dumps({"format":INDEX_FORMAT,"files":file_indexes},protocol=pickle.HIGHEST_PROTOCOL)
+    try:
+        os.makedirs(os.path.dirname(index_path),exist_ok=True)
+        atomic_write(index_path,lambda f: f.write(data))
+    except OSError:
+        pass
+
+def index_file(path:str)->List[IndexedNode]:
+    """Returns the node functions of a file, from the cache if the file has not changed since it was parsed."""
+    stat = os.stat(path)
+    cached = _file_indexes.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns,stat.st_size):
+        return cached[2]
+    with open(path,"rb") as f:
+        tree = ast.parse(f.read(),filename=path)
+    indexed_nodes = find_nodes(tree,path)
+    _file_indexes[path] = (stat.st_mtime_ns,stat.st_size,indexed_nodes)
+    return indexed_nodes
+
+def find_nodes(tree:ast.Module,path:str)->List[IndexedNode]:
+    """
+    Returns the top-level functions of a module which are decorated with `node` (`@node`, `@node(...)`,
+    `@nodemodel.node`, or an alias of `node` imported from `nodemodel`) or which get a `node_tag` attribute by an
+    assignment like `f.node_tag = "tag"`.
+    """
+    node_names,module_names = decorator_names(tree)
+    functions = {}
+    tagged_functions = set()
+    for statement in tree.body:
+        if isinstance(statement,(ast.FunctionDef,ast.AsyncFunctionDef)):
+            functions[statement.name] = statement
+            if any(is_node_decorator(decorator,node_names,module_names) for decorator in statement.decorator_list):
+                tagged_functions.add(statement.name)
+            else:
+                tagged_functions.discard(statement.name)
+        elif isinstance(statement,ast.Assign):
+            for target in statement.targets:
+                if (isinstance(target,ast.Attribute) and target.attr == "node_tag" and isinstance(target.value,ast.Name)
+                    and target.value.id in functions):
+                    tagged_functions.add(target.value.id)
+    indexed_nodes = []
+    for name in sorted(tagged_functions,key=lambda name: functions[name].lineno):
+        arguments = functions[name].args
+        args = tuple(arg.arg for arg in arguments.posonlyargs + arguments.args)
+        outputs = ()
+        for decorator in functions[name].decorator_list:
+            if isinstance(decorator,ast.Call) and is_node_decorator(decorator,node_names,module_names):
+                outputs = decorator_outputs(decorator)
+        indexed_nodes.append(IndexedNode(name,path,functions[name].lineno,args,outputs))
+    return indexed_nodes
+
+def decorator_outputs(decorator:ast.Call)->Tuple[str,...]:
+    """Returns the literal value of the `outputs` argument of a call of the `node` decorator, if any."""
+    for keyword in decorator.keywords:
+        if keyword.arg == "outputs":
+            try:
+                return tuple(ast.literal_eval(keyword.value))
+            except ValueError:
+                return ()
+    return ()
+
+def decorator_names(tree:ast.Module)->Tuple[Set[str],Set[str]]:
+    """Returns the names bound to the `node` decorator and to the `nodemodel` package by the imports of a module."""
+    node_names = {"node"}
+    module_names = {"nodemodel"}
+    for statement in tree.body:
+        if isinstance(statement,ast.ImportFrom) and statement.module in ("nodemodel","nodemodel.utils"):
+            node_names.update(alias.asname or alias.name for alias in statement.names if alias.name == "node")
+        elif isinstance(statement,ast.Import):
+            module_names.update(alias.asname for alias in statement.names if alias.name == "nodemodel" and alias.asname)
+    return node_names,module_names
+
+def is_node_decorator(decorator:ast.expr,node_names:Set[str],module_names:Set[str])->bool:
+    if isinstance(decorator,ast.Call):
+        decorator = decorator.func
+    if isinstance(decorator,ast.Name):
+        return decorator.id in node_names
+    return (isinstance(decorator,ast.Attribute) and decorator.attr == "node" and isinstance(decorator.value,ast.Name)
+            and decorator.value.id in module_names)
@@ -0,0 +1,161 @@
+from typing import Dict,List,Callable,Tuple,Iterable,FrozenSet
+from collections.abc import Hashable
+import functools
+import inspect
+from .plan import Plan,FUNCTION,VALUE,identity,origin_name
+from .helpers import func_args
+
+class Thunk():
+    """
+    The value of a lazy argument (see `node`): calling the thunk returns the value of the node. When the node was not
+    computed yet, it is computed on the first call, together with those of its ancestors which were not computed either.
+
+    Thunks are neither hashable nor picklable, so that caches skip the functions receiving them.
+    """
+    __slots__ = ("_function","_arg")
+    __hash__ = None
+
+    def __init__(self,function:Callable,arg):
+        self._function = function
+        self._arg = arg
+
+    def __call__(self):
+        return self._function(self._arg)
+
+    def __reduce__(self):
+        raise TypeError("Thunks cannot be pickled")
+
+def lazy_positions(f:Callable)->FrozenSet[int]:
+    """Returns the positions of the lazy arguments of `f`, read from its `node_lazy` attribute."""
+    lazy = getattr(f,"node_lazy",())
+    return frozenset(position for position,arg in enumerate(func_args(f)) if arg in lazy)
+
+def lazy_function(f:Callable,positions:FrozenSet[int])->Callable:
+    """
+    Returns a function calling `f` with its arguments at `positions` wrapped in thunks, unless they already are
+    thunks. Computations which evaluate all the nodes (threads, columns, compiled functions...) call it with values.
+    """
+    def thunks(args:tuple)->list:
+        return [Thunk(identity,arg) if position in positions and not isinstance(arg,Thunk) else arg
+                for position,arg in enumerate(args)]
+
+    if inspect.iscoroutinefunction(f):
+        @functools.wraps(f)
+        async def async_wrapper(*args):
+            return await f(*thunks(args))
+        return async_wrapper
+
+    @functools.wraps(f)
+    def wrapper(*args):
+        return f(*thunks(args))
+    return wrapper
+
+def lazy_steps(plan:Plan,nodes:Dict[str,Callable],retained_ids:Iterable[int]=None,
+               unfolded_plan:Plan=None)->Tuple[List[Tuple],Dict[Hashable,List[Tuple]]]:
+    """
+    Splits the steps of a plan between the eager steps, computed in order, and the deferred steps, computed only when
+    a thunk needs them.
+
+    A node is eager when it is retained, or when an eager node uses it as a regular (not lazy) argument. Other nodes
+    are only needed through lazy arguments: they are deferred. Every step is a tuple (node name, function, names of
+    the arguments, positions of the lazy arguments). Every deferred node used as a lazy argument gets the steps of
+    itself and of its deferred ancestors through regular arguments, in order of execution.
+
+    Nodes folded by `fold_constants` have no arguments anymore: given `unfolded_plan`, their arguments before folding
+    are used instead, so that folding does not change which nodes are eager and which nodes a computation returns.
+
+    Args:
+        plan (Plan): The execution plan of the model.
+        nodes (Dict[str, Callable]): The functions of the model, whose `node_lazy` attributes are read.
+        retained_ids (Iterable[int], optional): The ids of the nodes to compute. Defaults to None, which retains the
+            nodes that are not arguments of other nodes.
+        unfolded_plan (Plan, optional): The plan of the model before folding constants. Defaults to None.
+
+    Returns:
+        Tuple[List[Tuple], Dict[Hashable, List[Tuple]]]: The eager steps and the deferred steps by lazy argument.
+    """
+    offset = len(plan.inputs)
+    steps = []
+    #Arguments and lazy positions deciding which nodes are eager, read before folding
+    node_args = []
+    node_positions = []
+    for node,(node_name,function,args) in zip(plan.nodes,plan.steps):
+        positions = lazy_positions(nodes[origin_name(node_name)]) if node.kind == FUNCTION else frozenset()
+        steps.append((node_name,function,args,positions))
+        if unfolded_plan is not None and node.kind == VALUE:
+            original = unfolded_plan.node(node_name)
+            node_args.append(tuple(plan.ids[unfolded_plan.names[k]] for k in original.args))
+            node_positions.append(lazy_positions(nodes[origin_name(node_name)]) if original.kind == FUNCTION 
+                                  else frozenset())
+        else:
+            node_args.append(node.args)
+            node_positions.append(positions)
+
+    def regular_ancestors(ids:Iterable[int],excluded_ids:set)->set:
+        #Nodes reached from ids through regular arguments, without going through excluded_ids
+        reached_ids = set()
+        stack = [k for k in ids if k >= offset and k not in excluded_ids]
+        while stack:
+            k = stack.pop()
+            if k not in reached_ids:
+                reached_ids.add(k)
+                positions = node_positions[k - offset]
+                stack.extend(arg for position,arg in enumerate(node_args[k - offset]) 
+                             if arg >= offset and position not in positions and arg not in excluded_ids)
+        return reached_ids
+
+    if retained_ids is None:
+        consumed_ids = {k for args in node_args for k in args}
+        retained_ids = [node.id for node in plan.nodes if node.id not in consumed_ids]
+    eager_ids = regular_ancestors(retained_ids,set())
+    lazy_ids = {arg for args,positions in zip(node_args,node_positions) for position,arg in enumerate(args) 
+                if position in positions and arg >= offset and arg not in eager_ids}
+    deferred_steps = {plan.names[k]:[steps[i - offset] for i in sorted(regular_ancestors([k],eager_ids))] 
+                      for k in lazy_ids}
+    return [steps[k - offset] for k in sorted(eager_ids)],deferred_steps
+
+def compute_lazy(values:Dict,eager_steps:List[Tuple],deferred_steps:Dict[Hashable,List[Tuple]],
+                 computed:set=None)->Dict:
+    """
+    Computes the eager steps of `lazy_steps` in `values`, in-place. Lazy arguments are passed as thunks: calling one
+    computes the deferred steps of the argument which were not computed by this call yet, so that every node is 
+    computed at most once. Values of `values` are only read for inputs and computed nodes: a deferred node given in 
+    `values` is still computed when its thunk is called. Deferred nodes whose thunks are not called are removed from 
+    `values`.
+
+    Args:
+        values (Dict): The input dictionary, updated in-place.
+        eager_steps (List[Tuple]): The eager steps created by `lazy_steps`.
+        deferred_steps (Dict[Hashable, List[Tuple]]): The deferred steps created by `lazy_steps`.
+        computed (set, optional): Names of the nodes whose values in `values` are up to date, which are not computed
+            again (see `Model.recompute`). It is updated in-place. Defaults to None.
+
+    Returns:
+        Dict: `values`.
+    """
+    computed = set() if computed is None else computed
+
+    def run(step:Tuple)->None:
+        node_name,function,args,positions = step
+        if positions:
+            values[node_name] = function(*[Thunk(force,k) if position in positions else values[k]
+                                           for position,k in enumerate(args)])
+        else:
+            values[node_name] = function(*[values[k] for k in args])
+        computed.add(node_name)
+
+    def force(node_name:Hashable):
+        if node_name in deferred_steps and node_name not in computed:
+            for step in deferred_steps[node_name]:
+                if step[0] not in computed:
+                    run(step)
+        return values[node_name]
+
+    for step in eager_steps:
+        if step[0] not in computed:
+            run(step)
+    for target_steps in deferred_steps.values():
+        for step in target_steps:
+            if step[0] not in computed:
+                values.pop(step[0],None)
+    return values
@@ -1,7 +1,15 @@
-from typing import Dict,List,Callable,Union
-import networkx as nx
-from .graph_functions import nodes_graph,model_graph,graph_subcomponent_nodes,check_acyclicity
-from .model_node import model_node_factory
+from typing import Dict,List,Callable,Union,Iterable,Iterator,Tuple,TYPE_CHECKING
+import contextlib
+import inspect
+import itertools
+import pickle
+from .plan import Plan,PlanNode,FUNCTION,build_plan,subplan,fold_constants,origin_name,plan_key,plan_state,plan_from_state
+from .lazy import lazy_steps,compute_lazy
+from .utils import model_spec
+from .helpers import node_dependencies,output_sources
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 class Model():
     """
@@ -15,36 +23,154 @@ class Model():
     Attributes:
         nodes (Dict[str, Callable]): A dictionary where keys are node names and values are functions representing nodes in the graph.
         nodes_graph (nx.DiGraph): A directed acyclic graph (DAG) representing the input-output relationships between the functions.
+        It is built on first access.
         graph (nx.DiGraph): A directed acyclic graph (DAG) representing the entire computational model, including auxiliary nodes.
+        It is rebuilt from `plan` on first access.
         inputs (List[str]): A list of node names representing input values (nodes without dependencies).
         call_order (List[str]): A list of node names in topological order of execution (excluding inputs).
-        model_nodes (Dict[str, model_node]): A dictionary of node names to their respective `model_node` objects, used for computation.
+        model_nodes (Dict[str, model_node]): A dictionary of node names to their respective `model_node` objects. It is built on first access.
         auxiliary_nodes (List[str]): A list of nodes that are generated as auxiliary nodes in the graph, typically for conditional functions.
+        plan (Plan): The frozen, integer-indexed execution plan used by all computations. Computations do not import networkx.
+        Pure nodes depending only on nodes forced to values are folded to constants in the plan (see `fold_constants`).
+        assume_pure (bool): Whether all functions are considered pure, as if they were decorated with `@node(pure=True)`.
     """
-    def __init__(self,nodes:Dict[str,Callable]):
+    def __init__(self,nodes:Dict[str,Callable],assume_pure:bool=False):
         """
         Initializes the `Model` instance by constructing the function graph and preparing the model for computation.
 
         The method takes a dictionary of node functions, where the keys are the node names and the values are the corresponding 
         functions. It generates a directed acyclic graph (DAG) representing the dependencies between the nodes based on their 
         inputs and outputs. The method identifies input nodes (nodes with no dependencies) and calculates the execution order 
-        of the nodes based on a topological sort. Additionally, it prepares `model_node` objects for each node to handle the 
-        actual computations.
+        of the nodes based on a topological sort. Additionally, it prepares the execution plan of the model (`self.plan`). 
+        The graphs are not kept after the construction: they are rebuilt on first access to `self.graph` or `self.nodes_graph`.
 
         Args:
             nodes (Dict[str, Callable]): 
                 A dictionary where the keys are the names of the nodes (functions), and the values are the function objects.
                 The functions can have dependencies on other nodes, with their arguments corresponding to the outputs of other nodes.
+            assume_pure (bool, optional): Whether all functions are pure: they return the same value for the same arguments 
+                and have no side effects. Pure functions whose arguments are all nodes forced to values (or other such 
+                functions), like the auxiliary node ('a','x',2) of `a(x)`, are computed once at construction and stored as 
+                constants in the plan. Otherwise, only functions decorated with `@node(pure=True)` are. Defaults to False.
         """
+        import networkx as nx
+        from .graph_functions import nodes_graph,model_graph
+        functions_graph = nodes_graph(nodes)
+        graph = model_graph(functions_graph,nodes)
+        inputs = list(set(functions_graph.nodes()).difference(nodes.keys()).difference(output_sources(nodes)))
+        inputs_set = set(inputs)
+        call_order = [node for node in nx.topological_sort(graph) if node not in inputs_set]
+        auxiliary_nodes = list(set(graph.nodes()).difference(functions_graph.nodes()))
+        self._init_from_plan(nodes,build_plan(graph,nodes,inputs,call_order,auxiliary_nodes),assume_pure)
+
+    def _init_from_plan(self,nodes:Dict[str,Callable],plan:Plan,assume_pure:bool=False)->None:
+        """Initializes the model from its nodes and their plan, before folding constants."""
         self.nodes = nodes
-        self.nodes_graph = nodes_graph(nodes)
-        self.graph = model_graph(self.nodes_graph,self.nodes)
-        self.inputs = list(set(self.nodes_graph.nodes()).difference(nodes.keys()))
-        self.call_order = [node for node in list(nx.topological_sort(self.graph)) if node not in self.inputs]
-        self.model_nodes = {node_name:model_node_factory(node_name,self.nodes,self.graph) for node_name in self.call_order}
-        self.auxiliary_nodes = list(set(self.graph.nodes()).difference(self.nodes_graph.nodes()))
+        self.assume_pure = assume_pure
+        self._unfolded_plan = plan
+        plan = fold_constants(plan,self._is_pure)
+        self.plan = plan
+        self.inputs = [plan.names[k] for k in plan.inputs]
+        self.call_order = [node.name for node in plan.nodes]
+        self.auxiliary_nodes = [plan.names[k] for k in plan.auxiliary_nodes]
+        self._nodes_graph = None
+        self._graph = None
+        self._model_nodes = None
+        self._compiled = None
+        self._compiled_batches = {}
+        self._dependencies = {}
+        self._column_steps = {}
+        self._frame_steps = {}
+        self._recompute_plans = {}
+        self._sweep_plans = {}
+        self._output_plans = {}
+        self._lazy_plans = {}
+        self._lazy = any(hasattr(f,"node_lazy") for f in nodes.values())
+        self._hooks = []
+        self._execution_plan = plan
+        self._profiler = None
+        self._profiler_hook = None
+        self._submodels = {}
+
+    def _options(self)->Dict:
+        """Returns the keyword arguments of `Model` the model was built with, sent to worker processes."""
+        return {"assume_pure":self.assume_pure}
+
+    def _is_pure(self,node:PlanNode)->bool:
+        f = self.nodes[origin_name(node.name)]
+        return (self.assume_pure or getattr(f,"node_pure",False)) and not inspect.iscoroutinefunction(f)
+
+    def save_plan(self,path:str)->None:
+        """
+        Saves the plan of the model to a file, so that `Model.load_plan` can create the model again without building 
+        its graph. The file stores the names, inputs and order of the nodes, the expansion of the forced nodes and a key 
+        computed from the code and the `forced_nodes` attribute of the functions. Functions themselves and constants 
+        folded from pure functions are not stored.
+
+        Args:
+            path (str): The path of the file.
+        """
+        from .cache import atomic_write
+        data = pickle.dumps({"key":plan_key(self.nodes),"plan":plan_state(self._unfolded_plan)},protocol=pickle.HIGHEST_PROTOCOL)
+        atomic_write(str(path),lambda f: f.write(data))
+
+    @classmethod
+    def load_plan(cls,path:str,nodes:Dict[str,Callable],assume_pure:bool=False):
+        """
+        Creates a model from the plan saved by `Model.save_plan`, skipping the construction of its graph.
+
+        The plan is used only if its key matches the code and the `forced_nodes` attribute of the functions of `nodes`. 
+        Otherwise (or if the file does not exist or cannot be read, for instance because it refers to a class which 
+        was removed) the model is built from `nodes` and its plan is 
+        saved to `path`, so that the file can be used as an automatically refreshed cache of the plan.
+
+        Args:
+            path (str): The path of the file.
+            nodes (Dict[str, Callable]): The nodes of the model.
+            assume_pure (bool, optional): See `Model`. Defaults to False.
+
+        Returns:
+            Model: The model.
+        """
+        try:
+            with open(path,"rb") as f:
+                stored = pickle.load(f)
+        except (OSError,EOFError,pickle.UnpicklingError,AttributeError,ImportError):
+            stored = None
+        if isinstance(stored,dict) and stored.get("key") == plan_key(nodes):
+            model = cls.__new__(cls)
+            model._init_from_plan(nodes,plan_from_state(stored["plan"],nodes),assume_pure)
+            return model
+        model = cls(nodes,assume_pure)
+        model.save_plan(path)
+        return model
+
+    @property
+    def nodes_graph(self):
+        """The graph of the functions of the model (`nx.DiGraph`), built on first access."""
+        if self._nodes_graph is None:
+            from .graph_functions import nodes_graph
+            self._nodes_graph = nodes_graph(self.nodes)
+        return self._nodes_graph
+
+    @property
+    def graph(self):
+        """The graph of the model including auxiliary nodes (`nx.DiGraph`), rebuilt from `self.plan` on first access."""
+        if self._graph is None:
+            from .graph_functions import plan_graph
+            self._graph = plan_graph(self.plan)
+        return self._graph
+
+    @property
+    def model_nodes(self)->Dict:
+        """The `ModelNode` objects of the model indexed by node name, built on first access."""
+        if self._model_nodes is None:
+            from .model_node import model_node_factory
+            self._model_nodes = {node_name:model_node_factory(node_name,self.nodes,self.graph) for node_name in self.call_order}
+        return self._model_nodes
 
-    def compute(self,input:Dict,keep_auxiliary_nodes:bool=False,**kwargs)->Dict:
+    def compute(self,input:Dict,keep_auxiliary_nodes:bool=False,outputs:Union[str,List]=None,free_intermediates:bool=False,
+                executor:Union[str,"Executor"]=None,max_workers:int=None,**kwargs)->Dict:
         """
         Computes functions in the model using the input dictionary. The computation is performed in-place, with functions executed iteratively 
         according to the topological order of the model graph (`self.call_order`).
@@ -53,27 +179,607 @@ class Model():
             input (Dict): The input dictionary.
             keep_auxiliary_nodes (bool, optional): Whether to retain auxiliary nodes calculated for conditional functions in the dictionary. 
             Defaults to False.
+            outputs (Union[str, List], optional): Names of the nodes to retain in the dictionary. Only these nodes and their 
+            ancestors in `self.graph` (including the auxiliary nodes they depend on) are computed, and other computed nodes 
+            are removed from the dictionary. Defaults to None, which computes and retains all nodes.
+            free_intermediates (bool, optional): Whether to remove every node which is not retained from the dictionary as soon as 
+            its last consumer is computed, instead of at the end of the computation. This reduces the peak memory of models with 
+            large intermediate values. Only supported by the sequential executor. Defaults to False.
+            executor (Union[str, Executor], optional): If None, functions are executed sequentially. If "threads", functions 
+            are submitted to a `ThreadPoolExecutor` as soon as their predecessors are computed, so that independent branches 
+            of the graph run concurrently. An existing `concurrent.futures.Executor` can also be given. Defaults to None.
+            max_workers (int, optional): The maximum number of threads when `executor` is "threads". Defaults to None.
             **kwargs: Additional inputs that will be temporarily added to the dictionary during the calculation and removed afterward.
 
         Returns:
             Dict: The dictionary with additional entries corresponding to the computed functions in the model.
+
+        If some functions have lazy arguments (see `node`), the sequential executor computes the nodes needed only 
+        through lazy arguments when their thunks are called: nodes of untaken branches are not computed and are missing 
+        from the dictionary. With `free_intermediates` or another executor, all nodes are computed.
         """
+        if executor is not None and executor != "threads":
+            from concurrent.futures import Executor
+            if not isinstance(executor,Executor):
+                raise ValueError(f"Unknown executor: {executor}")
+        if free_intermediates and executor is not None:
+            raise ValueError("free_intermediates is only supported by the sequential executor")
+        if self._lazy and executor is None and not free_intermediates:
+            eager_steps,deferred_steps,removed_nodes = self._lazy_plan(outputs,keep_auxiliary_nodes)
+            input.update(kwargs)
+            compute_lazy(input,eager_steps,deferred_steps)
+            for removed_node in removed_nodes:
+                input.pop(removed_node,None)
+            for k in kwargs.keys():
+                del input[k]
+            return input
+        if outputs is None and not free_intermediates:
+            plan = self._execution_plan
+            removed_nodes = () if keep_auxiliary_nodes else self.auxiliary_nodes
+        else:
+            plan,steps,removed_nodes = self._output_plan(outputs,keep_auxiliary_nodes)
         input.update(kwargs)
-        for node_name in self.call_order:
-            model_node = self.model_nodes[node_name]
-            call_input = [input[k] for k in model_node.inputs]
-            input[node_name] = model_node.compute(*call_input)
+        if free_intermediates:
+            for node_name,function,args,released_nodes in steps:
+                input[node_name] = function(*[input[k] for k in args])
+                for k in released_nodes:
+                    del input[k]
+            removed_nodes = ()
+        elif executor is None:
+            for node_name,function,args in plan.steps:
+                input[node_name] = function(*[input[k] for k in args])
+        else:
+            from .executors import compute_with_executor,dependencies
+            if plan not in self._dependencies:
+                self._dependencies[plan] = dependencies(plan)
+            compute_with_executor(input,plan,self._dependencies[plan],executor,max_workers)
+        for removed_node in removed_nodes:
+            del input[removed_node]
+        for k in kwargs.keys():
+            del input[k]
+        return input
+
+    def _output_plan(self,outputs:Union[str,List],keep_auxiliary_nodes:bool)->Tuple:
+        """
+        Returns the plan, the computation steps and the nodes to remove at the end of a computation retaining only 
+        `outputs`.
+
+        The plan only contains `outputs` and their ancestors in the model graph (read from the reachability index of 
+        `self.plan`), so that other nodes are not computed. Every step is a tuple (node name, function, names of the 
+        arguments, nodes to remove after the step): a node which is not retained is removed right after its last 
+        consumer in the plan, or right after its own computation if it has no consumer. Inputs of the model are never 
+        removed.
+        """
+        outputs = [outputs] if isinstance(outputs, str) else outputs
+        key = (None if outputs is None else frozenset(outputs),keep_auxiliary_nodes)
+        if key not in self._output_plans:
+            if outputs is None:
+                plan = self._execution_plan
+                retained_ids = {node.id for node in plan.nodes}
+                if not keep_auxiliary_nodes:
+                    retained_ids.difference_update(plan.auxiliary_nodes)
+            else:
+                unknown_nodes = set(outputs).difference(self.plan.ids)
+                if unknown_nodes:
+                    raise ValueError(f"Unknown outputs: {sorted(unknown_nodes,key=str)}")
+                plan = subplan(self._execution_plan,self.plan.needed_ids([self.plan.ids[k] for k in outputs]))
+                retained_ids = {plan.ids[k] for k in outputs}
+            offset = len(plan.inputs)
+            last_consumers = list(range(len(plan.nodes)))
+            for position,node in enumerate(plan.nodes):
+                for k in node.args:
+                    if k >= offset:
+                        last_consumers[k - offset] = position
+            released_nodes = [[] for _ in plan.nodes]
+            for node in plan.nodes:
+                if node.id not in retained_ids:
+                    released_nodes[last_consumers[node.id - offset]].append(node.name)
+            steps = [step + (tuple(released),) for step,released in zip(plan.steps,released_nodes)]
+            removed_nodes = [node.name for node in plan.nodes if node.id not in retained_ids]
+            self._output_plans[key] = (plan,steps,removed_nodes)
+        return self._output_plans[key]
+
+    def _lazy_plan(self,outputs:Union[str,List],keep_auxiliary_nodes:bool)->Tuple:
+        """
+        Returns the eager steps, the deferred steps (see `lazy_steps`) and the nodes to remove at the end of a 
+        computation retaining only `outputs`, or all nodes if `outputs` is None.
+        """
+        outputs = [outputs] if isinstance(outputs, str) else outputs
+        key = (None if outputs is None else frozenset(outputs),keep_auxiliary_nodes)
+        if key not in self._lazy_plans:
+            if outputs is None:
+                plan = self._execution_plan
+                retained_ids = None
+                removed_nodes = () if keep_auxiliary_nodes else self.auxiliary_nodes
+            else:
+                plan,_,removed_nodes = self._output_plan(outputs,keep_auxiliary_nodes)
+                retained_ids = [plan.ids[k] for k in outputs]
+            self._lazy_plans[key] = lazy_steps(plan,self.nodes,retained_ids,self._unfolded_plan) + (removed_nodes,)
+        return self._lazy_plans[key]
+
+    def recompute(self,previous_result:Dict,keep_auxiliary_nodes:bool=False,**changed_inputs)->Dict:
+        """
+        Updates a result of `compute` after a change of some inputs, recomputing only the nodes that depend on them.
+
+        The list of nodes to recompute (the descendants of the changed inputs in the model graph) is computed once for 
+        each combination of changed inputs and cached on the model, so that a recomputation only costs the computation 
+        of the affected nodes. All other values are taken from `previous_result`. Auxiliary nodes which are needed by 
+        the affected nodes but do not depend on the changed inputs are computed only if they are missing from 
+        `previous_result`.
+
+        If some functions have lazy arguments (see `node`), nodes needed only through lazy arguments are computed when 
+        their thunks are called, and nodes which are not affected are only computed if they are missing from 
+        `previous_result`, like the nodes of a branch which was not taken.
+
+        Args:
+            previous_result (Dict): A dictionary computed by the model. It is updated in-place.
+            keep_auxiliary_nodes (bool, optional): Whether to retain auxiliary nodes calculated for conditional functions in the dictionary. 
+            Defaults to False.
+            **changed_inputs: The new values of the changed inputs (or nodes).
+
+        Returns:
+            Dict: The updated dictionary.
+        """
+        key = frozenset(changed_inputs)
+        if key not in self._recompute_plans:
+            self._recompute_plans[key] = self._recompute_plan(key)
+        previous_result.update(changed_inputs)
+        if self._lazy:
+            #Deferred nodes of untaken branches are missing from previous_result: the model is computed with thunks, 
+            #without computing again the nodes which are not affected
+            affected_nodes = {node_name for node_name,_,_,is_affected in self._recompute_plans[key] if is_affected}
+            computed = {k for k in previous_result if k not in affected_nodes}
+            eager_steps,deferred_steps,removed_nodes = self._lazy_plan(None,keep_auxiliary_nodes)
+            compute_lazy(previous_result,eager_steps,deferred_steps,computed)
+            for removed_node in removed_nodes:
+                previous_result.pop(removed_node,None)
+            return previous_result
+        for node_name,function,args,is_affected in self._recompute_plans[key]:
+            if is_affected or node_name not in previous_result:
+                previous_result[node_name] = function(*[previous_result[k] for k in args])
+        if not keep_auxiliary_nodes:
+            for auxiliary_node in self.auxiliary_nodes:
+                previous_result.pop(auxiliary_node,None)
+        return previous_result
+
+    def _recompute_plan(self,changed_nodes:frozenset)->List:
+        """
+        Returns the nodes to recompute when `changed_nodes` change, in the order of `self.call_order`, as tuples 
+        (node name, function, names of the arguments, is the node affected by the change). Nodes which are not affected 
+        are auxiliary nodes needed by affected nodes.
+        """
+        plan = self.plan
+        offset = len(plan.inputs)
+        for changed_node in changed_nodes:
+            if changed_node not in plan.ids:
+                raise ValueError(f"{changed_node} is not a node of the model")
+        affected_ids = set(plan.descendants([plan.ids[k] for k in changed_nodes]))
+        auxiliary_ids = set(plan.auxiliary_nodes)
+        needed_ids = set()
+        stack = [k for i in affected_ids for k in plan.nodes[i - offset].args]
+        while stack:
+            i = stack.pop()
+            if i in auxiliary_ids and i not in affected_ids and i not in needed_ids:
+                needed_ids.add(i)
+                stack.extend(plan.nodes[i - offset].args)
+        return [step + (node.id in affected_ids,) for node,step in zip(plan.nodes,self._execution_plan.steps)
+                if node.id in affected_ids or node.id in needed_ids]
+
+    def sweep(self,input:Dict,outputs:Union[str,List],scenarios:Dict[str,List],vectorize:bool=False)->List[Dict]:
+        """
+        Computes `outputs` under many scenarios, each forcing some inputs (or nodes) to values, for example 
+        `m.sweep(input, "d", {"x": [1, 2, 3]})` for the scenarios x=1, x=2 and x=3.
+
+        Unlike `forced_nodes`, scenarios do not add auxiliary nodes to the graph and do not need a model per value. 
+        The nodes needed by `outputs` which do not depend on the forced nodes are computed once, then only the 
+        descendants of the forced nodes are computed for every scenario, like in `recompute`. The nodes to compute 
+        are selected once for each combination of `outputs` and forced nodes and cached on the model.
+
+        Args:
+            input (Dict): The input dictionary. It is left untouched.
+            outputs (Union[str, List]): Names of the nodes to return.
+            scenarios (Dict[str, List]): The values of every forced node, one per scenario. All lists must have the 
+                same length: the i-th scenario forces every node to the i-th value of its list.
+            vectorize (bool, optional): Whether to compute the descendants of the forced nodes once for all scenarios, 
+                with the values of every forced node stacked in a NumPy array, like in `compute_columns`. Functions must 
+                then be elementwise and the values of the other nodes must be scalars. Defaults to False.
+
+        Returns:
+            List[Dict]: The values of `outputs` in every scenario.
+        """
+        outputs = [outputs] if isinstance(outputs, str) else outputs
+        lengths = {len(values) for values in scenarios.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"All scenarios must have the same number of values, got {sorted(lengths)}")
+        n_scenarios = lengths.pop() if lengths else 0
+        key = (frozenset(outputs),frozenset(scenarios),vectorize)
+        if key not in self._sweep_plans:
+            self._sweep_plans[key] = self._sweep_plan(outputs,list(scenarios),vectorize)
+        base_steps,shared_nodes,steps = self._sweep_plans[key]
+        base = dict(input)
+        for node_name,function,args in base_steps:
+            base[node_name] = function(*[base[k] for k in args])
+        shared = {k:base[k] for k in shared_nodes}
+        if vectorize:
+            import numpy as np
+            values = dict(shared)
+            for k,scenario_values in scenarios.items():
+                values[k] = np.asarray(scenario_values)
+            for node_name,function,args in steps:
+                values[node_name] = function(*[values[k] for k in args])
+            columns = [itertools.repeat(values[k]) if np.ndim(values[k]) == 0 else values[k].tolist() for k in outputs]
+            return [dict(zip(outputs,row)) for _,*row in zip(range(n_scenarios),*columns)]
+        results = []
+        for i in range(n_scenarios):
+            values = dict(shared)
+            for k,scenario_values in scenarios.items():
+                values[k] = scenario_values[i]
+            for node_name,function,args in steps:
+                values[node_name] = function(*[values[k] for k in args])
+            results.append({k:values[k] for k in outputs})
+        return results
+
+    def _sweep_plan(self,outputs:List,forced_nodes:List,vectorize:bool)->Tuple:
+        """
+        Returns the steps computing the nodes shared by all scenarios of `sweep`, the names of the shared nodes read by 
+        the scenarios, and the steps computing the descendants of `forced_nodes` needed by `outputs` in every scenario.
+        """
+        plan = self.plan
+        offset = len(plan.inputs)
+        for node_name in list(outputs) + list(forced_nodes):
+            if node_name not in plan.ids:
+                raise ValueError(f"{node_name} is not a node of the model")
+        forced_ids = {plan.ids[k] for k in forced_nodes}
+        output_ids = [plan.ids[k] for k in outputs]
+        affected_ids = set(plan.descendants(forced_ids)).intersection(plan.needed_ids(output_ids)).difference(forced_ids)
+        shared_ids = {k for k in output_ids if k not in affected_ids and k not in forced_ids}
+        for i in affected_ids:
+            shared_ids.update(k for k in plan.nodes[i - offset].args if k not in affected_ids and k not in forced_ids)
+        base_plan = subplan(self._execution_plan,plan.needed_ids(shared_ids))
+        steps = []
+        for node,step in zip(self._execution_plan.nodes,self._execution_plan.steps):
+            if node.id in affected_ids:
+                if vectorize:
+                    from .columns import column_function
+                    step = (step[0],column_function(node,step[1],self.nodes),step[2])
+                steps.append(step)
+        return base_plan.steps,[plan.names[k] for k in shared_ids],steps
+
+    async def acompute(self,input:Dict,keep_auxiliary_nodes:bool=False,offload_sync:bool=False,**kwargs)->Dict:
+        """
+        Computes functions in the model using the input dictionary with `asyncio`. Functions defined with `async def` are 
+        awaited, and every function is started as soon as its inputs are computed, so that independent coroutines 
+        (for example network requests) run concurrently. The result is the same as the result of `compute`.
+
+        Args:
+            input (Dict): The input dictionary.
+            keep_auxiliary_nodes (bool, optional): Whether to retain auxiliary nodes calculated for conditional functions in the dictionary. 
+            Defaults to False.
+            offload_sync (bool, optional): Whether to run regular (not `async`) functions in the default executor of the 
+            event loop instead of the event loop itself. Defaults to False.
+            **kwargs: Additional inputs that will be temporarily added to the dictionary during the calculation and removed afterward.
+
+        Returns:
+            Dict: The dictionary with additional entries corresponding to the computed functions in the model.
+        """
+        from .executors import compute_async
+        input.update(kwargs)
+        await compute_async(input,self._execution_plan,offload_sync)
         if not keep_auxiliary_nodes:
             for auxiliary_node in self.auxiliary_nodes:
                 del input[auxiliary_node]
         for k in kwargs.keys():
             del input[k]
         return input
+
+    def compile(self)->Callable:
+        """
+        Generates and compiles a specialized Python function computing the model.
+
+        The compiled function follows `self.call_order` as straight-line code: node values are kept in local variables 
+        instead of being read from the input dictionary, nodes forced to values are inlined as constants and nodes forced 
+        to other nodes become plain assignments. It removes the per-node interpreter overhead of `compute`, which matters 
+        for models with many cheap nodes computed on many records.
+
+        Returns:
+            Callable: A function with the same signature and the same result as `compute`: 
+            `compute(input, keep_auxiliary_nodes=False, **kwargs)`. Lazy arguments (see `node`) are not short-circuited:
+            they are passed as thunks of computed nodes.
+        """
+        if self._compiled is None:
+            from .compiler import compile_model
+            self._compiled = compile_model(self.plan)
+        return self._compiled
+
+    def compute_many(self,records:Iterable[Dict],outputs:List=None,keep_auxiliary_nodes:bool=False,
+                     executor:str=None,max_workers:int=None,chunksize:int=1000)->List[Dict]:
+        """
+        Computes the model on every dictionary of an iterable of records with a single prepared plan.
+
+        The plan is compiled once per combination of `outputs` and `keep_auxiliary_nodes` and cached on the model, so 
+        everything that does not depend on a record is resolved outside of the loop over the records.
+        If some functions have lazy arguments (see `node`), nodes needed only through lazy arguments are computed when 
+        their thunks are called, like in `compute`.
+
+        Args:
+            records (Iterable[Dict]): The input dictionaries.
+            outputs (List, optional): Names of the nodes (or inputs) to return. If given, only these nodes and their 
+                ancestors are computed, a new dictionary with only these keys is returned for every record and the 
+                records are left untouched. Otherwise, the records are 
+                updated in-place like in `compute`. Defaults to None.
+            keep_auxiliary_nodes (bool, optional): Whether to retain auxiliary nodes calculated for conditional functions 
+                in the records. Ignored when `outputs` is given. Defaults to False.
+            executor (str, optional): If "processes", the records are computed in a pool of processes. Every worker builds 
+                the model once from `model_spec(self.nodes)` and the options of the model, like `assume_pure`, so node 
+                functions must be importable from their module or file (see `model_spec`). Records are sent to the workers in chunks and results are returned as new 
+                dictionaries, in the order of the records. Defaults to None.
+            max_workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+            chunksize (int, optional): The number of records sent to a worker process at once. Defaults to 1000.
+
+        Returns:
+            List[Dict]: The results, in the order of the records.
+        """
+        outputs = [outputs] if isinstance(outputs, str) else outputs
+        if executor == "processes":
+            from .executors import iter_compute_with_processes
+            results = []
+            for chunk_results in iter_compute_with_processes(model_spec(self.nodes),records,outputs,keep_auxiliary_nodes,
+                                                             max_workers,chunksize,model_options=self._options()):
+                results.extend(chunk_results)
+            return results
+        elif executor is not None:
+            raise ValueError(f"Unknown executor: {executor}")
+        return self._compiled_batch(outputs,keep_auxiliary_nodes)(records)
+
+    def _compiled_batch(self,outputs:List,keep_auxiliary_nodes:bool)->Callable:
+        """
+        Returns the function compiled by `compile_batch` for `outputs`, cached on the model. If some functions have lazy 
+        arguments, deferred nodes are computed by nested functions called through thunks (see `generate_lazy_body`).
+        """
+        key = (None if outputs is None else tuple(outputs),keep_auxiliary_nodes)
+        if key not in self._compiled_batches:
+            plan = self._output_plan(outputs,keep_auxiliary_nodes)[0] if outputs is not None else self._execution_plan
+            lazy = self._lazy_plan(outputs,keep_auxiliary_nodes)[:2] if self._lazy else None
+            from .compiler import compile_batch
+            self._compiled_batches[key] = compile_batch(plan,outputs,keep_auxiliary_nodes,lazy)
+        return self._compiled_batches[key]
+
+    def compute_stream(self,records:Iterable[Dict],chunk_size:int=1000,outputs:List=None,
+                       keep_auxiliary_nodes:bool=False,executor:Union[str,"Executor"]=None,max_workers:int=None,
+                       ordered:bool=True)->Iterator[Dict]:
+        """
+        Computes the model on a stream of records, like a generator reading a file or a message queue, and returns 
+        a generator of results.
+
+        Records are read lazily in micro-batches of `chunk_size` records, each computed with the prepared plan of 
+        `compute_many`. At most one micro-batch (or two per worker with an executor) is held in memory at a time, 
+        so memory stays flat however long the stream is.
+
+        Args:
+            records (Iterable[Dict]): The input dictionaries. They are only read as the results are consumed.
+            chunk_size (int, optional): The number of records of a micro-batch. Defaults to 1000.
+            outputs (List, optional): See `compute_many`. Defaults to None.
+            keep_auxiliary_nodes (bool, optional): See `compute_many`. Defaults to False.
+            executor (Union[str, Executor], optional): If None, micro-batches are computed in the current thread. 
+                If "threads" or an existing `concurrent.futures.Executor`, they are computed in a pool of threads. 
+                If "processes", they are computed in a pool of processes like in `compute_many`. Defaults to None.
+            max_workers (int, optional): The number of workers of the pool. Defaults to the number of CPUs.
+            ordered (bool, optional): Whether results are yielded in the order of the records. If False, the results 
+                of a micro-batch are yielded as soon as it is computed by a worker, so a slow micro-batch does not 
+                delay the others; include an identifier of the records in `outputs` to match them. Defaults to True.
+
+        Returns:
+            Iterator[Dict]: The results.
+        """
+        outputs = [outputs] if isinstance(outputs, str) else outputs
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be a positive integer, got {chunk_size}")
+        from concurrent.futures import Executor
+        from .executors import chunks,iter_compute_with_processes,iter_compute_with_threads
+        if executor is None:
+            chunk_results = map(self._compiled_batch(outputs,keep_auxiliary_nodes),chunks(records,chunk_size))
+        elif executor == "threads" or isinstance(executor,Executor):
+            chunk_results = iter_compute_with_threads(self._compiled_batch(outputs,keep_auxiliary_nodes),records,
+                                                      executor,max_workers,chunk_size,ordered)
+        elif executor == "processes":
+            chunk_results = iter_compute_with_processes(model_spec(self.nodes),records,outputs,keep_auxiliary_nodes,
+                                                        max_workers,chunk_size,ordered,self._options())
+        else:
+            raise ValueError(f"Unknown executor: {executor}")
+        return itertools.chain.from_iterable(chunk_results)
+
+    def compute_columns(self,columns:Dict,outputs:Union[str,List]=None,keep_auxiliary_nodes:bool=False)->Dict:
+        """
+        Computes the model once on columns of records instead of once per record: every input is a NumPy array holding 
+        one value per record, and every node function is called a single time with whole columns as arguments.
+
+        Node functions must then be elementwise on arrays, like `def a(x): return x + 1`. Functions which cannot be 
+        vectorized are decorated with `@node(vectorize=False)` and are applied to every row with `np.frompyfunc`. 
+        Nodes forced to values are broadcast to the shape of the columns. NumPy is imported on the first call.
+
+        Args:
+            columns (Dict): The input columns, as NumPy arrays of the same shape (or broadcastable shapes, scalars 
+                included). They are left untouched.
+            outputs (Union[str, List], optional): Names of the nodes to return. If given, only these nodes and their 
+                ancestors are computed. Defaults to None, which computes and returns all nodes, except the functions of 
+                `@node(outputs=(...))` whose outputs are returned instead.
+            keep_auxiliary_nodes (bool, optional): Whether to return the columns of auxiliary nodes. Defaults to False.
+
+        Returns:
+            Dict: A new dictionary with the input columns and the computed columns.
+        """
+        if outputs is None:
+            outputs = self._column_outputs(keep_auxiliary_nodes)
+        from .columns import column_steps,compute_columns
+        plan,_,removed_nodes = self._output_plan(outputs,keep_auxiliary_nodes)
+        if plan not in self._column_steps:
+            self._column_steps[plan] = column_steps(plan,self.nodes)
+        return compute_columns(columns,plan,self._column_steps[plan],removed_nodes)
+
+    def compute_frame(self,frame,outputs:Union[str,List]=None,keep_auxiliary_nodes:bool=False,chunk_size:int=None):
+        """
+        Computes the model on the columns of a pandas DataFrame and returns a new frame with the computed columns.
+
+        Inputs are read from the columns of the frame and node functions are called with Series, like `compute` on 
+        `df.to_dict(orient="series")`. Functions decorated with `@node(vectorize=False)` are applied to every row. 
+        The computed columns are attached in a single `pd.concat` without copying the input frame, and nodes which 
+        are not returned, like auxiliary nodes, are never attached to it.
+
+        Args:
+            frame (pd.DataFrame): The input frame. It is left untouched.
+            outputs (Union[str, List], optional): Names of the nodes to add to the frame. If given, only these nodes and 
+                their ancestors are computed. Defaults to None, which adds all nodes, except the functions of 
+                `@node(outputs=(...))` whose outputs are added instead.
+            keep_auxiliary_nodes (bool, optional): Whether to add the auxiliary nodes. Defaults to False.
+            chunk_size (int, optional): If given, the model is computed on slices of at most `chunk_size` rows, which 
+                bounds the memory of intermediate nodes. Defaults to None.
+
+        Returns:
+            pd.DataFrame: The columns of the input frame followed by the computed columns.
+        """
+        outputs = [outputs] if isinstance(outputs, str) else outputs
+        if outputs is None:
+            outputs = self._column_outputs(keep_auxiliary_nodes)
+        from .columns import frame_steps,compute_frame
+        key = (frozenset(outputs),keep_auxiliary_nodes)
+        plan,steps,_ = self._output_plan(outputs,keep_auxiliary_nodes)
+        if key not in self._frame_steps:
+            self._frame_steps[key] = frame_steps(plan,steps,self.nodes)
+        return compute_frame(frame,[plan.names[k] for k in plan.inputs],self._frame_steps[key],chunk_size)
     
+    def _column_outputs(self,keep_auxiliary_nodes:bool)->List:
+        """
+        Returns the nodes returned by default by `compute_columns` and `compute_frame`: all nodes (auxiliary nodes only 
+        if `keep_auxiliary_nodes` is True) except the functions with a `node_outputs` attribute, whose tuples of 
+        columns are only returned unpacked into their outputs.
+        """
+        auxiliary_ids = set(self.plan.auxiliary_nodes)
+        return [node.name for node in self.plan.nodes 
+                if node.kind != FUNCTION or not hasattr(self.nodes[origin_name(node.name)],"node_outputs")
+                if keep_auxiliary_nodes or node.id not in auxiliary_ids]
+
+    def add_hook(self,pre:Callable=None,post:Callable=None)->Tuple[Callable,Callable]:
+        """
+        Adds hooks called around every call of a node function by `compute`, `recompute`, `acompute` and `compute_many` 
+        (except with the "processes" executor), including the calls for auxiliary nodes like ('a','x',2). Nodes forced 
+        to values or to other nodes do not call hooks, and neither do the functions returned by `compile`.
+
+        Hooks are called in the thread computing the node, so they must be thread-safe when an executor is used. 
+        Without hooks, the computations do not pay any overhead.
+
+        Args:
+            pre (Callable, optional): A function `pre(node_name, args)` called before the node function. Defaults to None.
+            post (Callable, optional): A function `post(node_name, value)` called after the node function. Defaults to None.
+
+        Returns:
+            Tuple[Callable, Callable]: A handle to pass to `remove_hook`.
+        """
+        handle = (pre,post)
+        self._hooks.append(handle)
+        self._set_hooks()
+        return handle
+
+    def remove_hook(self,handle:Tuple[Callable,Callable])->None:
+        """Removes hooks added by `add_hook`."""
+        self._hooks.remove(handle)
+        self._set_hooks()
+
+    def _set_hooks(self)->None:
+        from .profiler import hooked_plan
+        self._execution_plan = hooked_plan(self.plan,self._hooks) if self._hooks else self.plan
+        self._output_plans = {}
+        self._lazy_plans = {}
+        self._recompute_plans = {}
+        self._sweep_plans = {}
+        self._compiled_batches = {}
+        self._dependencies = {}
+        self._column_steps = {}
+        self._frame_steps = {}
+
+    def start_profiling(self,memory:bool=False):
+        """
+        Starts recording the number of calls and the wall time of every node function (see `Profiler`), and optionally 
+        the memory it allocates with `tracemalloc`, which slows down the computations.
+
+        Args:
+            memory (bool, optional): Whether to record memory allocations. Defaults to False.
+
+        Returns:
+            Profiler: The profiler, whose records are reported by `profile_report`.
+        """
+        from .profiler import Profiler
+        self.stop_profiling()
+        self._profiler = Profiler(self.plan,memory)
+        self._profiler_hook = self.add_hook(self._profiler.pre,self._profiler.post)
+        return self._profiler
+
+    def stop_profiling(self)->None:
+        """Stops the profiler started by `start_profiling`. Its records remain available in `profile_report`."""
+        if self._profiler_hook is not None:
+            self.remove_hook(self._profiler_hook)
+            self._profiler.stop()
+            self._profiler_hook = None
+
+    def profile_report(self,by:str="function")->List[Dict]:
+        """
+        Returns the records of the profiler ranked by self time, the most expensive first.
+
+        Args:
+            by (str, optional): "function" to attribute auxiliary nodes like ('a','x',2) to their origin function 'a', 
+                or "node" to report every node separately. Defaults to "function".
+
+        Returns:
+            List[Dict]: One dictionary per function (or node) with the keys "name", "calls", "self_time" (the time 
+            spent in the function), "cumulative_time" (the self time plus the self time of all its ancestors) and, 
+            if memory is recorded, "allocated" and "peak" (in bytes).
+        """
+        if self._profiler is None:
+            raise ValueError("The model is not profiled, call start_profiling first")
+        return self._profiler.report(by)
+
+    @contextlib.contextmanager
+    def trace(self,path:str):
+        """
+        A context manager recording every call of a node function made by the model while it is active (see `add_hook`) 
+        and writing them to a JSON file of the Chrome Trace Event format when it exits. The file can be loaded in 
+        Perfetto (https://ui.perfetto.dev) or chrome://tracing to see the spans of the nodes in every thread.
+
+        Example:
+            with m.trace("trace.json"):
+                m.compute(input, executor="threads")
+
+        Args:
+            path (str): The path of the JSON file.
+
+        Yields:
+            Tracer: The tracer recording the spans.
+        """
+        from .profiler import Tracer
+        tracer = Tracer()
+        handle = self.add_hook(tracer.pre,tracer.post)
+        try:
+            yield tracer
+        finally:
+            self.remove_hook(handle)
+            tracer.write(path)
+
+    def cache_stats(self)->Dict[str,Dict]:
+        """
+        Returns the counters of the caches of node results (see the `cache` argument of the `node` decorator).
+
+        Returns:
+            Dict[str, Dict]: A dictionary where keys are the names of the nodes with a cache and values are the counters 
+            of their caches, for example `{"hits": 10, "misses": 2, "evictions": 0, ...}` for an `LRU` cache.
+        """
+        return {node_name:node.node_cache.stats() for node_name,node in self.nodes.items() if hasattr(node,"node_cache")}
+
     def submodel(self,nodes_names:Union[str,List[str]]):
         """Returns a submodel of the current model. 
         The new model corresponds to the graph that includes all ancestors of the node_names, along with the node_names themselves.
 
+        The submodel is sliced from the plan of the current model, without building its graph again, and it is cached: 
+        the same `Model` object is returned for the same set of names.
+
         Args:
             nodes_names (Union[str,List[str]]): Names of nodes whose ancestors should be included in the submodel.
 
@@ -81,14 +787,27 @@ class Model():
             Model: The submodel of the  model.
         """
         nodes_names = [nodes_names] if isinstance(nodes_names, str) else nodes_names
-        subcomponent_nodes_names = set()
-        for node_name in nodes_names:
-            subcomponent_nodes_names.update(nx.ancestors(self.nodes_graph, node_name))
-        subcomponent_nodes_names.update(nodes_names)
-        submodel_nodes = {node_name:node for node_name,node in self.nodes.items() if node_name in subcomponent_nodes_names}
-        submodel = Model(submodel_nodes)
-        return submodel
-    
-
-
-
+        key = frozenset(nodes_names)
+        if key not in self._submodels:
+            for node_name in key:
+                if node_name not in self.plan.ids:
+                    raise ValueError(f"{node_name} is not a node of the model")
+            #Functions needed by nodes_names, like the ancestors of nodes_names in self.nodes_graph:
+            sources = output_sources(self.nodes)
+            subcomponent_nodes_names = set()
+            stack = list(key)
+            while stack:
+                node_name = stack.pop()
+                if node_name not in subcomponent_nodes_names:
+                    subcomponent_nodes_names.add(node_name)
+                    if node_name in self.nodes:
+                        stack.extend(node_dependencies(self.nodes[node_name]))
+                    elif node_name in sources:
+                        stack.append(sources[node_name])
+            ids = [self.plan.ids[k] for k in subcomponent_nodes_names]
+            submodel_nodes = {node_name:node for node_name,node in self.nodes.items() if node_name in subcomponent_nodes_names}
+            submodel = Model.__new__(Model)
+            submodel._init_from_plan(submodel_nodes,subplan(self._unfolded_plan,set(ids).union(self.plan.ancestors(ids))),
+                                     self.assume_pure)
+            self._submodels[key] = submodel
+        return self._submodels[key]
@@ -1,9 +1,24 @@
-import networkx as nx
-from typing import Dict,List,Callable,Union, Tuple
+from typing import Dict,List,Callable,Union, Tuple, TYPE_CHECKING
 from collections.abc import Hashable
+import operator
 from .helpers import func_args
+from .lazy import lazy_function,lazy_positions
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+def node_function(f:Callable)->Callable:
+    """
+    Returns the function called to compute a node: `f` itself, or `f` wrapped by its `node_cache` attribute. If `f` has
+    a `node_lazy` attribute, its lazy arguments are wrapped in thunks when they are values (see `lazy_function`).
+    """
+    function = f.node_cache.wrap(f) if hasattr(f,"node_cache") else f
+    if hasattr(f,"node_lazy"):
+        function = lazy_function(function,lazy_positions(f))
+    return function
 
 class ModelNode():
+    __slots__ = ("compute","inputs")
     compute:Callable
     inputs: List
 
@@ -12,18 +27,22 @@ class ModelNodeSimple(ModelNode):
     A simple node without 'forced_nodes' attribute.
     Example: node_name = 'a'
     """
+    __slots__ = ()
+
     def __init__(self,node_name:str,nodes:Dict[str,Callable]):
-        self.compute = nodes[node_name]
-        self.inputs = func_args(self.compute)
+        self.compute = node_function(nodes[node_name])
+        self.inputs = func_args(nodes[node_name])
 
 class ModelNodeWithForcedNodes(ModelNode):
     """
     A node with the 'forced_nodes' attribute.
     Example: node_name = 'a' and a.forced_nodes = {"x":1}
     """
-    def __init__(self,node_name:str,nodes:Dict[str,Callable],graph:nx.DiGraph):
-        self.compute = nodes[node_name]
-        origin_inputs = func_args(self.compute)
+    __slots__ = ()
+
+    def __init__(self,node_name:str,nodes:Dict[str,Callable],graph:"nx.DiGraph"):
+        self.compute = node_function(nodes[node_name])
+        origin_inputs = func_args(nodes[node_name])
         inputs_unordered = list(graph.predecessors(node_name))
         inputs_dict = {(k[0] if isinstance(k,tuple) else k):k for k in inputs_unordered}
         self.inputs = [inputs_dict[k] for k in origin_inputs]
@@ -33,7 +52,10 @@ class ModelNodeForcedToValue(ModelNode):
     A node forced to a hashable value.
     Example: node_name = ('a',5)
     """
+    __slots__ = ("value",)
+
     def __init__(self,forced_node_value:Hashable):
+        self.value = forced_node_value
         self.compute = lambda x = forced_node_value: x
         self.inputs = []
 
@@ -42,6 +64,8 @@ class ModelNodeForcedToNode(ModelNode):
     A node forced to another node.
     Example: node_name = ('a',('node','b'))
     """
+    __slots__ = ()
+
     def __init__(self,forced_node_value:Hashable):
             self.compute = lambda x : x
             self.inputs = [forced_node_value[1]]
@@ -51,16 +75,34 @@ class ModelNodeRecalculatedWithForcedNodes(ModelNode):
     A node that is an ancestor of a node with the 'forced_nodes' attribute and also a successor of the nodes in its 'forced_nodes'.
     Example: node_name = ('c','x',1)
     """
-    def __init__(self,node_name:Tuple,nodes:Dict[str,Callable],graph:nx.DiGraph):
+    __slots__ = ()
+
+    def __init__(self,node_name:Tuple,nodes:Dict[str,Callable],graph:"nx.DiGraph"):
         origin_node_name = node_name[0]
-        self.compute = nodes[origin_node_name]
-        origin_inputs = func_args(self.compute)
+        self.compute = node_function(nodes[origin_node_name])
+        origin_inputs = func_args(nodes[origin_node_name])
         inputs_unordered = list(graph.predecessors(node_name))
         inputs_dict = {(k[0] if isinstance(k,tuple) else k):k for k in inputs_unordered}
         self.inputs = [inputs_dict[k] for k in origin_inputs]
 
 
-def model_node_factory(node_name:Union[str, Tuple],nodes:Dict[str,Callable],graph:nx.DiGraph):
+class ModelNodeOutput(ModelNode):
+    """
+    A node unpacked from the result of a node with the 'node_outputs' attribute.
+    Example: node_name = 'mean' or ('mean','x',1) and stats.node_outputs = ("mean","std")
+    """
+    __slots__ = ("index",)
+
+    def __init__(self,node_name:Union[str, Tuple],nodes:Dict[str,Callable],graph:"nx.DiGraph"):
+        source_node_name, = graph.predecessors(node_name)
+        origin_output = node_name[0] if isinstance(node_name,tuple) else node_name
+        origin_source = source_node_name[0] if isinstance(source_node_name,tuple) else source_node_name
+        self.index = list(nodes[origin_source].node_outputs).index(origin_output)
+        self.compute = operator.itemgetter(self.index)
+        self.inputs = [source_node_name]
+
+
+def model_node_factory(node_name:Union[str, Tuple],nodes:Dict[str,Callable],graph:"nx.DiGraph"):
     """
     A factory function that selects the appropriate `ModelNode` class based on the given `node_name`.
 
@@ -83,6 +125,8 @@ def model_node_factory(node_name:Union[str, Tuple],nodes:Dict[str,Callable],grap
     """
     if node_name in nodes.keys() and hasattr(nodes[node_name],"forced_nodes"):
         return ModelNodeWithForcedNodes(node_name,nodes,graph)
+    elif isinstance(node_name,str) and node_name not in nodes:
+        return ModelNodeOutput(node_name,nodes,graph)
     elif isinstance(node_name,str):
         return ModelNodeSimple(node_name,nodes)
     elif isinstance(node_name,tuple) and len(node_name) == 2:
@@ -91,6 +135,8 @@ def model_node_factory(node_name:Union[str, Tuple],nodes:Dict[str,Callable],grap
             return ModelNodeForcedToNode(forced_node_value)
         else:
             return ModelNodeForcedToValue(forced_node_value)
+    elif isinstance(node_name,tuple) and len(node_name) > 2 and node_name[0] not in nodes:
+        return ModelNodeOutput(node_name,nodes,graph)
     elif isinstance(node_name,tuple) and len(node_name) > 2:
         return ModelNodeRecalculatedWithForcedNodes(node_name,nodes,graph)
     
\ No newline at end of file
@@ -0,0 +1,288 @@
+from typing import Dict,List,Callable,Tuple,NamedTuple,Any
+from collections.abc import Hashable
+import hashlib
+import itertools
+import operator
+import threading
+from .helpers import code_hash
+
+#Version of the format of stored plans, part of their keys:
+PLAN_FORMAT = 1
+
+#Kinds of plan nodes:
+FUNCTION = 0 #A node computed by a function of the model
+VALUE = 1 #A node forced to a value, e.g. ('x',2), or a node folded to a constant by `fold_constants`
+ALIAS = 2 #A node forced to another node, e.g. ('x',('node','y'))
+ITEM = 3 #A node unpacked from the result of a multi-output function, e.g. 'mean' for a function with
+         #node_outputs = ('mean','std')
+
+#Lock of the indexes built by plans on first access, so that threads sharing a plan build them once:
+_index_lock = threading.Lock()
+
+class PlanNode(NamedTuple):
+    """
+    A frozen record of a computed node of a `Plan`.
+
+    Attributes:
+        id (int): The integer id of the node.
+        name (Hashable): The name of the node, e.g. 'a' or ('a','x',2).
+        kind (int): FUNCTION, VALUE, ALIAS or ITEM.
+        function (Callable): The function computing the node from its arguments. For VALUE nodes it returns `value`,
+            for ALIAS nodes it returns its only argument and for ITEM nodes it returns the item `value` of its only 
+            argument.
+        args (Tuple[int, ...]): The ids of the arguments of `function`.
+        value (Any): The forced value of a VALUE node, the index of an ITEM node in the result of its multi-output 
+            function, None otherwise.
+    """
+    id: int
+    name: Hashable
+    kind: int
+    function: Callable
+    args: Tuple[int,...]
+    value: Any
+
+def identity(x):
+    return x
+
+def constant_function(value:Any)->Callable:
+    """Returns a function without arguments returning `value`."""
+    return itertools.repeat(value).__next__
+
+class Plan():
+    """
+    A frozen, integer-indexed execution plan of a model, used by all the computation methods of `Model`.
+
+    Node names are mapped to integer ids: inputs first, then computed nodes in their order of execution.
+    The structure of the model graph is kept as tuples of predecessor ids, so that computations do not need networkx.
+
+    Attributes:
+        names (Tuple[Hashable, ...]): The name of every node, indexed by id.
+        ids (Dict[Hashable, int]): The id of every node name.
+        inputs (Tuple[int, ...]): The ids of the inputs of the model.
+        nodes (Tuple[PlanNode, ...]): The computed nodes, in order of execution.
+        predecessors (Tuple[Tuple[int, ...], ...]): The ids of the predecessors of every node in the model graph,
+            indexed by id. They can differ from `args`: conditional functions also depend on the nodes their forced nodes
+            are forced to.
+        auxiliary_nodes (Tuple[int, ...]): The ids of the auxiliary nodes.
+        steps (Tuple[Tuple, ...]): The computed nodes as tuples (name, function, names of the arguments), used by
+            computations on dictionaries.
+    """
+    __slots__ = ("names","ids","inputs","nodes","predecessors","auxiliary_nodes","steps","_successors",
+                 "_ancestor_bits")
+
+    def __init__(self,names:List[Hashable],inputs:List[int],nodes:List[PlanNode],predecessors:List[List[int]],
+                 auxiliary_nodes:List[int]):
+        names = tuple(names)
+        set_attribute = super().__setattr__
+        set_attribute("names",names)
+        set_attribute("ids",{name:i for i,name in enumerate(names)})
+        set_attribute("inputs",tuple(inputs))
+        set_attribute("nodes",tuple(nodes))
+        set_attribute("predecessors",tuple(tuple(k) for k in predecessors))
+        set_attribute("auxiliary_nodes",tuple(auxiliary_nodes))
+        set_attribute("steps",tuple((node.name,node.function,tuple(names[k] for k in node.args)) for node in self.nodes))
+        set_attribute("_successors",None)
+        set_attribute("_ancestor_bits",None)
+
+    def __setattr__(self,name:str,value:Any):
+        raise AttributeError("Plan objects are frozen")
+
+    def __len__(self)->int:
+        return len(self.names)
+
+    @property
+    def successors(self)->Tuple[Tuple[int,...],...]:
+        """The ids of the successors of every node in the model graph, indexed by id."""
+        if self._successors is None:
+            with _index_lock:
+                if self._successors is None:
+                    successors = [[] for _ in self.names]
+                    for i,predecessors in enumerate(self.predecessors):
+                        for k in predecessors:
+                            successors[k].append(i)
+                    super().__setattr__("_successors",tuple(tuple(k) for k in successors))
+        return self._successors
+
+    @property
+    def ancestor_bits(self)->Tuple[int,...]:
+        """
+        The reachability index of the model graph: for every node id, a bitset (an integer whose bit k is set if the 
+        node with id k is an ancestor of the node), built in a single pass over the nodes on first access. It is built 
+        under a lock, so that threads sharing the plan build it once, and is not built at all for plans whose ancestors 
+        are never queried.
+        """
+        if self._ancestor_bits is None:
+            with _index_lock:
+                if self._ancestor_bits is None:
+                    bits = []
+                    for predecessors in self.predecessors:
+                        node_bits = 0
+                        for k in predecessors:
+                            node_bits |= bits[k] | (1 << k)
+                        bits.append(node_bits)
+                    super().__setattr__("_ancestor_bits",tuple(bits))
+        return self._ancestor_bits
+
+    def needed_ids(self,ids:List[int])->List[int]:
+        """Returns the sorted ids of some nodes and their ancestors, read from the reachability index."""
+        ancestor_bits = self.ancestor_bits
+        bits = 0
+        for k in ids:
+            bits |= ancestor_bits[k] | (1 << k)
+        return [k for k,bit in enumerate(reversed(bin(bits)[2:])) if bit == "1"]
+
+    def node(self,name:Hashable)->PlanNode:
+        """Returns the `PlanNode` of a computed node."""
+        return self.nodes[self.ids[name] - len(self.inputs)]
+
+    def ancestors(self,ids:List[int])->List[int]:
+        """Returns the sorted ids of the ancestors of nodes in the model graph."""
+        seen = set()
+        stack = list(ids)
+        while stack:
+            for k in self.predecessors[stack.pop()]:
+                if k not in seen:
+                    seen.add(k)
+                    stack.append(k)
+        return sorted(seen)
+
+    def descendants(self,ids:List[int])->List[int]:
+        """Returns the sorted ids of the descendants of nodes in the model graph."""
+        successors = self.successors
+        seen = set()
+        stack = list(ids)
+        while stack:
+            for k in successors[stack.pop()]:
+                if k not in seen:
+                    seen.add(k)
+                    stack.append(k)
+        return sorted(seen)
+
+def subplan(plan:Plan,ids:List[int])->Plan:
+    """
+    Returns the plan restricted to some of its nodes, which must include all the predecessors of the computed nodes 
+    they contain. Nodes keep their order and are given new ids.
+    """
+    ids = sorted(ids)
+    new_ids = {k:i for i,k in enumerate(ids)}
+    offset = len(plan.inputs)
+    inputs = [new_ids[k] for k in ids if k < offset]
+    nodes = [plan.nodes[k - offset] for k in ids if k >= offset]
+    nodes = [node._replace(id=new_ids[node.id],args=tuple(new_ids[k] for k in node.args)) for node in nodes]
+    predecessors = [[new_ids[i] for i in plan.predecessors[k]] for k in ids]
+    auxiliary_nodes = [new_ids[k] for k in plan.auxiliary_nodes if k in new_ids]
+    return Plan([plan.names[k] for k in ids],inputs,nodes,predecessors,auxiliary_nodes)
+
+def fold_constants(plan:Plan,is_pure:Callable[[PlanNode],bool])->Plan:
+    """
+    Returns the plan where the computed nodes depending only on constants are computed once and replaced by constants.
+
+    Nodes forced to values are constants. A node forced to another node which is a constant or unpacked from a constant 
+    becomes a constant, and so does a node computed by a function whose arguments are all constants, if 
+    `is_pure(node)` is True. Nodes whose 
+    function raises an exception are left unchanged, so that the exception is raised by computations as before. 
+    Folded nodes become VALUE nodes without arguments, but keep their predecessors in the model graph.
+
+    Args:
+        plan (Plan): The plan.
+        is_pure (Callable[[PlanNode], bool]): Whether the function of a FUNCTION node can be computed once for all 
+            computations: it returns the same value for the same arguments and has no side effects.
+
+    Returns:
+        Plan: The folded plan, or `plan` itself if no node is folded.
+    """
+    constants = {}
+    nodes = []
+    folded = False
+    for node in plan.nodes:
+        if node.kind == VALUE:
+            constants[node.id] = node.value
+        elif all(k in constants for k in node.args) and (node.kind != FUNCTION or is_pure(node)):
+            try:
+                value = node.function(*[constants[k] for k in node.args])
+            except Exception:
+                nodes.append(node)
+                continue
+            constants[node.id] = value
+            node = node._replace(kind=VALUE,function=constant_function(value),args=(),value=value)
+            folded = True
+        nodes.append(node)
+    if not folded:
+        return plan
+    return Plan(plan.names,plan.inputs,nodes,plan.predecessors,plan.auxiliary_nodes)
+
+def build_plan(graph,nodes:Dict[str,Callable],inputs:List[Hashable],call_order:List[Hashable],
+               auxiliary_nodes:List[Hashable])->Plan:
+    """
+    Builds the `Plan` of a model from its graph.
+
+    Args:
+        graph (nx.DiGraph): The model graph, created by `model_graph`.
+        nodes (Dict[str, Callable]): A dictionary of functions included in the model.
+        inputs (List[Hashable]): The names of the inputs of the model.
+        call_order (List[Hashable]): Node names in topological order of execution (excluding inputs).
+        auxiliary_nodes (List[Hashable]): The names of the auxiliary nodes.
+
+    Returns:
+        Plan: The plan of the model.
+    """
+    from .model_node import model_node_factory,ModelNodeForcedToValue,ModelNodeForcedToNode,ModelNodeOutput
+    names = list(inputs) + list(call_order)
+    ids = {name:i for i,name in enumerate(names)}
+    plan_nodes = []
+    for node_name in call_order:
+        model_node = model_node_factory(node_name,nodes,graph)
+        args = tuple(ids[k] for k in model_node.inputs)
+        if isinstance(model_node,ModelNodeForcedToValue):
+            plan_node = PlanNode(ids[node_name],node_name,VALUE,constant_function(model_node.value),args,model_node.value)
+        elif isinstance(model_node,ModelNodeForcedToNode):
+            plan_node = PlanNode(ids[node_name],node_name,ALIAS,identity,args,None)
+        elif isinstance(model_node,ModelNodeOutput):
+            plan_node = PlanNode(ids[node_name],node_name,ITEM,model_node.compute,args,model_node.index)
+        else:
+            plan_node = PlanNode(ids[node_name],node_name,FUNCTION,model_node.compute,args,None)
+        plan_nodes.append(plan_node)
+    predecessors = [[ids[k] for k in graph.predecessors(name)] for name in names]
+    return Plan(names,[ids[k] for k in inputs],plan_nodes,predecessors,[ids[k] for k in auxiliary_nodes])
+
+def origin_name(node_name:Hashable)->str:
+    """Returns the name of the function computing a node: 'a' for the nodes 'a' and ('a','x',2)."""
+    return node_name[0] if isinstance(node_name,tuple) else node_name
+
+def plan_key(nodes:Dict[str,Callable])->str:
+    """
+    Returns a hash identifying the plan of a model built from `nodes`: it combines the names of the nodes with the 
+    code (see `code_hash`) and the `forced_nodes` and `node_outputs` attributes of their functions.
+    """
+    h = hashlib.blake2b(repr(("nodemodel-plan",PLAN_FORMAT)).encode(),digest_size=20)
+    for node_name in sorted(nodes):
+        f = nodes[node_name]
+        h.update(repr((node_name,code_hash(f),list(getattr(f,"forced_nodes",{}).items()),
+                       tuple(getattr(f,"node_outputs",())))).encode())
+    return h.hexdigest()
+
+def plan_state(plan:Plan)->Dict:
+    """Returns a picklable description of a plan, without its functions. See `plan_from_state`."""
+    return {"names":plan.names,
+            "inputs":plan.inputs,
+            "nodes":[(node.kind,node.args,node.value) for node in plan.nodes],
+            "predecessors":plan.predecessors,
+            "auxiliary_nodes":plan.auxiliary_nodes}
+
+def plan_from_state(state:Dict,nodes:Dict[str,Callable])->Plan:
+    """Rebuilds a plan from the result of `plan_state`, taking the functions of the nodes from `nodes`."""
+    from .model_node import node_function
+    offset = len(state["inputs"])
+    plan_nodes = []
+    for node_id,(kind,args,value) in enumerate(state["nodes"],offset):
+        node_name = state["names"][node_id]
+        if kind == VALUE:
+            function = constant_function(value)
+        elif kind == ALIAS:
+            function = identity
+        elif kind == ITEM:
+            function = operator.itemgetter(value)
+        else:
+            function = node_function(nodes[origin_name(node_name)])
+        plan_nodes.append(PlanNode(node_id,node_name,kind,function,args,value))
+    return Plan(state["names"],state["inputs"],plan_nodes,state["predecessors"],state["auxiliary_nodes"])
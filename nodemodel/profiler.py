@@ -0,0 +1,215 @@
+from typing import Dict,List,Callable,Tuple
+from collections.abc import Hashable
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+from .plan import Plan,FUNCTION,origin_name
+
+def hooked_plan(plan:Plan,hooks:List[Tuple[Callable,Callable]])->Plan:
+    """
+    Returns a copy of a plan whose node functions call the hooks: `pre(node_name, args)` before every call and
+    `post(node_name, value)` after it. Nodes forced to values or to other nodes are not hooked.
+    """
+    nodes = [node._replace(function=hooked_function(node.name,node.function,hooks)) if node.kind == FUNCTION else node
+             for node in plan.nodes]
+    return Plan(plan.names,plan.inputs,nodes,plan.predecessors,plan.auxiliary_nodes)
+
+def hooked_function(node_name:Hashable,f:Callable,hooks:List[Tuple[Callable,Callable]])->Callable:
+    pre_hooks = [pre for pre,_ in hooks if pre is not None]
+    post_hooks = [post for _,post in hooks if post is not None]
+    if inspect.iscoroutinefunction(f):
+        @functools.wraps(f)
+        async def hooked(*args):
+            for pre in pre_hooks:
+                pre(node_name,args)
+            value = await f(*args)
+            for post in post_hooks:
+                post(node_name,value)
+            return value
+    else:
+        @functools.wraps(f)
+        def hooked(*args):
+            for pre in pre_hooks:
+                pre(node_name,args)
+            value = f(*args)
+            for post in post_hooks:
+                post(node_name,value)
+            return value
+    return hooked
+
+class NodeTimer():
+    """Base class of hooks measuring the calls of node functions, in every thread separately."""
+    def __init__(self):
+        self._local = threading.local()
+
+    def _starts(self)->Dict:
+        """Returns the start measures of the calls in progress in the current thread, by node name."""
+        starts = getattr(self._local,"starts",None)
+        if starts is None:
+            starts = self._local.starts = {}
+        return starts
+
+class Profiler():
+    """
+    Records the number of calls and the wall time of every node of a model, and optionally the memory allocated by it
+    (with `tracemalloc`). It is attached to a model by `Model.start_profiling`.
+
+    The self time of a node is the time spent in its function, excluding the time spent computing other nodes during 
+    the call: a function with lazy arguments (see `node`) computes the deferred nodes of the thunks it calls, whose 
+    time is counted in their own self time. The cumulative time of a node is its self time plus the self time of all 
+    its ancestors in the model graph, i.e. the cost of computing it from the inputs of the model.
+
+    Memory is measured as the size of the memory blocks still allocated after the call (`allocated`), excluding those 
+    of the nodes computed during the call, and the peak of the allocated memory during the call (`peak`), both 
+    relative to the start of the call. The peak includes the nodes computed during the call and is only meaningful 
+    when nodes are computed sequentially. `tracemalloc.reset_peak` needs Python 3.9: with Python 3.8, the peak is the 
+    allocated memory at the end of the call, including the nodes computed during the call.
+
+    Args:
+        plan (Plan): The plan of the profiled model.
+        memory (bool, optional): Whether to record memory allocations. `tracemalloc` is started if it is not already
+            tracing. Defaults to False.
+    """
+    def __init__(self,plan:Plan,memory:bool=False):
+        self.plan = plan
+        self.memory = memory
+        self.records = {}
+        self._lock = threading.Lock()
+        #The innermost call in progress, [node name, start, memory start, time and memory of nested calls, caller].
+        #A context variable, so that the calls of every thread and of every asyncio task are nested separately:
+        self._call = contextvars.ContextVar("nodemodel_profiler_call",default=None)
+        self._started_tracemalloc = memory and not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+
+    def pre(self,node_name:Hashable,args:tuple)->None:
+        if self.memory:
+            if hasattr(tracemalloc,"reset_peak"):
+                tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        else:
+            memory_start = 0
+        self._call.set([node_name,time.perf_counter(),memory_start,0.0,0,self._call.get()])
+
+    def post(self,node_name:Hashable,value)->None:
+        end = time.perf_counter()
+        _,start,memory_start,nested_time,nested_allocated,caller = self._call.get()
+        self._call.set(caller)
+        if self.memory:
+            current,peak = tracemalloc.get_traced_memory()
+            if not hasattr(tracemalloc,"reset_peak"):
+                peak = current
+        if caller is not None:
+            caller[3] += end - start
+            caller[4] += current - memory_start if self.memory else 0
+        with self._lock:
+            record = self.records.setdefault(node_name,{"calls":0,"self_time":0.0,"allocated":0,"peak":0})
+            record["calls"] += 1
+            record["self_time"] += end - start - nested_time
+            if self.memory:
+                record["allocated"] += current - memory_start - nested_allocated
+                record["peak"] = max(record["peak"],peak - memory_start)
+
+    def stop(self)->None:
+        """Stops `tracemalloc` if it was started by the profiler."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self)->None:
+        """Removes all records."""
+        with self._lock:
+            self.records = {}
+
+    def report(self,by:str="function")->List[Dict]:
+        """
+        Returns the records ranked by self time, the most expensive first.
+
+        Args:
+            by (str, optional): "function" to aggregate auxiliary nodes like ('a','x',2) with their origin function 'a',
+                or "node" to report every node of the model graph separately. Defaults to "function".
+
+        Returns:
+            List[Dict]: One dictionary per function (or node) with the keys "name", "calls", "self_time",
+            "cumulative_time" and, if memory is recorded, "allocated" and "peak" (in bytes).
+        """
+        if by not in ("function","node"):
+            raise ValueError(f"by must be 'function' or 'node', got {by}")
+        with self._lock:
+            records = {node_name:dict(record) for node_name,record in self.records.items()}
+        groups = {}
+        for node in self.plan.nodes:
+            if node.name in records:
+                groups.setdefault(origin_name(node.name) if by == "function" else node.name,[]).append(node.id)
+        rows = []
+        for name,ids in groups.items():
+            row = {"name":name,"calls":0,"self_time":0.0}
+            if self.memory:
+                row.update({"allocated":0,"peak":0})
+            for i in ids:
+                record = records[self.plan.names[i]]
+                row["calls"] += record["calls"]
+                row["self_time"] += record["self_time"]
+                if self.memory:
+                    row["allocated"] += record["allocated"]
+                    row["peak"] = max(row["peak"],record["peak"])
+            cost_ids = set(ids).union(self.plan.ancestors(ids))
+            row["cumulative_time"] = sum(records[self.plan.names[i]]["self_time"] for i in cost_ids
+                                         if self.plan.names[i] in records)
+            rows.append(row)
+        return sorted(rows,key=lambda row: row["self_time"],reverse=True)
+
+class Tracer(NodeTimer):
+    """
+    Records every call of a node function as a span of the Chrome Trace Event format, which can be loaded in Perfetto 
+    (https://ui.perfetto.dev) or chrome://tracing. It is attached to a model by `Model.trace`.
+
+    Every span is named after its node and carries the origin function of the node, the forced nodes of auxiliary nodes 
+    (for example {"x": "2"} for the node ('a','x',2)) and the id of the thread which computed it.
+    """
+    def __init__(self):
+        super().__init__()
+        self.events = []
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def pre(self,node_name:Hashable,args:tuple)->None:
+        self._starts()[node_name] = time.perf_counter_ns()
+
+    def post(self,node_name:Hashable,value)->None:
+        end = time.perf_counter_ns()
+        start = self._starts().pop(node_name)
+        thread = threading.current_thread()
+        event = {"name":str(node_name),"cat":"node","ph":"X","ts":start / 1000,"dur":(end - start) / 1000,
+                 "pid":self._pid,"tid":thread.ident,
+                 "args":{"node":repr(node_name),"function":origin_name(node_name),"forced_nodes":forced_context(node_name),
+                         "thread":thread.name}}
+        with self._lock:
+            self.events.append(event)
+            self._threads.setdefault(thread.ident,thread.name)
+
+    def trace(self)->Dict:
+        """Returns the trace as a dictionary of the Chrome Trace Event format."""
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+        metadata = [{"name":"thread_name","ph":"M","pid":self._pid,"tid":tid,"args":{"name":name}} 
+                    for tid,name in threads.items()]
+        return {"traceEvents":metadata + events,"displayTimeUnit":"ms"}
+
+    def write(self,path:str)->None:
+        """Writes the trace to a JSON file."""
+        with open(path,"w") as f:
+            json.dump(self.trace(),f)
+
+def forced_context(node_name:Hashable)->Dict[str,str]:
+    """Returns the forced nodes of an auxiliary node: {"x": "2", "y": "3"} for the node ('a','x',2,'y',3)."""
+    if not isinstance(node_name,tuple):
+        return {}
+    return {str(node_name[k]):repr(node_name[k + 1]) for k in range(1,len(node_name) - 1,2)}
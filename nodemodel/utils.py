@@ -1,9 +1,12 @@
 from typing import List,Dict,Callable,Union
 from collections.abc import Hashable
-from .helpers import import_modules_from_dir
+import os
+from .helpers import func_args,import_modules_from_dir,import_module,node_dependencies,node_reference,resolve_node_reference
+from .cache import NodeCache
 
 
-def node(f:Callable = None,tag:Union[str,List[str]] = None,**forced_nodes:Dict[str,Hashable])->Callable:
+def node(f:Callable = None,tag:Union[str,List[str]] = None,cache:NodeCache = None,vectorize:bool = True,
+         pure:bool = False,outputs:List[str] = None,lazy:List[str] = None,**forced_nodes:Dict[str,Hashable])->Callable:
     """
     A function decorator that adds a `node_tag` attribute to the decorated function, distinguishing it among other callables.
 
@@ -16,6 +19,22 @@ def node(f:Callable = None,tag:Union[str,List[str]] = None,**forced_nodes:Dict[s
         f (Callable, optional): The function to be decorated. Defaults to None.
         tag (Union[str, List[str]], optional): Sets the `node_tag` attribute with a string or a list of strings. 
                                                Useful for grouping nodes. Defaults to None.
+        cache (NodeCache, optional): Sets the `node_cache` attribute. Results of the function are then cached by `Model` 
+                                     according to this policy, for example `LRU(maxsize=10_000)`. Defaults to None.
+        vectorize (bool, optional): If False, sets the `node_vectorize` attribute to False, so that 
+                                    `Model.compute_columns` applies the function to every row instead of calling it 
+                                    once on whole columns. Defaults to True.
+        pure (bool, optional): If True, sets the `node_pure` attribute, declaring that the function returns the same 
+                               value for the same arguments and has no side effects. `Model` then computes it once at 
+                               construction when its arguments are all nodes forced to values. Defaults to False.
+        outputs (List[str], optional): Sets the `node_outputs` attribute with a tuple of node names. The function then 
+                                       returns a tuple (or any sequence) of values, unpacked into these nodes by 
+                                       `Model`, so that one call feeds several nodes. Defaults to None.
+        lazy (List[str], optional): Sets the `node_lazy` attribute with a tuple of argument names. These arguments are
+                                    passed as thunks: functions without arguments returning the value of the node, 
+                                    like `premium_price()`. `Model.compute` and `Model.compute_many` compute a node 
+                                    needed only through lazy arguments when its thunk is called, so untaken branches 
+                                    are never computed. Defaults to None.
         **forced_nodes: Specifies that the function is conditional by adding a `forced_nodes` attribute. The keys 
                         represent the names of the nodes to be forced, and the values indicate what these nodes 
                         are forced to.
@@ -27,37 +46,118 @@ def node(f:Callable = None,tag:Union[str,List[str]] = None,**forced_nodes:Dict[s
             forced to another node.
 
     Returns:
-        Callable: The decorated function with the `node_tag` attribute and, optionally, the `forced_nodes` attribute.
+        Callable: The decorated function with the `node_tag` attribute and, optionally, the `forced_nodes`, `node_cache`, 
+                  `node_vectorize`, `node_pure`, `node_outputs` and `node_lazy` attributes.
+
+    Raises:
+        ValueError: If a lazy argument is not an argument of the function.
     """
     def decorator(g):
         g.node_tag = tag
         if len(forced_nodes) > 0:
             g.forced_nodes = forced_nodes
+        if cache is not None:
+            g.node_cache = cache
+        if not vectorize:
+            g.node_vectorize = False
+        if pure:
+            g.node_pure = True
+        if outputs is not None:
+            g.node_outputs = tuple(outputs)
+        if lazy is not None:
+            lazy_args = [lazy] if isinstance(lazy,str) else list(lazy)
+            unknown_args = [k for k in lazy_args if k not in func_args(g)]
+            if unknown_args:
+                raise ValueError(f"Lazy arguments {unknown_args} are not arguments of {g.__name__}")
+            g.node_lazy = tuple(lazy_args)
         return g
     
     if callable(f):
-        f.node_tag = tag
-        if len(forced_nodes) > 0:
-            f.forced_nodes = forced_nodes
-        return f
+        return decorator(f)
     else:
         return decorator
 
-def load_nodes(module_dir:str)-> Dict[str,Callable]:
+def load_nodes(module_dir:str,outputs:Union[str,List[str]] = None,index_cache_dir:str = None)-> Dict[str,Callable]:
     """
     Recursively imports all functions from a module and its submodules that have a `node_tag` attribute into a dictionary.
 
     Functions can have the `node_tag` attribute either by explicitly setting it after the function definition,
     or implicitly by using the `@node` decorator.
 
+    If `outputs` is given, only the nodes needed to compute `outputs` are loaded and only the files defining them are 
+    imported. The files are first indexed with `ast` (see `index_directory`), without being executed, and a file is 
+    imported when one of its nodes is reached from `outputs` through the arguments or the nodes forced to other nodes 
+    of the functions already loaded. In this mode, nodes must be functions defined at the top level of the files 
+    of the directory, decorated with `node` or followed by an assignment of their `node_tag` attribute. The outputs 
+    of multi-output functions are read from the `outputs` argument of `node`, which must then be a literal.
+
     Args:
         module_dir (str): The directory path of the root module to search for functions with a `node_tag` attribute.
+        outputs (Union[str, List[str]], optional): Names of the nodes to compute. Defaults to None, which loads all nodes.
+        index_cache_dir (str, optional): A directory where the index of the files is stored when `outputs` is given, 
+                                         so that other processes reuse it (see `index_directory`). Defaults to None, 
+                                         which keeps the index in memory only.
 
     Returns:
         Dict[str, Callable]: A dictionary where the keys are the names of the functions and the values are the 
                              corresponding callable functions that have been imported from the specified module 
                              and its submodules.
     """
-    imported_dict = import_modules_from_dir(module_dir)
-    nodes = {k:v for k,v in imported_dict.items() if hasattr(v,"node_tag") and callable(v)}
+    if outputs is None:
+        imported_dict = import_modules_from_dir(module_dir)
+        nodes = {k:v for k,v in imported_dict.items() if hasattr(v,"node_tag") and callable(v)}
+        return nodes
+
+    from .index import index_directory
+    outputs = [outputs] if isinstance(outputs, str) else outputs
+    index = index_directory(module_dir,index_cache_dir)
+    sources = {output:indexed_node.name for indexed_node in index.values() for output in indexed_node.outputs}
+    imported_files = {}
+    nodes = {}
+    stack = list(outputs)
+    while stack:
+        node_name = stack.pop()
+        if node_name in sources:
+            node_name = sources[node_name]
+        if node_name in nodes or node_name not in index:
+            continue
+        filename = index[node_name].filename
+        if filename not in imported_files:
+            imported_files[filename] = import_module(os.path.basename(filename).split(".")[0],filename)
+        f = getattr(imported_files[filename],node_name,None)
+        if not (hasattr(f,"node_tag") and callable(f)):
+            continue
+        nodes[node_name] = f
+        stack.extend(node_dependencies(f))
     return nodes
+
+
+def model_spec(nodes:Dict[str,Callable])->Dict[str,Dict]:
+    """
+    Returns a picklable specification of a dictionary of nodes, where every function is referenced by its module and 
+    qualified name, or by its file for functions imported from a directory by `load_nodes`.
+
+    Args:
+        nodes (Dict[str, Callable]): A dictionary of node names and functions.
+
+    Returns:
+        Dict[str, Dict]: A dictionary of node names and function references, which can be sent to other processes and 
+                         turned back into functions with `nodes_from_spec`.
+
+    Raises:
+        ValueError: If a function is not defined at the top level of a module (lambdas, nested functions).
+    """
+    return {node_name:node_reference(node_name,f) for node_name,f in nodes.items()}
+
+def nodes_from_spec(spec:Dict[str,Dict])->Dict[str,Callable]:
+    """
+    Imports the functions of a specification created by `model_spec`.
+
+    Args:
+        spec (Dict[str, Dict]): A dictionary of node names and function references.
+
+    Returns:
+        Dict[str, Callable]: A dictionary of node names and functions.
+    """
+    imported_files = {}
+    return {node_name:resolve_node_reference(reference,imported_files) for node_name,reference in spec.items()}
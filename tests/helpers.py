@@ -0,0 +1,85 @@
+"""Functions shared by the test modules."""
+from nodemodel.model import Model
+from nodemodel.utils import node
+import os
+
+def model_with_forced_nodes(calls:list=None,a_offset:int=0,assume_pure:bool=False,**nodes)->Model:
+    """
+    Returns the model shared by the tests: a(x) = x + a_offset, b(a,y) = a + y computed with x forced to 2,
+    c(b) = b computed with y forced to 3 and e(b) = b*5.
+
+    Args:
+        calls (list, optional): If given, the name of every called function of the model is appended to it.
+        a_offset (int, optional): The value added to x by a. Defaults to 0.
+        assume_pure (bool, optional): The `assume_pure` argument of the model. Defaults to False.
+        **nodes: Functions replacing or adding nodes, or None to remove a node.
+    """
+    def called(node_name:str)->None:
+        if calls is not None:
+            calls.append(node_name)
+
+    def a(x):
+        called("a")
+        return x + a_offset
+
+    @node(x=2)
+    def b(a,y):
+        called("b")
+        return a + y
+
+    @node(y=3)
+    def c(b):
+        called("c")
+        return b
+
+    def e(b):
+        called("e")
+        return b*5
+
+    functions = {"a":a,"b":b,"c":c,"e":e,**nodes}
+    return Model({k:f for k,f in functions.items() if f is not None},assume_pure=assume_pure)
+
+node_1_code = '''from nodemodel import node
+
+@node(x=2)
+def b(a, y):
+    return a + y
+
+@node
+def a(x):
+    return x
+
+def z(u):
+    return u
+'''
+
+node_2_code = '''from nodemodel import node
+
+@node
+def e(b):
+    return b * 5
+
+@node(y=3)
+def c(b):
+    return b
+'''
+
+def create_folder_structure(tmp_path):
+    submodule_path = os.path.join(tmp_path, "submodule")
+    os.makedirs(submodule_path, exist_ok=True)
+
+    init_path = os.path.join(tmp_path, "__init__.py")
+    with open(init_path, 'w') as f:
+        pass
+    
+    node_1_path = os.path.join(tmp_path, "node_1.py")
+    with open(node_1_path, 'w') as f:
+        f.write(node_1_code)
+
+    init_submodule_path = os.path.join(submodule_path, "__init__.py")
+    with open(init_submodule_path, 'w') as f:
+        pass
+    
+    node_2_path = os.path.join(submodule_path, "node_2.py")
+    with open(node_2_path, 'w') as f:
+        f.write(node_2_code)
@@ -0,0 +1,119 @@
+from nodemodel.model import Model
+import asyncio
+import threading
+import pytest
+
+def test_acompute_with_async_and_forced_nodes():
+    async def e(b):
+        await asyncio.sleep(0)
+        return b*5
+
+    def c(b):
+        return b
+    c.forced_nodes = {"y":3}
+
+    async def b(a,y):
+        await asyncio.sleep(0)
+        return a + y
+    b.forced_nodes = {"x":2}
+
+    def a(x):
+        return x
+
+    m = Model({"a":a,"b":b,"c":c,"e":e})
+    assert asyncio.run(m.acompute({"x":1,"y":1})) == {'x': 1, 'y': 1, 'a': 1, 'b': 3, 'e': 15, 'c': 5}
+    assert list(asyncio.run(m.acompute({"x":1,"y":1}))) == ['x', 'y', 'a', 'b', 'e', 'c']
+    assert asyncio.run(m.acompute({"x":1,"y":1},keep_auxiliary_nodes=True)) == {'x': 1, 'y': 1, ('x', 2): 2, ('y', 3): 3, 'a': 1, 
+                                                            ('a', 'x', 2): 2, 'b': 3, ('b', 'y', 3): 5, 'e': 15, 'c': 5}
+    assert asyncio.run(m.acompute({"y":1},x=1)) == {'y': 1, 'a': 1, 'b': 3, 'e': 15, 'c': 5}
+
+def test_acompute_runs_coroutines_concurrently():
+    async def main():
+        a_started = asyncio.Event()
+        b_started = asyncio.Event()
+
+        async def a(x):
+            a_started.set()
+            await asyncio.wait_for(b_started.wait(),timeout=5)
+            return x
+
+        async def b(x):
+            b_started.set()
+            await asyncio.wait_for(a_started.wait(),timeout=5)
+            return x
+
+        async def c(a,b):
+            return a + b
+        c.forced_nodes = {"x":2}
+
+        m = Model({"a":a,"b":b,"c":c})
+        return await m.acompute({"x":1})
+
+    assert asyncio.run(main()) == {"x":1,"a":1,"b":1,"c":4}
+
+def test_acompute_with_local_server():
+    #The server answers once all the requests are open: nodes must wait for their responses concurrently
+    async def main():
+        n_requests = 3
+        opened = []
+        all_opened = asyncio.Event()
+
+        async def handle(reader,writer):
+            request = await reader.readline()
+            opened.append(request)
+            if len(opened) == n_requests:
+                all_opened.set()
+            await asyncio.wait_for(all_opened.wait(),timeout=5)
+            writer.write(request.upper())
+            await writer.drain()
+            writer.close()
+
+        async def fetch(port,path):
+            reader,writer = await asyncio.open_connection("127.0.0.1",port)
+            writer.write(f"{path}\n".encode())
+            await writer.drain()
+            response = await reader.readline()
+            writer.close()
+            await writer.wait_closed()
+            return response.decode().strip()
+
+        async def users(port):
+            return await fetch(port,"users")
+
+        async def orders(port):
+            return await fetch(port,"orders")
+
+        async def items(port):
+            return await fetch(port,"items")
+
+        def report(users,orders,items):
+            return [users,orders,items]
+
+        server = await asyncio.start_server(handle,"127.0.0.1",0)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            m = Model({"users":users,"orders":orders,"items":items,"report":report})
+            return await m.acompute({"port":port})
+
+    assert asyncio.run(main())["report"] == ["USERS","ORDERS","ITEMS"]
+
+def test_acompute_with_offloaded_sync_nodes():
+    main_thread = threading.get_ident()
+    def a(x):
+        return threading.get_ident() != main_thread
+
+    m = Model({"a":a})
+    assert asyncio.run(m.acompute({"x":1})) == {"x":1,"a":False}
+    assert asyncio.run(m.acompute({"x":1},offload_sync=True)) == {"x":1,"a":True}
+
+def test_acompute_error():
+    async def a(x):
+        raise ZeroDivisionError()
+    async def b(a):
+        return a
+    async def c(x):
+        await asyncio.sleep(10)
+
+    m = Model({"a":a,"b":b,"c":c})
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(m.acompute({"x":1}))
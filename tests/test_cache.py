@@ -0,0 +1,216 @@
+from nodemodel.model import Model
+from nodemodel.utils import node
+from nodemodel.cache import NodeCache,LRU,DiskCache
+import asyncio
+import pytest
+
+def test_lru_cache():
+    calls = []
+    @node(cache=LRU(maxsize=2))
+    def a(x):
+        calls.append(x)
+        return x * 2
+
+    @node
+    def b(a):
+        return a + 1
+
+    m = Model({"a":a,"b":b})
+    assert [m.compute({"x":x})["b"] for x in [1,2,1,3,1,2]] == [3,5,3,7,3,5]
+    assert calls == [1,2,3,2]
+    assert m.cache_stats() == {"a":{"hits":2,"misses":4,"evictions":2,"skipped":0,"size":2,"maxsize":2}}
+
+def test_lru_cache_with_forced_nodes():
+    calls = []
+    @node(cache=LRU())
+    def a(x):
+        calls.append(x)
+        return x
+
+    @node(x=2)
+    def b(a):
+        return a
+
+    @node(x=2)
+    def c(a):
+        return a
+
+    m = Model({"a":a,"b":b,"c":c})
+    assert m.compute({"x":2}) == {"x":2,"a":2,"b":2,"c":2}
+    assert m.compute_many([{"x":2},{"x":3}]) == [{"x":2,"a":2,"b":2,"c":2},{"x":3,"a":3,"b":2,"c":2}]
+    assert calls == [2,3]
+
+def test_lru_cache_with_unhashable_arguments():
+    def compute_with(unhashable):
+        calls = []
+        @node(cache=LRU(unhashable=unhashable))
+        def a(x):
+            calls.append(1)
+            return len(x)
+        m = Model({"a":a})
+        x = [1,2]
+        m.compute({"x":x})
+        m.compute({"x":x})
+        m.compute({"x":[1,2]})
+        return len(calls),m.cache_stats()["a"]
+
+    assert compute_with("skip") == (3,{"hits":0,"misses":0,"evictions":0,"skipped":3,"size":0,"maxsize":128})
+    assert compute_with("id")[0] == 2
+    assert compute_with(lambda x: tuple(x))[0] == 1
+
+def test_lru_cache_with_async_node():
+    calls = []
+    @node(cache=LRU())
+    async def a(x):
+        calls.append(x)
+        return x
+
+    m = Model({"a":a})
+    assert asyncio.run(m.acompute({"x":1})) == {"x":1,"a":1}
+    assert asyncio.run(m.acompute({"x":1})) == {"x":1,"a":1}
+    assert calls == [1]
+
+def test_lru_cache_shared_by_two_functions():
+    cache = LRU()
+    @node(cache=cache)
+    def a(x):
+        return x
+    @node(cache=cache)
+    def b(x):
+        return x
+    with pytest.raises(ValueError):
+        Model({"a":a,"b":b})
+
+def test_lru_cache_invalid_arguments():
+    with pytest.raises(ValueError):
+        LRU(maxsize=0)
+    with pytest.raises(ValueError):
+        LRU(unhashable="unknown")
+
+def test_node_cache_is_abstract():
+    with pytest.raises(TypeError):
+        NodeCache()
+
+    class NeverCache(NodeCache):
+        def key(self,f,args):
+            return None
+
+        def lookup(self,key):
+            return False,None
+
+        def store(self,key,value,elapsed):
+            pass
+
+        def stats(self):
+            return {"hits":self.hits,"misses":self.misses,"skipped":self.skipped}
+
+        def clear(self):
+            pass
+
+    cache = NeverCache()
+    @node(cache=cache)
+    def a(x):
+        return x + 1
+
+    m = Model({"a":a})
+    assert m.compute_many([{"x":k} for k in range(3)],executor=None)[2]["a"] == 3
+    assert cache.stats() == {"hits":0,"misses":0,"skipped":3}
+
+def test_disk_cache(tmp_path):
+    calls = []
+    def make_model():
+        @node(cache=DiskCache(tmp_path))
+        def a(x):
+            calls.append(x)
+            return {"value":x}
+        return Model({"a":a})
+
+    assert make_model().compute({"x":1}) == {"x":1,"a":{"value":1}}
+    m = make_model()
+    assert m.compute({"x":1}) == {"x":1,"a":{"value":1}}
+    assert m.compute({"x":2}) == {"x":2,"a":{"value":2}}
+    assert calls == [1,2]
+    stats = m.cache_stats()["a"]
+    assert (stats["hits"],stats["misses"]) == (1,1)
+    assert stats["bytes_saved"] > 0
+
+def test_disk_cache_depends_on_code(tmp_path):
+    @node(cache=DiskCache(tmp_path))
+    def a(x):
+        return x + 1
+    assert Model({"a":a}).compute({"x":1}) == {"x":1,"a":2}
+
+    @node(cache=DiskCache(tmp_path))
+    def a(x):
+        return x + 2
+    assert Model({"a":a}).compute({"x":1}) == {"x":1,"a":3}
+
+def test_disk_cache_key_of_sets_and_dictionaries(tmp_path):
+    calls = []
+    def make_model():
+        @node(cache=DiskCache(tmp_path))
+        def a(x,y):
+            calls.append(1)
+            return len(x) + len(y)
+        return Model({"a":a})
+
+    #{1,9} and {9,1} are equal sets iterated (and pickled) in different orders
+    assert list({1,9}) != list({9,1})
+    assert make_model().compute({"x":{1,9},"y":{"u":1,"v":[2,frozenset({3})]}})["a"] == 4
+    assert make_model().compute({"x":{9,1},"y":{"v":[2,frozenset({3})],"u":1}})["a"] == 4
+    assert calls == [1]
+    make_model().compute({"x":{1,9},"y":{"u":1,"v":(2,frozenset({3}))}})
+    assert calls == [1,1]
+
+def test_disk_cache_with_arrays(tmp_path):
+    np = pytest.importorskip("numpy")
+    pd = pytest.importorskip("pandas")
+    calls = []
+    @node(cache=DiskCache(tmp_path))
+    def a(x,df):
+        calls.append(1)
+        return x * df["u"].sum()
+
+    m = Model({"a":a})
+    df = pd.DataFrame({"u":[1.0,2.0]})
+    first = m.compute({"x":np.arange(3.0),"df":df})["a"]
+    second = m.compute({"x":np.arange(3.0),"df":df.copy()})["a"]
+    third = m.compute({"x":np.arange(3.0),"df":df + 1})["a"]
+    assert calls == [1,1]
+    assert isinstance(second,np.memmap)
+    assert np.array_equal(first,second)
+    assert np.array_equal(third,np.arange(3.0) * 5)
+
+def test_disk_cache_eviction(tmp_path):
+    np = pytest.importorskip("numpy")
+    cache = DiskCache(tmp_path,max_bytes=2000)
+    @node(cache=cache)
+    def a(x):
+        return np.full(100,x,dtype=np.float64)
+
+    m = Model({"a":a})
+    for x in range(5):
+        m.compute({"x":x})
+    stats = m.cache_stats()["a"]
+    assert stats["evictions"] == 3
+    assert stats["size_bytes"] <= 2000
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+    cache.clear()
+    assert list(tmp_path.glob("*.npy")) == []
+
+def test_disk_cache_store_existing_key(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache.store("k",b"x" * 1000,0.0)
+    size = cache.stats()["size_bytes"]
+    for _ in range(3):
+        cache.store("k",b"x" * 1000,0.0)
+    assert cache.stats()["size_bytes"] == size == DiskCache(tmp_path).stats()["size_bytes"]
+
+def test_disk_cache_with_unpicklable_arguments(tmp_path):
+    @node(cache=DiskCache(tmp_path))
+    def a(x):
+        return 1
+
+    m = Model({"a":a})
+    m.compute({"x":lambda: 1})
+    assert m.cache_stats()["a"]["skipped"] == 1
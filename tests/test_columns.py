@@ -0,0 +1,58 @@
+from nodemodel import Model,node
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+np = pytest.importorskip("numpy")
+
+def test_compute_columns_matches_compute():
+    m = model_with_forced_nodes(a_offset=1)
+    x = np.arange(5.0)
+    y = np.arange(5.0) * 10
+    columns = {"x":x,"y":y}
+    result = m.compute_columns(columns,keep_auxiliary_nodes=True)
+    assert columns == {"x":x,"y":y}
+    for i in range(5):
+        expected = m.compute({"x":x[i],"y":y[i]},keep_auxiliary_nodes=True)
+        assert set(result) == set(expected)
+        for k,v in expected.items():
+            assert result[k].shape == (5,)
+            assert result[k][i] == v
+    assert set(m.compute_columns(columns)) == {"x","y","a","b","c","e"}
+    assert set(m.compute_columns(columns,outputs="e")) == {"x","y","e"}
+
+def test_compute_columns_broadcasts_scalars():
+    def a(x):
+        return x + 1
+
+    @node(x=2)
+    def b(a):
+        return a
+
+    def c():
+        return 7
+
+    m = Model({"a":a,"b":b,"c":c})
+    result = m.compute_columns({"x":np.arange(3)})
+    assert np.array_equal(result["b"],[3,3,3])
+    assert np.array_equal(result["c"],[7,7,7])
+
+def test_compute_columns_without_vectorize():
+    def a(x):
+        return x + 1
+
+    @node(vectorize=False)
+    def b(a,label):
+        return a * 2 if label == "double" else a
+
+    @node(vectorize=False)
+    def c(label):
+        return {"double":("d",2)}.get(label,("s",1))
+
+    m = Model({"a":a,"b":b,"c":c})
+    result = m.compute_columns({"x":np.arange(3),"label":np.array(["double","single","double"])})
+    assert result["b"].tolist() == [2,2,6]
+    assert result["b"].dtype != object
+    assert result["c"].dtype == object
+    assert result["c"].tolist() == [("d",2),("s",1),("d",2)]
+    assert not hasattr(a,"node_vectorize")
+    assert b.node_vectorize is False
@@ -0,0 +1,57 @@
+from nodemodel.model import Model
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+def test_compile_returns_same_result_as_compute():
+    m = model_with_forced_nodes()
+    compute = m.compile()
+    assert compute({"x":1,"y":1}) == m.compute({"x":1,"y":1}) == {'x': 1, 'y': 1, 'a': 1, 'b': 3, 'e': 15, 'c': 5}
+    assert list(compute({"x":1,"y":1}).keys()) == list(m.compute({"x":1,"y":1}).keys())
+    assert compute({"x":1,"y":1},keep_auxiliary_nodes=True) == m.compute({"x":1,"y":1},keep_auxiliary_nodes=True)
+
+def test_compile_is_cached():
+    m = model_with_forced_nodes()
+    assert m.compile() is m.compile()
+
+def test_compile_forced_nodes_to_nodes():
+    def a():
+        return 1
+    def b(a):
+        return a
+    def c(b):
+        return b
+    def d(c):
+        return c
+    d.forced_nodes = {"a":("node","e")}
+    m = Model({"a":a,"b":b,"c":c,"d":d})
+    assert m.compile()({"e":5}) == {'e': 5, 'a': 1, 'b': 1, 'c': 1, 'd': 5}
+    assert m.compile()({"e":5},keep_auxiliary_nodes=True) == m.compute({"e":5},keep_auxiliary_nodes=True)
+
+def test_compile_with_kwargs():
+    def a(x):
+        return x
+
+    m = Model({"a":a})
+    assert m.compile()({},x=1) == {"a":1}
+
+def test_compile_with_non_literal_forced_values():
+    def b(a):
+        return a
+    b.forced_nodes = {"x":frozenset({1,2})}
+
+    def c(a):
+        return a
+    c.forced_nodes = {"x":float("inf")}
+
+    def a(x):
+        return x
+
+    m = Model({"a":a,"b":b,"c":c})
+    assert m.compile()({"x":1}) == {"x":1,"a":1,"b":frozenset({1,2}),"c":float("inf")}
+
+def test_compile_missing_input():
+    def a(x):
+        return x
+
+    with pytest.raises(KeyError):
+        Model({"a":a}).compile()({})
@@ -0,0 +1,30 @@
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+def test_compute_many():
+    m = model_with_forced_nodes()
+    records = [{"x":i,"y":1} for i in range(3)]
+    results = m.compute_many(records)
+    assert results == [m.compute({"x":i,"y":1}) for i in range(3)]
+    assert results[0] is records[0]
+
+def test_compute_many_with_auxiliary_nodes():
+    m = model_with_forced_nodes()
+    results = m.compute_many(({"x":i,"y":1} for i in range(3)),keep_auxiliary_nodes=True)
+    assert results == [m.compute({"x":i,"y":1},keep_auxiliary_nodes=True) for i in range(3)]
+
+def test_compute_many_with_outputs():
+    m = model_with_forced_nodes()
+    records = [{"x":i,"y":1} for i in range(3)]
+    assert m.compute_many(records,outputs=["c","x"]) == [{"c":5,"x":0},{"c":5,"x":1},{"c":5,"x":2}]
+    assert m.compute_many(records,outputs="e") == [{"e":15},{"e":15},{"e":15}]
+    assert records == [{"x":i,"y":1} for i in range(3)]
+
+def test_compute_many_with_unknown_outputs():
+    m = model_with_forced_nodes()
+    with pytest.raises(ValueError):
+        m.compute_many([{"x":1,"y":1}],outputs=["z"])
+
+def test_compute_many_empty():
+    m = model_with_forced_nodes()
+    assert m.compute_many([]) == []
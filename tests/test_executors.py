@@ -0,0 +1,54 @@
+from nodemodel.model import Model
+from nodemodel.utils import node
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+@node(x=("node","z"))
+def d(a):
+    return a
+
+def test_compute_with_threads():
+    m = model_with_forced_nodes(d=d)
+    assert m.compute({"x":1,"y":1,"z":7},executor="threads") == m.compute({"x":1,"y":1,"z":7})
+    assert (m.compute({"x":1,"y":1,"z":7},executor="threads",keep_auxiliary_nodes=True) == 
+            m.compute({"x":1,"y":1,"z":7},keep_auxiliary_nodes=True))
+    assert list(m.compute({"x":1,"y":1,"z":7},executor="threads")) == list(m.compute({"x":1,"y":1,"z":7}))
+    assert m.compute({"y":1,"z":7},executor="threads",max_workers=2,x=1) == {'y': 1, 'z': 7, 'a': 1, 'b': 3, 'd': 7, 'e': 15, 'c': 5}
+
+def test_compute_with_existing_executor():
+    m = model_with_forced_nodes(d=d)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert m.compute({"x":1,"y":1,"z":7},executor=pool) == m.compute({"x":1,"y":1,"z":7})
+
+def test_compute_with_threads_runs_branches_concurrently():
+    barrier = threading.Barrier(2,timeout=5)
+    def a(x):
+        barrier.wait()
+        return x
+    def b(x):
+        barrier.wait()
+        return x
+    def c(a,b):
+        return a + b
+
+    m = Model({"a":a,"b":b,"c":c})
+    assert m.compute({"x":1},executor="threads",max_workers=2) == {"x":1,"a":1,"b":1,"c":2}
+
+def test_compute_with_threads_error():
+    def a(x):
+        raise ZeroDivisionError()
+    def b(a):
+        return a
+
+    m = Model({"a":a,"b":b})
+    with pytest.raises(ZeroDivisionError):
+        m.compute({"x":1},executor="threads")
+
+def test_compute_with_unknown_executor():
+    def a(x):
+        return x
+
+    with pytest.raises(ValueError):
+        Model({"a":a}).compute({"x":1},executor="unknown")
@@ -0,0 +1,70 @@
+from nodemodel.model import Model
+from nodemodel.utils import node
+from nodemodel.plan import VALUE,FUNCTION
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+def model_with_pure_nodes(calls,assume_pure=False):
+    """The shared model where a is pure, with a node d without arguments instead of e."""
+    @node(pure=not assume_pure)
+    def a(x):
+        calls.append("a")
+        return x + 1
+
+    def d():
+        calls.append("d")
+        return 10
+
+    return model_with_forced_nodes(calls,assume_pure=assume_pure,a=a,d=d,e=None)
+
+def test_fold_pure_nodes():
+    calls = []
+    m = model_with_pure_nodes(calls)
+    assert calls == ["a"]
+    assert m.plan.node(("a","x",2)).kind == VALUE
+    assert m.plan.node(("a","x",2)).value == 3
+    assert m.plan.node("a").kind == FUNCTION
+    assert m.plan.node("d").kind == FUNCTION
+    calls.clear()
+    expected = {"x":1,"y":1,"a":2,"b":4,"c":6,"d":10}
+    assert m.compute({"x":1,"y":1}) == expected
+    assert m.compute_many([{"x":1,"y":1}]) == [expected]
+    assert m.compile()({"x":1,"y":1}) == expected
+    assert "a" in calls and calls.count("a") == 3
+    assert m.compute({"x":1,"y":1},keep_auxiliary_nodes=True)[("a","x",2)] == 3
+    assert set(m.graph.predecessors(("a","x",2))) == {("x",2)}
+
+def test_fold_with_assume_pure():
+    calls = []
+    m = model_with_pure_nodes(calls,assume_pure=True)
+    folded = {node.name for node in m.plan.nodes if node.kind == VALUE}
+    assert folded == {("x",2),("y",3),("a","x",2),("b","y",3),"c","d"}
+    calls.clear()
+    assert m.compute({"x":1,"y":1}) == {"x":1,"y":1,"a":2,"b":4,"c":6,"d":10}
+    assert sorted(calls) == ["a","b"]
+    assert m.submodel("c").assume_pure
+    assert m.submodel("c").plan.node(("a","x",2)).kind == VALUE
+    assert Model(m.nodes).plan.node("d").kind == FUNCTION
+
+def test_fold_keeps_failing_nodes():
+    def a(x):
+        return 1 / x
+
+    @node(x=0)
+    def b(a):
+        return a
+
+    m = Model({"a":a,"b":b},assume_pure=True)
+    assert m.plan.node(("a","x",0)).kind == FUNCTION
+    with pytest.raises(ZeroDivisionError):
+        m.compute({"x":1})
+
+def test_saved_plan_is_not_folded(tmp_path):
+    calls = []
+    m = model_with_pure_nodes(calls,assume_pure=True)
+    path = tmp_path / "model.plan"
+    m.save_plan(path)
+    loaded = Model.load_plan(path,m.nodes)
+    assert loaded.plan.node("d").kind == FUNCTION
+    assert Model.load_plan(path,m.nodes,assume_pure=True).plan.node("d").kind == VALUE
+    assert loaded.compute({"x":1,"y":1}) == m.compute({"x":1,"y":1})
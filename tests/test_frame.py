@@ -0,0 +1,40 @@
+from nodemodel import node
+import warnings
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+@node(vectorize=False)
+def label(e):
+    return "big" if e > 20 else "small"
+
+def test_compute_frame_matches_compute():
+    m = model_with_forced_nodes(a_offset=1,label=label)
+    df = pd.DataFrame({"x":[1,2,3],"y":[10,20,30]},index=[7,8,9])
+    result = m.compute_frame(df)
+    assert list(df.columns) == ["x","y"]
+    assert list(result.columns) == ["x","y"] + [k for k in m.call_order if k in m.nodes]
+    expected = pd.DataFrame([m.compute(row) for row in df.to_dict(orient="records")],index=df.index)
+    pd.testing.assert_frame_equal(result,expected[result.columns])
+    assert np.shares_memory(result["x"].to_numpy(),df["x"].to_numpy())
+
+def test_compute_frame_outputs_and_auxiliary_nodes():
+    m = model_with_forced_nodes(a_offset=1,label=label)
+    df = pd.DataFrame({"x":[1,2,3],"y":[10,20,30],"e":[0,0,0]})
+    assert list(m.compute_frame(df,outputs="e").columns) == ["x","y","e"]
+    assert m.compute_frame(df,outputs="e")["e"].tolist() == [65,115,165]
+    assert list(m.compute_frame(df,outputs=["c","x"]).columns) == ["x","y","e","c"]
+    result = m.compute_frame(df,keep_auxiliary_nodes=True)
+    assert set(m.auxiliary_nodes) <= set(result.columns)
+    assert result[("b","y",3)].tolist() == [6,6,6]
+
+def test_compute_frame_in_chunks_without_fragmentation():
+    m = model_with_forced_nodes(a_offset=1,label=label)
+    df = pd.DataFrame({"x":np.arange(100),"y":np.arange(100) * 2})
+    with warnings.catch_warnings():
+        warnings.simplefilter("error",pd.errors.PerformanceWarning)
+        chunked = m.compute_frame(df,chunk_size=30)
+    pd.testing.assert_frame_equal(chunked,m.compute_frame(df))
+    assert chunked["label"].tolist() == ["small"] + ["big"] * 99
@@ -1,8 +1,13 @@
 from nodemodel.graph_functions import nodes_graph
 from nodemodel.graph_functions import node_ancestors_graph
+from nodemodel.graph_functions import node_forced_ancestors_graph
+from nodemodel.graph_functions import renamable_ancestors
 from nodemodel.graph_functions import rename_forced_node_descendants
 from nodemodel.graph_functions import model_graph
+from nodemodel.graph_functions import remove_predecessors_edges
+import nodemodel.graph_functions as graph_functions
 import networkx as nx
+import random
 
 def test_nodes_graph():
     def b(a,x):
@@ -36,6 +41,32 @@ def test_node_ancestors_graph():
     assert set(h.edges()) == {('a', 'b'), ('b', 'c')}
     assert set(h.nodes()) == {'a', 'b', 'c'}
 
+def test_node_forced_ancestors_graph():
+    g = nx.DiGraph()
+    g.add_edges_from([("a","b"),("b","c"),("c","d"),("e","c"),("f","e"),("x","b"),("d","g")])
+    h = node_forced_ancestors_graph(graph=g,node="d",forced_nodes=["b","g","y"])
+
+    assert set(h.edges()) == {('a', 'b'), ('x', 'b'), ('b', 'c'), ('e', 'c'), ('c', 'd')}
+    assert set(h.nodes()) == {'a', 'b', 'c', 'd', 'e', 'x'}
+    h = node_forced_ancestors_graph(graph=g,node="d",forced_nodes=["b","g","y"],positions={k:i for i,k in enumerate(g)})
+    assert list(h.nodes()) == [k for k in g if k in h]
+
+def test_renamable_ancestors():
+    g = nx.DiGraph()
+    g.add_edges_from([("a","b"),("b","c"),("c","d"),("e","c"),("f","e"),("x","b"),("d","g")])
+    forced_items = [("b",1),("g",2),("y",3)]
+    ancestors_forced_names = {}
+    copies = {}
+    ordered_nodes,copied_nodes = renamable_ancestors(g,"d",forced_items,{"b","g","y"},ancestors_forced_names,copies)
+    assert ordered_nodes == ["b","c","d"]
+    assert copied_nodes == {}
+    assert ancestors_forced_names["c"] == frozenset({"b"}) and ancestors_forced_names["e"] == frozenset()
+    #The search stops at nodes copied before with the same forced values
+    copies[("c",(("b",1),))] = (("c","b",1),(("b",1),))
+    ordered_nodes,copied_nodes = renamable_ancestors(g,"d",forced_items,{"b","g","y"},ancestors_forced_names,copies)
+    assert ordered_nodes == ["c","d"]
+    assert copied_nodes == {"c":(("c","b",1),(("b",1),))}
+
 def rename_forced_node_descendants():
     g = nx.DiGraph()
     g.add_edges_from([("a",("b","y","5")),(("b","y","5"),"c"),("c","d"),("e","d")])
@@ -101,4 +132,99 @@ def test_model_graph_with_forced_node_to_node():
         (('b', 'a', ('node', 'e')), ('c', 'a', ('node', 'e'))), 
         (('c', 'a', ('node', 'e')), 'd'), ('e', 'd')}
     assert set(h.nodes()) == {"a","b","c","d","e",("a",('node', 'e')),("b","a",('node', 'e')),("c","a",('node', 'e'))}
-    
\ No newline at end of file
+
+def ordered_ancestors_graph(graph,node):
+    """`node_ancestors_graph` with the nodes and edges of the subgraph in the order of `graph`."""
+    node_ancestors = nx.ancestors(graph,node) | {node}
+    subgraph = nx.DiGraph()
+    subgraph.add_nodes_from(k for k in graph if k in node_ancestors)
+    subgraph.add_edges_from((u,v) for u in subgraph for v in graph.successors(u) if v in node_ancestors)
+    return subgraph
+
+def reference_model_graph(nodes_graph,nodes):
+    """The implementation of `model_graph` copying the ancestors of every conditional function, kept as a reference."""
+    graph = nodes_graph.copy()
+    cond_nodes = [k for k in nx.topological_sort(nodes_graph) if k in nodes and hasattr(nodes[k],"forced_nodes")]
+    for cond_node in cond_nodes:
+        cond_node_ancestors_graph = ordered_ancestors_graph(graph,cond_node)
+        forced_nodes = dict(sorted(nodes[cond_node].forced_nodes.items()))
+        for forced_node,forced_node_value in forced_nodes.items():
+            if forced_node in cond_node_ancestors_graph and forced_node != cond_node:
+                cond_node_ancestors_graph = remove_predecessors_edges(cond_node_ancestors_graph,forced_node)
+                cond_node_ancestors_graph = graph_functions.rename_forced_node_descendants(cond_node_ancestors_graph,
+                                                                                           forced_node,forced_node_value,
+                                                                                           cond_node)
+                if isinstance(forced_node_value,tuple) and len(forced_node_value) == 2 and forced_node_value[0] == "node":
+                    graph.add_edge(forced_node_value[1],(forced_node,forced_node_value))
+        graph = remove_predecessors_edges(graph,cond_node)
+        graph = nx.compose(graph,cond_node_ancestors_graph)
+    return graph
+
+def random_nodes(rng):
+    """Random functions n0, n1, ... depending on earlier functions and inputs, some of them conditional."""
+    nodes = {}
+    names = ["x0","x1"]
+    for i in range(rng.randint(2,12)):
+        args = rng.sample(names,rng.randint(0,min(3,len(names))))
+        namespace = {}
+        exec(f"def n{i}({','.join(args)}): pass",namespace)
+        f = namespace[f"n{i}"]
+        if rng.random() < 0.3:
+            forced = rng.sample(names,min(len(names),rng.randint(1,2)))
+            f.forced_nodes = {k:(("node",rng.choice(names)) if rng.random() < 0.2 else rng.randint(0,2)) for k in forced}
+        nodes[f"n{i}"] = f
+        names.append(f"n{i}")
+    return nodes
+
+def test_model_graph_matches_reference_implementation():
+    rng = random.Random(0)
+    for _ in range(500):
+        nodes = random_nodes(rng)
+        try:
+            g = nodes_graph(nodes)
+        except ValueError:
+            #A node forced to one of its descendants creates a cycle
+            continue
+        h = model_graph(g,nodes)
+        expected = reference_model_graph(g,nodes)
+        assert set(h.nodes()) == set(expected.nodes())
+        assert set(h.edges()) == set(expected.edges())
+        #The order of the nodes, and so the call order of models, is the same as well
+        assert list(nx.topological_sort(h)) == list(nx.topological_sort(expected))
+
+def layered_nodes(depth,width=20):
+    """`depth` layers of `width` functions depending on two functions of the previous layer, every 10th function 
+    being conditional on the input x0."""
+    nodes = {}
+    previous = [f"x{i}" for i in range(width)]
+    for d in range(depth):
+        layer = []
+        for i in range(width):
+            args = [previous[i],previous[(i + 1) % width]]
+            namespace = {}
+            exec(f"def n{d}_{i}({','.join(args)}): pass",namespace)
+            f = namespace[f"n{d}_{i}"]
+            if (d * width + i) % 10 == 9:
+                f.forced_nodes = {"x0":(d * width + i) % 3}
+            nodes[f"n{d}_{i}"] = f
+            layer.append(f"n{d}_{i}")
+        previous = layer
+    return nodes
+
+def test_model_graph_scales_linearly(monkeypatch):
+    #Copies made for previous conditional functions are not renamed again: the renamed ancestors graphs grow 
+    #with the number of nodes, not with the number of ancestors of every conditional function
+    sizes = []
+    renamed_ancestors_graph = graph_functions.renamed_ancestors_graph
+    def recorded(*args):
+        result = renamed_ancestors_graph(*args)
+        sizes.append(len(result[0]))
+        return result
+    monkeypatch.setattr(graph_functions,"renamed_ancestors_graph",recorded)
+    totals = []
+    for depth in (20,80):
+        sizes.clear()
+        nodes = layered_nodes(depth)
+        model_graph(nodes_graph(nodes),nodes)
+        totals.append(sum(sizes))
+    assert totals[1] < 5 * totals[0]
@@ -0,0 +1,198 @@
+from nodemodel import Model,node,LRU
+import pytest
+
+def pricing_model(calls):
+    def premium_price(base):
+        calls.append("premium_price")
+        return base * 2
+
+    def basic_price(discount):
+        calls.append("basic_price")
+        return discount * 0.5
+
+    def discount(base):
+        calls.append("discount")
+        return base - 1
+
+    @node(lazy=["premium_price","basic_price"])
+    def price(is_premium,premium_price,basic_price):
+        return premium_price() if is_premium else basic_price()
+
+    def label(price):
+        return f"{price:.1f}"
+
+    return Model({"premium_price":premium_price,"basic_price":basic_price,"discount":discount,"price":price,
+                  "label":label})
+
+def test_untaken_branch_is_not_computed():
+    calls = []
+    m = pricing_model(calls)
+    result = m.compute({"is_premium":True,"base":10})
+    assert result == {"is_premium":True,"base":10,"premium_price":20,"price":20,"label":"20.0"}
+    assert calls == ["premium_price"]
+    calls.clear()
+    result = m.compute({"is_premium":False,"base":10},outputs="label")
+    assert result == {"is_premium":False,"base":10,"label":"4.5"}
+    assert calls == ["discount","basic_price"]
+
+def test_lazy_arguments_in_batch_mode():
+    calls = []
+    m = pricing_model(calls)
+    records = [{"is_premium":k % 2 == 0,"base":k} for k in range(4)]
+    assert m.compute_many([dict(r) for r in records],outputs=["price"]) == [{"price":0},{"price":0.0},{"price":4},
+                                                                              {"price":1.0}]
+    assert calls.count("premium_price") == 2 and calls.count("basic_price") == 2
+    calls.clear()
+    results = m.compute_many([dict(r) for r in records])
+    assert [r["label"] for r in results] == ["0.0","0.0","4.0","1.0"]
+    assert "basic_price" not in results[0] and "premium_price" not in results[1]
+    assert len(calls) == 6
+
+def test_eager_executors_pass_thunks_of_values():
+    m = pricing_model([])
+    expected = {"is_premium":False,"base":10,"premium_price":20,"discount":9,"basic_price":4.5,"price":4.5,
+                "label":"4.5"}
+    assert m.compute({"is_premium":False,"base":10},executor="threads") == expected
+    assert m.compute({"is_premium":False,"base":10},free_intermediates=True) == expected
+    assert m.compile()({"is_premium":False,"base":10}) == expected
+
+def test_shared_ancestor_is_computed_once():
+    calls = []
+    def shared(x):
+        calls.append("shared")
+        return x + 1
+
+    def left(shared):
+        return shared * 2
+
+    def right(shared):
+        return shared * 3
+
+    @node(lazy=["left","right"])
+    def total(left,right):
+        return left() + right() + left()
+
+    m = Model({"shared":shared,"left":left,"right":right,"total":total})
+    assert m.compute({"x":1},outputs="total") == {"x":1,"total":14}
+    assert calls == ["shared"]
+
+def test_lazy_argument_computed_eagerly_elsewhere():
+    calls = []
+    def a(x):
+        calls.append("a")
+        return x + 1
+
+    @node(lazy="a")
+    def b(flag,a):
+        return a() if flag else 0
+
+    def c(a,b):
+        return a + b
+
+    m = Model({"a":a,"b":b,"c":c})
+    assert m.compute({"x":1,"flag":True}) == {"x":1,"flag":True,"a":2,"b":2,"c":4}
+    assert calls == ["a"]
+
+def test_lazy_with_forced_nodes_and_cache():
+    cache = LRU()
+    def a(x):
+        return x + 1
+
+    @node(lazy=["a"],cache=cache)
+    def b(flag,a):
+        return a() if flag else -1
+
+    @node(x=5)
+    def c(b):
+        return b
+
+    m = Model({"a":a,"b":b,"c":c})
+    assert m.compute({"x":1,"flag":True}) == {"x":1,"flag":True,"a":2,"b":2,"c":6}
+    assert m.compute({"x":1,"flag":False}) == {"x":1,"flag":False,"b":-1,"c":-1}
+    assert cache.hits == 0 and cache.skipped == 4
+
+def test_unknown_lazy_argument():
+    with pytest.raises(ValueError):
+        @node(lazy=["y"])
+        def a(x):
+            return x
+
+def test_compute_many_matches_compute_with_nested_lazy_arguments():
+    def a(x):
+        return x + 1
+
+    @node(lazy=["a","y"])
+    def b(flag,a,y):
+        return a() if flag else y()
+
+    @node(lazy="b")
+    def c(flag2,b):
+        return b() if flag2 else 0
+
+    @node(x=5)
+    def d(c):
+        return c
+
+    m = Model({"a":a,"b":b,"c":c,"d":d})
+    #The input y is only read when the thunk of y is called
+    records = [{"x":1,"flag":True,"flag2":True},{"x":1,"flag":False,"flag2":False},
+               {"x":1,"flag":False,"flag2":True,"y":7}]
+    for kwargs in ({},{"keep_auxiliary_nodes":True}):
+        expected = [m.compute(dict(record),**kwargs) for record in records]
+        assert m.compute_many([dict(record) for record in records],**kwargs) == expected
+    assert m.compute_many(records,outputs=["d","c"]) == [{"d":6,"c":2},{"d":0,"c":0},{"d":7,"c":7}]
+    assert "a" not in m.compute(dict(records[1]))
+
+def test_compute_again_on_the_same_dictionary():
+    calls = []
+    m = pricing_model(calls)
+    result = m.compute({"is_premium":True,"base":1})
+    result["base"] = 5
+    assert m.compute(result)["premium_price"] == 10
+    assert result["price"] == 10
+    result["is_premium"] = False
+    m.compute(result)
+    assert "premium_price" not in result and result["price"] == 2.0
+    records = [{"is_premium":True,"base":1}]
+    m.compute_many(records)
+    records[0].update(base=5,is_premium=False)
+    assert m.compute_many(records) == [m.compute({"is_premium":False,"base":5})]
+
+def test_deferred_node_given_in_input_is_computed():
+    m = pricing_model([])
+    expected = m.compute({"is_premium":True,"base":10})
+    assert m.compute({"is_premium":True,"base":10,"premium_price":999}) == expected
+    assert m.compute({"is_premium":True,"base":10},premium_price=999)["price"] == 20
+    assert m.compute_many([{"is_premium":True,"base":10,"premium_price":999}],outputs=["price"]) == [{"price":20}]
+
+def test_recompute_with_lazy_arguments():
+    calls = []
+    m = pricing_model(calls)
+    result = m.recompute(m.compute({"is_premium":False,"base":10}),is_premium=True)
+    assert result == m.compute({"is_premium":True,"base":10}) | {"discount":9,"basic_price":4.5}
+    expected = m.compute({"is_premium":True,"base":4})
+    calls.clear()
+    assert m.recompute(result,base=4) == expected
+    assert calls == ["premium_price"]
+    assert m.recompute(m.compute({"is_premium":True,"base":10}),is_premium=False)["label"] == "4.5"
+
+def test_folded_constants_do_not_change_the_returned_nodes():
+    def c(x):
+        return x + 1
+    c.forced_nodes = {"x":5}
+
+    def d(c):
+        return c * 2
+
+    @node(lazy=["c"])
+    def e(flag,c):
+        return c() if flag else 0
+
+    for nodes in ({"c":c,"d":d,"e":e},{"c":c,"e":e}):
+        models = [Model(nodes),Model(nodes,assume_pure=True)]
+        for flag in (0,1):
+            for outputs in (None,"e",["c","e"]):
+                results = [m.compute({"x":1,"flag":flag},outputs=outputs) for m in models]
+                assert results[0] == results[1]
+            results = [m.compile()({"x":1,"flag":flag}) for m in models]
+            assert results[0] == results[1]
@@ -1,55 +1,109 @@
 from nodemodel.utils import load_nodes
 from nodemodel.model import Model
+from nodemodel.index import index_directory,index_file
 import os
+from tests.helpers import create_folder_structure
 
-node_1_code = '''from nodemodel import node
+def test_load_nodes(tmp_path):
+    create_folder_structure(tmp_path)
+    nodes = load_nodes(tmp_path)
+    m = Model(nodes)
+    assert m.compute({"x":1,"y":1}) == {'x': 1, 'y': 1, 'a': 1, 'b': 3, 'e': 15, 'c': 5}
 
-@node(x=2)
-def b(a, y):
-    return a + y
+node_3_code = '''raise RuntimeError("This module must not be imported")
 
-@node
-def a(x):
-    return x
+from nodemodel import node
 
-def z(u):
-    return u
+@node
+def f(e):
+    return e
 '''
 
-node_2_code = '''from nodemodel import node
+node_4_code = '''import nodemodel as nm
+from nodemodel import node as n
 
-@node
-def e(b):
-    return b * 5
+@n(tag="g")
+def g(a):
+    return a
 
-@node(y=3)
-def c(b):
-    return b
-'''
+@nm.node
+def h(g, u=1):
+    return g
 
-def create_folder_structure(tmp_path):
-    submodule_path = os.path.join(tmp_path, "submodule")
-    os.makedirs(submodule_path, exist_ok=True)
+def k(h):
+    return h
+k.node_tag = "k"
 
-    init_path = os.path.join(tmp_path, "__init__.py")
-    with open(init_path, 'w') as f:
-        pass
-    
-    node_1_path = os.path.join(tmp_path, "node_1.py")
-    with open(node_1_path, 'w') as f:
-        f.write(node_1_code)
+def helper(a):
+    return a
+'''
 
-    init_submodule_path = os.path.join(submodule_path, "__init__.py")
-    with open(init_submodule_path, 'w') as f:
-        pass
-    
-    node_2_path = os.path.join(submodule_path, "node_2.py")
-    with open(node_2_path, 'w') as f:
-        f.write(node_2_code)
+def test_load_nodes_with_outputs(tmp_path):
+    create_folder_structure(tmp_path)
+    with open(os.path.join(tmp_path, "node_3.py"), 'w') as f:
+        f.write(node_3_code)
+    nodes = load_nodes(tmp_path, outputs=["e"])
+    assert set(nodes) == {"a", "b", "e"}
+    assert Model(nodes).compute({"x":1,"y":1}) == {'x': 1, 'y': 1, 'a': 1, 'b': 3, 'e': 15}
+    assert set(load_nodes(tmp_path, outputs="a")) == {"a"}
 
+def test_load_nodes_with_outputs_and_forced_node_to_node(tmp_path):
+    with open(os.path.join(tmp_path, "nodes.py"), 'w') as f:
+        f.write("from nodemodel import node\n\n@node(a=('node','d'))\ndef b(a):\n    return a\n\n"
+                "@node\ndef a(x):\n    return x\n\n@node\ndef d(y):\n    return y\n")
+    assert set(load_nodes(tmp_path, outputs="b")) == {"a", "b", "d"}
 
-def test_load_nodes(tmp_path):
+def test_index_directory(tmp_path):
     create_folder_structure(tmp_path)
-    nodes = load_nodes(tmp_path)
-    m = Model(nodes)
-    assert m.compute({"x":1,"y":1}) == {'x': 1, 'y': 1, 'a': 1, 'b': 3, 'e': 15, 'c': 5}
+    path = os.path.join(tmp_path, "node_4.py")
+    with open(path, 'w') as f:
+        f.write(node_4_code)
+    index = index_directory(tmp_path)
+    assert set(index) == {"a", "b", "c", "e", "g", "h", "k"}
+    assert index["h"].args == ("g", "u")
+    assert index["h"].filename == path
+    assert index_file(path) is index_file(path)
+    assert set(load_nodes(tmp_path, outputs="k")) == {"a", "g", "h", "k"}
+
+    with open(path, 'w') as f:
+        f.write(node_4_code.replace("@nm.node\n", ""))
+    os.utime(path, ns=(0, 0))
+    assert set(index_directory(tmp_path)) == {"a", "b", "c", "e", "g", "k"}
+    assert set(load_nodes(tmp_path, outputs="k")) == {"k"}
+
+def test_index_directory_is_stored_in_cache_dir(tmp_path, monkeypatch):
+    import ast
+    import nodemodel.index
+    module_dir = tmp_path / "nodes"
+    cache_dir = tmp_path / "cache"
+    module_dir.mkdir()
+    create_folder_structure(module_dir)
+    path = os.path.join(module_dir, "node_4.py")
+    with open(path, 'w') as f:
+        f.write(node_4_code)
+    index = index_directory(module_dir, cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    #A new process starts with an empty in-memory cache and reads the stored indexes instead of parsing the files
+    monkeypatch.setattr(nodemodel.index, "_file_indexes", {})
+    parsed = []
+    parse = ast.parse
+    monkeypatch.setattr(ast, "parse", lambda source, filename: parsed.append(filename) or parse(source, filename=filename))
+    assert index_directory(module_dir, cache_dir) == index
+    assert parsed == []
+    assert set(load_nodes(module_dir, outputs="k", index_cache_dir=cache_dir)) == {"a", "g", "h", "k"}
+    assert parsed == []
+
+    #Changed files are parsed again
+    with open(path, 'w') as f:
+        f.write(node_4_code.replace("@nm.node\n", ""))
+    os.utime(path, ns=(0, 0))
+    monkeypatch.setattr(nodemodel.index, "_file_indexes", {})
+    assert set(index_directory(module_dir, cache_dir)) == {"a", "b", "c", "e", "g", "k"}
+    assert parsed == [path]
+
+    #An unreadable file falls back to the in-memory cache
+    for name in os.listdir(cache_dir):
+        (cache_dir / name).write_bytes(b"not an index")
+    monkeypatch.setattr(nodemodel.index, "_file_indexes", {})
+    assert set(index_directory(module_dir, cache_dir)) == {"a", "b", "c", "e", "g", "k"}
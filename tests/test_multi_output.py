@@ -0,0 +1,89 @@
+from nodemodel.model import Model
+from nodemodel.utils import node,load_nodes
+from nodemodel.graph_functions import nodes_graph
+from nodemodel.plan import ITEM
+import asyncio
+import os
+import pytest
+
+def multi_output_model(calls):
+    @node(outputs=("mean","spread"))
+    def stats(x,y):
+        calls.append("stats")
+        return (x + y) / 2,abs(x - y)
+
+    def score(mean,spread):
+        return mean + spread
+
+    @node(x=10)
+    def stressed(mean):
+        return mean
+
+    @node(mean=0)
+    def floor(mean,spread):
+        return mean + spread
+
+    return Model({"stats":stats,"score":score,"stressed":stressed,"floor":floor})
+
+def test_multi_output_nodes():
+    calls = []
+    m = multi_output_model(calls)
+    assert set(m.inputs) == {"x","y"}
+    assert set(m.nodes_graph.edges()) >= {("stats","mean"),("stats","spread"),("mean","score")}
+    assert m.plan.node("mean").kind == ITEM
+    assert set(m.auxiliary_nodes) == {("x",10),("stats","x",10),("mean","x",10),("mean",0)}
+    calls.clear()
+    result = m.compute({"x":2,"y":4})
+    assert result == {"x":2,"y":4,"stats":(3,2),"mean":3,"spread":2,"score":5,"stressed":7,"floor":2}
+    assert calls == ["stats","stats"]
+    expected = m.compute({"x":2,"y":4},keep_auxiliary_nodes=True)
+    assert m.compile()({"x":2,"y":4},keep_auxiliary_nodes=True) == expected
+    assert m.compute_many([{"x":2,"y":4}]) == [result]
+    assert m.compute({"x":2,"y":4},executor="threads") == result
+    assert asyncio.run(m.acompute({"x":2,"y":4})) == result
+    assert m.compute({"x":2,"y":4},outputs="score") == {"x":2,"y":4,"score":5}
+    assert set(m.submodel("score").nodes) == {"stats","score"}
+
+def test_multi_output_with_folding_and_saved_plan(tmp_path):
+    calls = []
+    m = multi_output_model(calls)
+    path = tmp_path / "model.plan"
+    m.save_plan(path)
+    loaded = Model.load_plan(path,m.nodes,assume_pure=True)
+    assert loaded.plan.node("mean").kind == ITEM
+    assert loaded.compute({"x":2,"y":4}) == m.compute({"x":2,"y":4})
+
+def test_multi_output_collision():
+    @node(outputs=("a","b"))
+    def f(x):
+        return x,x
+
+    def a(x):
+        return x
+
+    with pytest.raises(ValueError):
+        nodes_graph({"f":f,"a":a})
+    with pytest.raises(ValueError):
+        Model({"f":f,"g":node(outputs=("b",))(lambda y: (y,))})
+
+def test_multi_output_columns():
+    np = pytest.importorskip("numpy")
+    @node(outputs=("low","high"),vectorize=False)
+    def bounds(x):
+        return min(x,0),max(x,0)
+
+    def width(low,high):
+        return high - low
+
+    m = Model({"bounds":bounds,"width":width})
+    result = m.compute_columns({"x":np.array([-1.0,2.0])})
+    assert result["low"].tolist() == [-1.0,0.0]
+    assert result["width"].tolist() == [1.0,2.0]
+
+def test_load_nodes_with_multi_output(tmp_path):
+    with open(os.path.join(tmp_path,"nodes.py"),"w") as f:
+        f.write("from nodemodel import node\n\n@node(outputs=('mean','spread'))\ndef stats(x, y):\n"
+                "    return (x + y) / 2, abs(x - y)\n\n@node\ndef score(mean):\n    return mean\n")
+    nodes = load_nodes(tmp_path,outputs="score")
+    assert set(nodes) == {"stats","score"}
+    assert Model(nodes).compute({"x":2,"y":4})["score"] == 3
@@ -0,0 +1,114 @@
+from nodemodel.model import Model
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+def test_compute_with_outputs():
+    m = model_with_forced_nodes()
+    assert m.compute({"x":1,"y":1},outputs=["c","e"]) == {'x': 1, 'y': 1, 'e': 15, 'c': 5}
+    assert m.compute({"x":1,"y":1},outputs="c") == {'x': 1, 'y': 1, 'c': 5}
+    assert m.compute({"x":1,"y":1},outputs=["c",("b","y",3)]) == {'x': 1, 'y': 1, ('b','y',3): 5, 'c': 5}
+    assert m.compute({"x":1,"y":1},outputs=["c"],executor="threads") == {'x': 1, 'y': 1, 'c': 5}
+
+def test_compute_with_free_intermediates():
+    m = model_with_forced_nodes()
+    assert m.compute({"x":1,"y":1},outputs=["c","e"],free_intermediates=True) == {'x': 1, 'y': 1, 'e': 15, 'c': 5}
+    assert m.compute({"x":1,"y":1},free_intermediates=True) == m.compute({"x":1,"y":1})
+    assert (m.compute({"x":1,"y":1},free_intermediates=True,keep_auxiliary_nodes=True) == 
+            m.compute({"x":1,"y":1},keep_auxiliary_nodes=True))
+    assert m.compute({"y":1},outputs=["c"],free_intermediates=True,x=1) == {'y': 1, 'c': 5}
+
+def test_free_intermediates_releases_values_after_last_consumer():
+    alive = {}
+    def a(x):
+        return "a"
+    def b(a):
+        return "b"
+    def c(b):
+        alive["c"] = set(input)
+        return "c"
+    def d(a,c):
+        alive["d"] = set(input)
+        return "d"
+
+    m = Model({"a":a,"b":b,"c":c,"d":d})
+    input = {"x":1}
+    assert m.compute(input,outputs=["d"],free_intermediates=True) == {"x":1,"d":"d"}
+    assert alive == {"c":{"x","a","b"},"d":{"x","a","c"}}
+
+def test_free_intermediates_with_executor():
+    m = model_with_forced_nodes()
+    with pytest.raises(ValueError):
+        m.compute({"x":1,"y":1},free_intermediates=True,executor="threads")
+
+def test_compute_with_unknown_outputs():
+    m = model_with_forced_nodes()
+    with pytest.raises(ValueError):
+        m.compute({"x":1,"y":1},outputs=["z"])
+
+def test_compute_with_outputs_only_computes_ancestors():
+    calls = []
+    def a(x):
+        calls.append("a")
+        return x
+    def b(a):
+        calls.append("b")
+        return a
+    b.forced_nodes = {"x":2}
+    def c(x):
+        calls.append("c")
+        return x
+
+    m = Model({"a":a,"b":b,"c":c})
+    assert m.compute({"x":1},outputs="b") == {"x":1,"b":2}
+    assert calls == ["a","b"]
+    calls.clear()
+    assert m.compute({"x":1},outputs=["c"],executor="threads") == {"x":1,"c":1}
+    assert m.compute_many([{"x":1}],outputs=["c"]) == [{"c":1}]
+    assert calls == ["c","c"]
+
+def test_reachability_index():
+    m = model_with_forced_nodes()
+    plan = m.plan
+    for node_name in m.call_order:
+        expected = {plan.ids[k] for k in m.graph.predecessors(node_name)}
+        stack = list(expected)
+        while stack:
+            for k in plan.predecessors[stack.pop()]:
+                if k not in expected:
+                    expected.add(k)
+                    stack.append(k)
+        assert plan.needed_ids([plan.ids[node_name]]) == sorted(expected | {plan.ids[node_name]})
+
+def multi_output_model():
+    from nodemodel import node
+
+    @node(outputs=("mean","spread"))
+    def stats(x,y):
+        return (x + y) / 2,abs(x - y)
+
+    def score(mean,spread):
+        return mean + spread
+
+    @node(x=0)
+    def shifted(score):
+        return score
+
+    return Model({"stats":stats,"score":score,"shifted":shifted})
+
+def test_compute_columns_with_multi_output_functions():
+    np = pytest.importorskip("numpy")
+    m = multi_output_model()
+    result = m.compute_columns({"x":np.arange(3.0),"y":np.ones(3)})
+    assert set(result) == {"x","y","mean","spread","score","shifted"}
+    assert result["score"].tolist() == [1.5,1.0,2.5]
+    assert result["shifted"].tolist() == [1.5,1.5,1.5]
+    assert ("mean","x",0) in m.compute_columns({"x":np.arange(3.0),"y":np.ones(3)},keep_auxiliary_nodes=True)
+
+def test_compute_frame_with_multi_output_functions():
+    pd = pytest.importorskip("pandas")
+    m = multi_output_model()
+    frame = pd.DataFrame({"x":[0.0,1.0,2.0],"y":[1.0,1.0,1.0]})
+    result = m.compute_frame(frame)
+    assert list(result.columns) == ["x","y","mean","spread","score","shifted"]
+    assert result["score"].tolist() == [1.5,1.0,2.5]
+    assert m.compute_frame(frame,chunk_size=2)["shifted"].tolist() == [1.5,1.5,1.5]
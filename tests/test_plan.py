@@ -0,0 +1,145 @@
+from nodemodel.model import Model
+from nodemodel.utils import node
+from nodemodel.plan import FUNCTION,VALUE,ALIAS
+import subprocess
+import threading
+import sys
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+def unforced_b(a,y):
+    return a + y
+
+@node(y=3,z=("node","a"))
+def c_with_z(b,z):
+    return b + z
+
+def test_plan_ids():
+    m = model_with_forced_nodes(b=unforced_b,c=c_with_z,e=None)
+    plan = m.plan
+    assert list(plan.names) == m.inputs + m.call_order
+    assert [plan.names[k] for k in plan.inputs] == m.inputs
+    assert [node.name for node in plan.nodes] == m.call_order
+    assert {plan.names[k] for k in plan.auxiliary_nodes} == set(m.auxiliary_nodes)
+    assert all(plan.ids[name] == k for k,name in enumerate(plan.names))
+
+def test_plan_nodes():
+    m = model_with_forced_nodes(b=unforced_b,c=c_with_z,e=None)
+    plan = m.plan
+    assert plan.node(("y",3)).kind == VALUE
+    assert plan.node(("y",3)).value == 3
+    assert plan.node(("y",3)).function() == 3
+    assert plan.node(("z",("node","a"))).kind == ALIAS
+    assert [plan.names[k] for k in plan.node(("z",("node","a"))).args] == ["a"]
+    assert plan.node("c").kind == FUNCTION
+    assert [plan.names[k] for k in plan.node("c").args] == [("b","y",3),("z",("node","a"))]
+
+def test_plan_is_frozen():
+    m = model_with_forced_nodes(b=unforced_b,c=c_with_z,e=None)
+    with pytest.raises(AttributeError):
+        m.plan.names = ()
+
+def test_ancestor_bits_are_built_once_by_threads():
+    plan = model_with_forced_nodes().plan
+    barrier = threading.Barrier(8)
+    results = []
+    def read():
+        barrier.wait()
+        results.append(plan.ancestor_bits)
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(bits is results[0] for bits in results)
+    assert plan.needed_ids([plan.ids["c"]]) == sorted({plan.ids["c"]}.union(plan.ancestors([plan.ids["c"]])))
+
+def test_graphs_are_built_lazily():
+    m = model_with_forced_nodes(b=unforced_b,c=c_with_z,e=None)
+    assert m.compute({"x":1,"y":1}) == {"x":1,"y":1,"a":1,"b":2,"c":5}
+    assert m._graph is None and m._nodes_graph is None and m._model_nodes is None
+    assert set(m.graph.edges()) == {(m.plan.names[k],name) for name,predecessors in zip(m.plan.names,m.plan.predecessors)
+                                    for k in predecessors}
+    assert set(m.nodes_graph.edges()) == {("x","a"),("a","b"),("y","b"),("b","c"),("z","c"),("a","c")}
+    assert m.model_nodes["c"].inputs == [("b","y",3),("z",("node","a"))]
+
+def test_import_does_not_import_networkx():
+    code = "import nodemodel,sys;print('networkx' in sys.modules)"
+    output = subprocess.run([sys.executable,"-c",code],capture_output=True,text=True,check=True).stdout
+    assert output.strip() == "False"
+
+def test_import_does_not_import_computation_modules():
+    modules = ["nodemodel.compiler","nodemodel.executors","nodemodel.columns","nodemodel.index","concurrent.futures"]
+    code = f"import nodemodel,sys;print([k for k in {modules} if k in sys.modules])"
+    output = subprocess.run([sys.executable,"-c",code],capture_output=True,text=True,check=True).stdout
+    assert output.strip() == "[]"
+
+def test_save_and_load_plan(tmp_path,monkeypatch):
+    m = model_with_forced_nodes(b=unforced_b,c=c_with_z,e=None)
+    path = tmp_path / "model.plan"
+    m.save_plan(path)
+
+    import nodemodel.graph_functions
+    def fail(*args,**kwargs):
+        raise AssertionError("The graph must not be built")
+    with monkeypatch.context() as patch:
+        patch.setattr(nodemodel.graph_functions,"model_graph",fail)
+        loaded = Model.load_plan(path,m.nodes)
+    assert loaded.call_order == m.call_order
+    assert loaded.inputs == m.inputs
+    assert loaded.auxiliary_nodes == m.auxiliary_nodes
+    assert loaded.compute({"x":1,"y":1},keep_auxiliary_nodes=True) == m.compute({"x":1,"y":1},keep_auxiliary_nodes=True)
+    assert set(loaded.graph.edges()) == set(m.graph.edges())
+
+def test_load_plan_rebuilds_changed_nodes(tmp_path):
+    m = model_with_forced_nodes(b=unforced_b,c=c_with_z,e=None)
+    path = tmp_path / "model.plan"
+    m.save_plan(path)
+
+    def b(a,y,w):
+        return a + y + w
+    changed = Model.load_plan(path,{**m.nodes,"b":b})
+    assert changed.compute({"x":1,"y":1,"w":1})["c"] == 6
+
+    m.nodes["c"].forced_nodes = {"y":4,"z":("node","a")}
+    assert Model.load_plan(path,m.nodes).compute({"x":1,"y":1})["c"] == 6
+    assert Model.load_plan(path,m.nodes).compute({"x":1,"y":1})["c"] == 6
+
+def test_load_plan_missing_or_corrupted_file(tmp_path):
+    m = model_with_forced_nodes(b=unforced_b,c=c_with_z,e=None)
+    path = tmp_path / "model.plan"
+    assert Model.load_plan(path,m.nodes).call_order == m.call_order
+    assert path.exists()
+    path.write_bytes(b"not a plan")
+    assert Model.load_plan(path,m.nodes).call_order == m.call_order
+
+def test_load_plan_with_removed_class(tmp_path,monkeypatch):
+    #The forced values of a plan are pickled with it: a stale plan can refer to a class which no longer exists
+    (tmp_path / "plan_values.py").write_text("class Threshold(int):\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import plan_values
+
+    @node(y=plan_values.Threshold(3))
+    def b(a,y):
+        return a + y
+    m = model_with_forced_nodes(b=b,c=c_with_z,e=None)
+    paths = [tmp_path / "removed_class.plan",tmp_path / "removed_module.plan"]
+    for path in paths:
+        m.save_plan(path)
+
+    nodes = {**m.nodes,"b":unforced_b}
+    monkeypatch.delattr(plan_values,"Threshold")
+    assert Model.load_plan(paths[0],nodes).compute({"x":1,"y":1})["b"] == 2
+    monkeypatch.delitem(sys.modules,"plan_values")
+    (tmp_path / "plan_values.py").unlink()
+    assert Model.load_plan(paths[1],nodes).compute({"x":1,"y":1})["b"] == 2
+
+def test_load_plan_does_not_import_networkx(tmp_path):
+    (tmp_path / "nodes.py").write_text("def a(x):\n    return x + 1\n\ndef b(a):\n    return a * 2\n")
+    code = ("import sys;sys.path.insert(0,sys.argv[1]);import nodes;from nodemodel import Model;"
+            "m = Model.load_plan(sys.argv[2],{'a':nodes.a,'b':nodes.b});"
+            "print(m.compute({'x':1})['b'],'networkx' in sys.modules)")
+    path = str(tmp_path / "model.plan")
+    outputs = [subprocess.run([sys.executable,"-c",code,str(tmp_path),path],capture_output=True,text=True,check=True).stdout.strip()
+               for _ in range(2)]
+    assert outputs == ["4 True","4 False"]
@@ -0,0 +1,116 @@
+from nodemodel.model import Model
+from nodemodel.utils import node,load_nodes,model_spec,nodes_from_spec
+from nodemodel.cache import LRU
+from tests.helpers import create_folder_structure
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+
+@node
+def a(x):
+    return x
+
+@node(x=2)
+def b(a,y):
+    return a + y
+
+def c(b):
+    return b
+c.forced_nodes = {"y":3}
+
+def test_model_spec():
+    spec = model_spec({"a":a,"b":b,"c":c})
+    assert spec["c"]["module"] == __name__
+    assert spec["c"]["qualname"] == "c"
+    assert spec["c"]["forced_nodes"] == {"y":3}
+    nodes = nodes_from_spec(spec)
+    assert nodes["a"] is a and nodes["b"] is b and nodes["c"] is c
+
+def test_model_spec_with_local_function():
+    def d(x):
+        return x
+    with pytest.raises(ValueError):
+        model_spec({"d":d})
+
+def test_model_spec_with_loaded_nodes(tmp_path):
+    create_folder_structure(tmp_path)
+    nodes = load_nodes(tmp_path)
+    loaded_nodes = nodes_from_spec(model_spec(nodes))
+    assert set(loaded_nodes) == set(nodes)
+    assert loaded_nodes["b"].forced_nodes == {"x":2}
+    assert Model(loaded_nodes).compute({"x":1,"y":1}) == {'x': 1, 'y': 1, 'a': 1, 'b': 3, 'e': 15, 'c': 5}
+
+def test_compute_many_with_processes():
+    m = Model({"a":a,"b":b,"c":c})
+    records = [{"x":i,"y":1} for i in range(25)]
+    expected = [m.compute(dict(r)) for r in records]
+    assert m.compute_many(records,executor="processes",max_workers=2,chunksize=4) == expected
+    assert (m.compute_many(records,outputs=["c"],executor="processes",max_workers=2,chunksize=4) == 
+            [{"c":r["c"]} for r in expected])
+
+def test_compute_many_with_processes_and_loaded_nodes(tmp_path):
+    create_folder_structure(tmp_path)
+    m = Model(load_nodes(tmp_path))
+    records = [{"x":i,"y":1} for i in range(5)]
+    assert (m.compute_many(records,executor="processes",max_workers=2,chunksize=2,keep_auxiliary_nodes=True) == 
+            [m.compute(dict(r),keep_auxiliary_nodes=True) for r in records])
+
+def test_compute_many_with_unknown_executor():
+    m = Model({"a":a})
+    with pytest.raises(ValueError):
+        m.compute_many([{"x":1}],executor="unknown")
+
+counted_calls = 0
+
+def counted(x):
+    global counted_calls
+    counted_calls += 1
+    return counted_calls
+
+@node(x=0)
+def uses_counted(counted,y):
+    return counted + y
+
+def test_compute_many_with_processes_keeps_assume_pure():
+    #With assume_pure, ('counted','x',0) is computed once when a worker builds the model, not once per record
+    m = Model({"counted":counted,"uses_counted":uses_counted},assume_pure=True)
+    records = [{"x":i,"y":0} for i in range(8)]
+    results = m.compute_many(records,outputs=["uses_counted"],executor="processes",max_workers=2,chunksize=4)
+    assert len({r["uses_counted"] for r in results}) <= 2
+    m = Model({"counted":counted,"uses_counted":uses_counted})
+    results = m.compute_many(records,outputs=["uses_counted"],executor="processes",max_workers=1,chunksize=4)
+    assert len({r["uses_counted"] for r in results}) == 8
+
+def choose(flag,a,b):
+    return a() if flag else b()
+
+def test_model_spec_sends_node_attributes(monkeypatch):
+    monkeypatch.setattr(choose,"node_lazy",("a","b"),raising=False)
+    monkeypatch.setattr(a,"node_pure",True,raising=False)
+    spec = model_spec({"a":a,"choose":choose})
+    #Attributes set at runtime are missing from a function imported by a new process
+    monkeypatch.delattr(choose,"node_lazy")
+    nodes = nodes_from_spec(spec)
+    assert nodes["choose"].node_lazy == ("a","b") and nodes["a"].node_pure
+    monkeypatch.delattr(choose,"node_lazy")
+    spec = model_spec({"choose":choose})
+    choose.node_lazy = ("a",)
+    assert not hasattr(nodes_from_spec(spec)["choose"],"node_lazy")
+
+def test_model_spec_with_cache_set_at_runtime(monkeypatch):
+    spec = model_spec({"a":a})
+    monkeypatch.setattr(a,"node_cache",LRU(),raising=False)
+    with pytest.raises(ValueError):
+        nodes_from_spec(spec)
+
+def test_compute_many_with_spawned_processes_and_runtime_attributes(monkeypatch):
+    #Spawned workers import the functions again, without the attributes set at runtime in the parent process
+    import functools
+    import multiprocessing
+    import nodemodel.executors
+    monkeypatch.setattr(nodemodel.executors,"ProcessPoolExecutor",
+                        functools.partial(ProcessPoolExecutor,mp_context=multiprocessing.get_context("spawn")))
+    monkeypatch.setattr(choose,"node_lazy",("a","b"),raising=False)
+    m = Model({"a":a,"b":b,"choose":choose})
+    records = [{"x":i,"y":1,"flag":i % 2} for i in range(6)]
+    assert (m.compute_many(records,outputs=["choose"],executor="processes",max_workers=2,chunksize=2) == 
+            m.compute_many(records,outputs=["choose"]))
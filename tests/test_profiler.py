@@ -0,0 +1,103 @@
+from nodemodel.model import Model
+from nodemodel.utils import node
+import asyncio
+import time
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+def a(x):
+    time.sleep(0.01)
+    return x
+
+def c(b):
+    return [0] * 100_000
+
+def test_hooks():
+    m = model_with_forced_nodes(a=a,c=c,e=None)
+    calls = []
+    handle = m.add_hook(pre=lambda node_name,args: calls.append(("pre",node_name,args)),
+                        post=lambda node_name,value: calls.append(("post",node_name,value)))
+    m.compute({"x":1,"y":1})
+    assert calls == [("pre","a",(1,)),("post","a",1),("pre",("a","x",2),(2,)),("post",("a","x",2),2),
+                     ("pre","b",(2,1)),("post","b",3),("pre","c",(3,)),("post","c",[0] * 100_000)]
+    calls.clear()
+    m.compute({"x":1,"y":1},outputs="b")
+    assert calls == [("pre",("a","x",2),(2,)),("post",("a","x",2),2),("pre","b",(2,1)),("post","b",3)]
+    calls.clear()
+    m.remove_hook(handle)
+    m.compute({"x":1,"y":1})
+    assert calls == []
+
+def test_hooks_with_executors():
+    m = model_with_forced_nodes(a=a,c=c,e=None)
+    names = []
+    m.add_hook(post=lambda node_name,value: names.append(node_name))
+    m.compute({"x":1,"y":1},executor="threads")
+    asyncio.run(m.acompute({"x":1,"y":1}))
+    m.recompute(m.compute({"x":1,"y":1}),y=2)
+    assert sorted(names,key=str) == sorted(["a",("a","x",2),"b","c"] * 3 + [("a","x",2),"b","c"],key=str)
+
+def test_profile_report():
+    m = model_with_forced_nodes(a=a,c=c,e=None)
+    with pytest.raises(ValueError):
+        m.profile_report()
+    m.start_profiling()
+    m.compute({"x":1,"y":1})
+    m.compute({"x":1,"y":1})
+    m.stop_profiling()
+    m.compute({"x":1,"y":1})
+    report = m.profile_report()
+    assert [row["name"] for row in report][0] == "a"
+    rows = {row["name"]:row for row in report}
+    assert rows["a"]["calls"] == 4
+    assert rows["a"]["self_time"] >= 0.04
+    assert rows["b"]["calls"] == 2
+    nodes = {row["name"]:row for row in m.profile_report(by="node")}
+    assert set(nodes) == {"a",("a","x",2),"b","c"}
+    assert nodes["a"]["cumulative_time"] == nodes["a"]["self_time"]
+    assert rows["c"]["cumulative_time"] == pytest.approx(sum(nodes[k]["self_time"] for k in [("a","x",2),"b","c"]))
+
+def test_profile_memory():
+    m = model_with_forced_nodes(a=a,c=c,e=None)
+    m.start_profiling(memory=True)
+    m.compute({"x":1,"y":1})
+    m.stop_profiling()
+    rows = {row["name"]:row for row in m.profile_report()}
+    assert rows["c"]["allocated"] >= 800_000
+    assert rows["c"]["peak"] >= 800_000
+
+def test_profile_memory_without_reset_peak(monkeypatch):
+    #tracemalloc.reset_peak is missing before Python 3.9
+    import tracemalloc
+    monkeypatch.delattr(tracemalloc,"reset_peak",raising=False)
+    m = model_with_forced_nodes(a=a,c=c,e=None)
+    m.start_profiling(memory=True)
+    m.compute({"x":1,"y":1})
+    m.stop_profiling()
+    rows = {row["name"]:row for row in m.profile_report()}
+    assert rows["c"]["peak"] == rows["c"]["allocated"] >= 800_000
+
+def test_profile_lazy_arguments():
+    def slow(x):
+        time.sleep(0.05)
+        return [0] * 100_000
+
+    def fast(x):
+        return x
+
+    @node(lazy=["slow","fast"])
+    def select(flag,slow,fast):
+        return len(slow()) if flag else fast()
+
+    m = Model({"slow":slow,"fast":fast,"select":select})
+    m.start_profiling(memory=True)
+    m.compute({"x":1,"flag":True})
+    m.stop_profiling()
+    rows = {row["name"]:row for row in m.profile_report()}
+    assert set(rows) == {"slow","select"}
+    #The time and memory of the deferred node computed through the thunk are not counted in the selector
+    assert rows["slow"]["self_time"] >= 0.05
+    assert rows["select"]["self_time"] < 0.04
+    assert rows["select"]["cumulative_time"] == pytest.approx(rows["select"]["self_time"] + rows["slow"]["self_time"])
+    assert rows["slow"]["allocated"] >= 800_000
+    assert rows["select"]["allocated"] < 800_000
@@ -0,0 +1,48 @@
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+def model_with_input_z(calls):
+    """The shared model with a node d(z) independent of the forced nodes."""
+    def d(z):
+        calls.append("d")
+        return z
+
+    return model_with_forced_nodes(calls,d=d)
+
+def test_recompute():
+    calls = []
+    m = model_with_input_z(calls)
+    result = m.compute({"x":1,"y":1,"z":1})
+    calls.clear()
+    assert m.recompute(result,z=2) == m.compute({"x":1,"y":1,"z":2})
+    assert calls[0] == "d"
+    calls.clear()
+    assert m.recompute(result,x=5) == m.compute({"x":5,"y":1,"z":2})
+    assert calls[0] == "a"
+
+def test_recompute_with_auxiliary_nodes():
+    calls = []
+    m = model_with_input_z(calls)
+    result = m.compute({"x":1,"y":1,"z":1})
+    calls.clear()
+    #('a','x',2) does not depend on 'y' but is needed by 'b' and missing from the result:
+    assert m.recompute(result,y=4) == {'x': 1, 'y': 4, 'z': 1, 'a': 1, 'b': 6, 'd': 1, 'e': 30, 'c': 5}
+    assert calls == ["a","b","e"]
+
+    expected = m.compute({"x":1,"y":4,"z":1},keep_auxiliary_nodes=True)
+    result = m.compute({"x":1,"y":1,"z":1},keep_auxiliary_nodes=True)
+    calls.clear()
+    assert m.recompute(result,keep_auxiliary_nodes=True,y=4) == expected
+    assert calls == ["b","e"]
+
+def test_recompute_several_inputs():
+    calls = []
+    m = model_with_input_z(calls)
+    result = m.compute({"x":1,"y":1,"z":1})
+    assert m.recompute(result,x=3,z=3) == m.compute({"x":3,"y":1,"z":3})
+
+def test_recompute_unknown_input():
+    m = model_with_input_z([])
+    result = m.compute({"x":1,"y":1,"z":1})
+    with pytest.raises(ValueError):
+        m.recompute(result,w=1)
@@ -0,0 +1,61 @@
+from nodemodel.model import Model
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import itertools
+import pytest
+from nodemodel.utils import node
+
+#Module-level functions, which worker processes can import
+@node
+def a(x):
+    return x
+
+@node(x=2)
+def b(a,y):
+    return a + y
+
+def c(b):
+    return b
+c.forced_nodes = {"y":3}
+
+def records(n,read=None):
+    for i in range(n):
+        if read is not None:
+            read.append(i)
+        yield {"x":i,"y":1}
+
+def test_compute_stream_is_lazy():
+    m = Model({"a":a,"b":b,"c":c})
+    read = []
+    results = m.compute_stream(records(10**9,read),chunk_size=10,outputs=["c"])
+    assert read == []
+    assert list(itertools.islice(results,25)) == [{"c":5}] * 25
+    assert len(read) == 30
+
+def test_compute_stream_matches_compute():
+    m = Model({"a":a,"b":b,"c":c})
+    expected = [m.compute(r) for r in records(25)]
+    assert list(m.compute_stream(records(25),chunk_size=4)) == expected
+    assert list(m.compute_stream(records(25),chunk_size=4,executor="threads",max_workers=2)) == expected
+    with ThreadPoolExecutor(2) as pool:
+        assert list(m.compute_stream(records(25),chunk_size=4,executor=pool)) == expected
+    assert list(m.compute_stream(records(25),chunk_size=4,executor="processes",max_workers=2)) == expected
+    with pytest.raises(ValueError):
+        m.compute_stream(records(25),chunk_size=0)
+    with pytest.raises(ValueError):
+        m.compute_stream(records(25),executor="unknown")
+
+def test_compute_stream_unordered():
+    slow = threading.Event()
+    def d(x):
+        if x == 0:
+            slow.wait(5)
+        return x
+
+    m = Model({"d":d})
+    results = m.compute_stream(({"x":i} for i in range(8)),chunk_size=2,outputs=["d"],executor="threads",max_workers=2,
+                               ordered=False)
+    first = next(results)
+    slow.set()
+    assert first == {"d":2}
+    assert sorted([first["d"]] + [r["d"] for r in results]) == list(range(8))
@@ -1,4 +1,6 @@
 from nodemodel.model import Model
+import pytest
+from tests.helpers import model_with_forced_nodes
 
 def test_submodel():
     def z(a):
@@ -25,3 +27,29 @@ def test_submodel():
     assert m_sub.compute({}) == {'b': 1, 'y': 1, 'a': 1, 'z': 1}
     m_sub = m.submodel("y")
     assert m_sub.compute({}) == {'b': 1, 'y': 1}
+
+def test_submodel_with_forced_nodes():
+    m = model_with_forced_nodes()
+    for names in (["c"],["e"],["c","e"],["a"],["b","x"]):
+        m_sub = m.submodel(names)
+        expected = Model({k:v for k,v in m.nodes.items() if k in m_sub.nodes})
+        assert set(m_sub.nodes) == set(expected.nodes)
+        assert set(m_sub.graph.edges()) == set(expected.graph.edges())
+        assert set(m_sub.auxiliary_nodes) == set(expected.auxiliary_nodes)
+        assert (m_sub.compute({"x":1,"y":1},keep_auxiliary_nodes=True) 
+                == expected.compute({"x":1,"y":1},keep_auxiliary_nodes=True))
+    assert set(m.submodel("c").call_order) == {"a",("x",2),("a","x",2),("y",3),"b",("b","y",3),"c"}
+
+def test_submodel_is_cached_and_not_rebuilt(monkeypatch):
+    m = model_with_forced_nodes()
+    import nodemodel.graph_functions
+    def fail(*args,**kwargs):
+        raise AssertionError("The graph must not be built")
+    monkeypatch.setattr(nodemodel.graph_functions,"model_graph",fail)
+    assert m.submodel(["c","e"]) is m.submodel(["e","c"])
+    assert m.submodel("c") is not m.submodel(["c","e"])
+
+def test_submodel_unknown_node():
+    m = model_with_forced_nodes()
+    with pytest.raises(ValueError):
+        m.submodel("z")
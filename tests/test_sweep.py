@@ -0,0 +1,50 @@
+from nodemodel.model import Model
+from nodemodel.utils import node
+import pytest
+from tests.helpers import model_with_forced_nodes
+
+def model_with_input_z(calls):
+    """The shared model with a node d(z) independent of the forced nodes, used by e."""
+    def d(z):
+        calls.append("d")
+        return z * 2
+
+    def e(b,d):
+        calls.append("e")
+        return b*5 + d
+
+    return model_with_forced_nodes(calls,d=d,e=e)
+
+def test_sweep():
+    calls = []
+    m = model_with_input_z(calls)
+    input = {"x":1,"y":1,"z":1}
+    results = m.sweep(input,["a","c","e"],{"y":[1,2,3]})
+    assert input == {"x":1,"y":1,"z":1}
+    assert results == [{k:m.compute({"x":1,"y":y,"z":1})[k] for k in ["a","c","e"]} for y in [1,2,3]]
+    calls.clear()
+    m.sweep(input,"e",{"y":[1,2,3]})
+    assert sorted(calls) == sorted(["a","d"] + ["b","e"] * 3)
+    calls.clear()
+    assert m.sweep(input,"e",{"d":[0,10]}) == [{"e":15},{"e":25}]
+    assert sorted(calls) == ["a","b","e","e"]
+
+def test_sweep_several_nodes():
+    m = model_with_input_z([])
+    results = m.sweep({"x":1,"y":1},["d","e","y"],{"y":[1,2],"z":[10,20]})
+    assert results == [{"d":20,"e":35,"y":1},{"d":40,"e":60,"y":2}]
+    with pytest.raises(ValueError):
+        m.sweep({"x":1},"e",{"y":[1,2],"z":[10]})
+    with pytest.raises(ValueError):
+        m.sweep({"x":1},"e",{"w":[1]})
+
+def test_sweep_vectorized():
+    np = pytest.importorskip("numpy")
+    m = model_with_input_z([])
+    @node(vectorize=False)
+    def f(e):
+        return "big" if e > 50 else "small"
+    m = Model(dict(m.nodes,f=f))
+    input = {"x":1,"y":1,"z":1}
+    scenarios = {"y":list(range(10))}
+    assert m.sweep(input,["c","e","f"],scenarios,vectorize=True) == m.sweep(input,["c","e","f"],scenarios)
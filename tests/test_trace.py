@@ -0,0 +1,39 @@
+from nodemodel.model import Model
+import json
+import threading
+from tests.helpers import model_with_forced_nodes
+
+def c(a):
+    return a * 2
+
+def test_trace(tmp_path):
+    m = model_with_forced_nodes(c=c,e=None)
+    path = tmp_path / "trace.json"
+    with m.trace(path) as tracer:
+        m.compute({"x":1,"y":1})
+        m.compute({"x":1,"y":1},executor="threads")
+        m.compute_many([{"x":1,"y":1}])
+    m.compute({"x":1,"y":1})
+    trace = json.loads(path.read_text())
+    spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert len(spans) == 4 * 3 == len(tracer.events)
+    assert all(span["dur"] >= 0 and span["ts"] > 0 for span in spans)
+    aux = next(span for span in spans if span["name"] == str(("a","x",2)))
+    assert aux["args"]["function"] == "a"
+    assert aux["args"]["forced_nodes"] == {"x":"2"}
+    threads = {event["tid"] for event in trace["traceEvents"] if event["ph"] == "M"}
+    assert threads == {span["tid"] for span in spans}
+    assert threading.get_ident() in threads and len(threads) >= 2
+
+def test_trace_is_written_on_error(tmp_path):
+    def a(x):
+        raise ValueError("a")
+    m = Model({"a":a})
+    path = tmp_path / "trace.json"
+    try:
+        with m.trace(path):
+            m.compute({"x":1})
+    except ValueError:
+        pass
+    assert json.loads(path.read_text())["traceEvents"] == []
+    assert m._hooks == []